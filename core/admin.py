@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User, UserFile, FileView, Withdrawal
+from .models import User, UserFile, StoredObject, FileView, Withdrawal, EmailOutbox, PeriodicTask, TaskRun, LinkCheck
 
 @admin.register(User)
 class CustomUserAdmin(UserAdmin):
@@ -8,5 +8,10 @@ class CustomUserAdmin(UserAdmin):
     readonly_fields = ['api_key', 'total_earnings', 'pending_earnings']
 
 admin.site.register(UserFile)
+admin.site.register(StoredObject)
 admin.site.register(FileView)
-admin.site.register(Withdrawal)
\ No newline at end of file
+admin.site.register(Withdrawal)
+admin.site.register(EmailOutbox)
+admin.site.register(PeriodicTask)
+admin.site.register(TaskRun)
+admin.site.register(LinkCheck)
@@ -0,0 +1,88 @@
+# core/async_views.py
+# Native async versions of the hot counting endpoints, for ASGI deployments
+# (settings.ASYNC_COUNTERS). Same URLs, same response bodies as the DRF views
+# in core/views.py, but:
+#   - no DRF request/response machinery
+#   - counters move with F() expressions in single UPDATEs instead of
+#     read-modify-write saves, so concurrent hits never lose increments
+#   - while one request waits on the database the event loop serves others
+
+from decimal import Decimal
+
+from django.db.models import F
+from django.http import JsonResponse
+from django.shortcuts import aget_object_or_404
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from .models import FileDownload, FileView, SiteSettings, User, UserFile
+from .serializers import FileSerializer
+from .services import calculate_earnings_per_1000_downloads, calculate_earnings_per_1000_views
+from .utils import get_client_ip
+
+
+@csrf_exempt
+@require_POST
+async def increment_view(request, short_code):
+    try:
+        file_obj = await aget_object_or_404(UserFile, short_code=short_code, is_active=True)
+        ip = get_client_ip(request)
+
+        settings = await SiteSettings.aget_settings()
+        rate_per_1000 = settings.earning_per_1000_views or Decimal('1.0000')
+        incremental_earning = calculate_earnings_per_1000_views(1, rate_per_1000)
+
+        await UserFile.objects.filter(pk=file_obj.pk).aupdate(
+            views=F('views') + 1,
+            unique_views=F('unique_views') + 1,
+            earnings=F('earnings') + incremental_earning,
+        )
+        await User.objects.filter(pk=file_obj.user_id).aupdate(
+            pending_earnings=F('pending_earnings') + incremental_earning,
+            total_earnings=F('total_earnings') + incremental_earning,
+        )
+        await FileView.objects.acreate(
+            file_id=file_obj.pk,
+            ip_address=ip,
+            user_agent=request.META.get('HTTP_USER_AGENT', '')[:500]
+        )
+
+        file_obj = await UserFile.objects.select_related('user').aget(pk=file_obj.pk)
+        return JsonResponse(FileSerializer(file_obj, context={'request': request}).data, status=200)
+
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+
+@csrf_exempt
+@require_POST
+async def increment_download(request, short_code):
+    try:
+        file_obj = await aget_object_or_404(UserFile, short_code=short_code, is_active=True)
+        ip = get_client_ip(request)
+
+        today = timezone.now().date()
+        already_downloaded = await FileDownload.objects.filter(
+            file_id=file_obj.pk, ip_address=ip, downloaded_at__date=today
+        ).aexists()
+
+        if not already_downloaded:
+            settings = await SiteSettings.aget_settings()
+            rate_per_1000_dl = settings.earning_per_1000_downloads or Decimal('1.0000')
+            incremental = calculate_earnings_per_1000_downloads(1, rate_per_1000_dl)
+
+            await UserFile.objects.filter(pk=file_obj.pk).aupdate(
+                downloads=F('downloads') + 1,
+                unique_downloads=F('unique_downloads') + 1,
+                download_earnings=F('download_earnings') + incremental,
+            )
+            await User.objects.filter(pk=file_obj.user_id).aupdate(
+                pending_earnings=F('pending_earnings') + incremental,
+                total_earnings=F('total_earnings') + incremental,
+            )
+            await FileDownload.objects.acreate(file_id=file_obj.pk, ip_address=ip)
+
+        return JsonResponse({"message": "Download counted"}, status=200)
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=400)
@@ -0,0 +1,177 @@
+# core/brevo.py
+# Process-wide Brevo transactional email client.
+#
+# - one pooled requests.Session (keep-alive: no TLS handshake per mail)
+# - bounded urllib3 retries for connection failures and 429/503 — answers
+#   that say the mail was not taken; any other failure is left to the
+#   outbox backoff (core/emails.py) so a POST is never repeated blindly
+# - a circuit breaker: after N consecutive failures calls fail fast for a
+#   cool-down period instead of each burning the full timeout
+# - latency / outcome metrics (BrevoClient.stats())
+#
+#   from core.brevo import get_brevo_client
+#   get_brevo_client().send(payload)
+
+import threading
+import time
+from collections import deque
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class BrevoError(Exception):
+    def __init__(self, message, status_code=None, retryable=True):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retryable = retryable
+
+
+class CircuitOpenError(BrevoError):
+    def __init__(self, retry_in):
+        super().__init__(f"Brevo circuit open, retry in {retry_in:.0f}s", retryable=True)
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """closed → (N failures) → open → (cool-down) → half-open: one trial call."""
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def before_call(self):
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return
+            if state == 'half-open' and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return
+            raise CircuitOpenError(max(self.reset_timeout - (time.monotonic() - self.opened_at), 0))
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class BrevoClient:
+    timeout = (3.05, 10)       # connect, read
+    pool_size = 16
+    latency_samples = 500
+
+    def __init__(self, api_url, api_key, breaker=None):
+        self.api_url = api_url
+        self.api_key = api_key
+        self.breaker = breaker or CircuitBreaker()
+        self.session = self._build_session()
+        self._latencies = deque(maxlen=self.latency_samples)
+        self._counts = {'sent': 0, 'failed': 0, 'rejected': 0, 'short_circuited': 0}
+        self._lock = threading.Lock()
+
+    def _build_session(self):
+        retry = Retry(
+            total=2,
+            connect=2,
+            read=0,                      # a read timeout may mean Brevo accepted it — don't double-send
+            status=2,
+            status_forcelist=(429, 503),  # not 502/504: the gateway may have delivered it already
+            allowed_methods=frozenset({'POST'}),
+            backoff_factor=0.5,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update({
+            "accept": "application/json",
+            "api-key": self.api_key or "",
+            "content-type": "application/json",
+        })
+        return session
+
+    def _count(self, outcome, latency=None):
+        with self._lock:
+            self._counts[outcome] += 1
+            if latency is not None:
+                self._latencies.append(latency)
+
+    def send(self, payload):
+        """POST one transactional email. Raises BrevoError (retryable or not) on failure."""
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
+            self._count('short_circuited')
+            raise
+
+        started = time.perf_counter()
+        try:
+            response = self.session.post(self.api_url, json=payload, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            self.breaker.record_failure()
+            self._count('failed', time.perf_counter() - started)
+            raise BrevoError(str(e) or e.__class__.__name__) from e
+        latency = time.perf_counter() - started
+
+        if response.status_code < 300:
+            self.breaker.record_success()
+            self._count('sent', latency)
+            return response
+
+        if response.status_code == 429 or response.status_code >= 500:
+            self.breaker.record_failure()
+            self._count('failed', latency)
+            raise BrevoError(f"HTTP {response.status_code}: {response.text[:500]}", response.status_code)
+
+        # 4xx: our request is wrong (bad address / key) — Brevo itself is healthy
+        self.breaker.record_success()
+        self._count('rejected', latency)
+        raise BrevoError(f"HTTP {response.status_code}: {response.text[:500]}", response.status_code, retryable=False)
+
+    def stats(self):
+        with self._lock:
+            samples = sorted(self._latencies)
+            counts = dict(self._counts)
+
+        def pct(p):
+            return round(samples[min(int(len(samples) * p), len(samples) - 1)] * 1000, 1) if samples else None
+
+        return {**counts, 'circuit': self.breaker.state, 'p50_ms': pct(0.50), 'p95_ms': pct(0.95), 'p99_ms': pct(0.99)}
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_brevo_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = BrevoClient(settings.BREVO_API_URL, settings.BREVO_API_KEY)
+    return _client
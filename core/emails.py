@@ -0,0 +1,191 @@
+# core/emails.py
+# Transactional mail: templates, outbox enqueue and the delivery side used by
+# the `send_emails` worker. Views never talk to Brevo directly — they call one
+# of the queue_* helpers, which inserts an EmailOutbox row and returns.
+
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .brevo import BrevoError, CircuitOpenError, get_brevo_client
+from .models import EmailOutbox
+
+DISKWALA_SENDER = ("DiskWala", "diskwala01@gmail.com")
+ROYALDISK_SENDER = ("Royaldisk", "Royaldisk01@gmail.com")
+
+MAX_ATTEMPTS = 6
+BACKOFF_BASE_SECONDS = 10
+BACKOFF_MAX_SECONDS = 30 * 60
+SEND_LEASE = timedelta(minutes=2)   # a crashed worker's rows are retried after this
+
+
+def email_service_configured():
+    return bool(settings.BREVO_API_KEY)
+
+
+def queue_email(to_email, to_name, subject, html_content, sender=DISKWALA_SENDER):
+    sender_name, sender_email = sender
+    return EmailOutbox.objects.create(
+        to_email=to_email,
+        to_name=to_name or to_email,
+        sender_name=sender_name,
+        sender_email=sender_email,
+        subject=subject,
+        html_content=html_content,
+    )
+
+
+# ========================
+# TEMPLATES
+# ========================
+def queue_email_verification_otp(user, otp):
+    return queue_email(user.email, user.username, "DiskWala - Email Verification OTP", f"""
+        <html>
+          <body>
+            <h2>Welcome to DiskWala!</h2>
+            <p>Your OTP for email verification is: <strong style="font-size:1.5em">{otp}</strong></p>
+            <p>This OTP is valid for <strong>10 minutes</strong> only.</p>
+            <p>Do not share this OTP with anyone.</p>
+            <br>
+            <p>Thanks,<br>DiskWala Team</p>
+          </body>
+        </html>
+        """)
+
+
+def queue_password_reset_otp(user, otp):
+    return queue_email(user.email, user.username, "Royaldisk - Password Reset OTP", f"""
+        <html>
+          <body>
+            <h2>Password Reset Request</h2>
+            <p>Your OTP for password reset is: <strong style="font-size:1.5em">{otp}</strong></p>
+            <p>This OTP is valid for <strong>10 minutes</strong> only.</p>
+            <p>If you didn't request this, ignore this email.</p>
+            <br>
+            <p>Thanks,<br>Royaldisk Team</p>
+          </body>
+        </html>
+        """, sender=ROYALDISK_SENDER)
+
+
+def queue_signup_otp(user, otp):
+    return queue_email(user.email, user.username, "RoyalDisk - Account Verification OTP", f"""
+        <html>
+          <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+            <h2>Welcome to RoyalDisk!</h2>
+            <p>Thank you for signing up. Your OTP for account verification is:</p>
+            <h1 style="font-size: 2.8em; letter-spacing: 10px; color: #6366f1; margin: 20px 0;">{otp}</h1>
+            <p>This OTP is valid for <strong>10 minutes</strong> only.</p>
+            <p><strong>Do not share this OTP with anyone.</strong></p>
+            <br>
+            <p>If you didn't sign up, please ignore this email.</p>
+            <p>Thanks,<br>RoyalDisk Team</p>
+          </body>
+        </html>
+        """)
+
+
+def queue_login_otp(user, otp):
+    return queue_email(user.email, user.username, "RoyalDisk Login OTP", f"""
+        <html>
+          <body style="font-family: Arial, sans-serif; line-height: 1.6;">
+            <h2>Welcome back to RoyalDisk!</h2>
+            <p>Your one-time password (OTP) for login is:</p>
+            <h1 style="font-size: 2.5em; letter-spacing: 8px; color: #6366f1;">{otp}</h1>
+            <p>This OTP is valid for <strong>10 minutes</strong> only.</p>
+            <p><strong>Do not share this OTP with anyone.</strong></p>
+            <br>
+            <p>Thanks,<br>RoyalDisk Team</p>
+            <p style="font-size:0.85em; color:#666;">
+              If you didn't request this, please ignore this email.
+            </p>
+          </body>
+        </html>
+        """)
+
+
+# ========================
+# DELIVERY (send_emails worker)
+# ========================
+def claim_due_emails(limit):
+    """
+    Lease up to `limit` due rows to this worker: pending rows whose retry time
+    has come, plus 'sending' rows whose lease expired. SKIP LOCKED lets several
+    workers poll the same table without handing out a row twice.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True).filter(
+                status='pending', next_attempt_at__lte=now
+            ).order_by('next_attempt_at').values_list('id', flat=True)[:limit]
+        )
+        stale = limit - len(ids)
+        if stale > 0:
+            ids += list(
+                EmailOutbox.objects.select_for_update(skip_locked=True).filter(
+                    status='sending', locked_until__lt=now
+                ).values_list('id', flat=True)[:stale]
+            )
+        EmailOutbox.objects.filter(id__in=ids).update(status='sending', locked_until=now + SEND_LEASE)
+    return list(EmailOutbox.objects.filter(id__in=ids))
+
+
+def brevo_payload(email):
+    return {
+        "sender": {"name": email.sender_name, "email": email.sender_email},
+        "to": [{"email": email.to_email, "name": email.to_name}],
+        "subject": email.subject,
+        "htmlContent": email.html_content,
+    }
+
+
+def deliver(email):
+    """
+    One Brevo call, no DB access (runs in worker threads).
+    Returns (email_id, error, retryable, defer); error is None on success.
+    `defer` is set (seconds) when the call was never made because the circuit
+    is open — the row waits that long without spending an attempt.
+    """
+    try:
+        get_brevo_client().send(brevo_payload(email))
+    except CircuitOpenError as e:
+        return email.id, str(e), True, e.retry_in
+    except BrevoError as e:
+        return email.id, str(e), e.retryable, None
+    except Exception as e:          # never let one bad row kill the worker's pool.map
+        return email.id, f"{e.__class__.__name__}: {e}"[:500], True, None
+    return email.id, None, True, None
+
+
+def retry_delay(attempts):
+    """Exponential backoff with jitter: 10s, 20s, 40s ... capped at 30 min."""
+    delay = min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def record_delivery(email, error, retryable, defer=None):
+    now = timezone.now()
+    email.locked_until = None
+    if defer is not None:
+        email.status = 'pending'
+        email.next_attempt_at = now + timedelta(seconds=max(defer, 1) * random.uniform(1.0, 1.2))
+        email.last_error = error
+        email.save(update_fields=['status', 'locked_until', 'next_attempt_at', 'last_error'])
+        return
+    email.attempts += 1
+    if error is None:
+        email.status = 'sent'
+        email.sent_at = now
+        email.last_error = ''
+    elif retryable and email.attempts < MAX_ATTEMPTS:
+        email.status = 'pending'
+        email.next_attempt_at = now + retry_delay(email.attempts)
+        email.last_error = error
+    else:
+        email.status = 'failed'
+        email.last_error = error
+    email.save(update_fields=['status', 'attempts', 'locked_until', 'sent_at', 'next_attempt_at', 'last_error'])
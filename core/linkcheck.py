@@ -0,0 +1,243 @@
+# core/linkcheck.py
+# Dead-link detection for external file / video URLs, run by `check_links`.
+#
+# Every URL gets a LinkCheck row. A round probes the due rows from a thread
+# pool: one pooled requests.Session per (thread, host) for keep-alive, and a
+# per-host throttle (max in-flight + min spacing) so a big host like ImageKit
+# never sees a burst. Stored ETag / Last-Modified are sent back, so healthy
+# unchanged targets answer 304 with no body. A URL is declared dead only
+# after DEAD_AFTER consecutive 404/410s; everything else (timeouts, 5xx, 429,
+# 403) is retried with backoff and never deactivates content. Dead links are
+# rechecked every DEAD_RECHECK_INTERVAL; one that answers again switches back
+# on the rows it had switched off. Only public http(s) addresses are probed
+# (core/urlguard.py), redirects included.
+
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+import requests
+from django.apps import apps
+from django.db import transaction
+from django.utils import timezone
+
+from .urlguard import UnsafeURL, safe_request
+from .utils import chunked
+
+# (model, URL field) pairs whose rows are switched off when their URL dies
+LINK_SOURCES = (
+    ('core.UserFile', 'external_file_url'),
+    ('drama.DramaEpisode', 'video_url'),
+)
+
+CHECK_INTERVAL = timedelta(days=7)
+DEAD_RECHECK_INTERVAL = timedelta(days=30)
+RETRY_BASE = timedelta(hours=1)
+DEAD_AFTER = 2
+DEAD_STATUSES = (404, 410)
+TIMEOUT = 15
+USER_AGENT = 'DiskWala-LinkChecker/1.0'
+
+
+def host_of(url):
+    return (urlsplit(url).hostname or '').lower()
+
+
+def sync_link_rows(batch_size=1000):
+    """Create LinkCheck rows for URLs of active content not tracked yet."""
+    from .models import LinkCheck
+
+    for label, field in LINK_SOURCES:
+        urls = (
+            apps.get_model(label).objects.filter(is_active=True).exclude(**{f'{field}__isnull': True})
+            .exclude(**{field: ''}).values_list(field, flat=True).distinct().iterator(chunk_size=batch_size)
+        )
+        for chunk in chunked(urls, batch_size):
+            LinkCheck.objects.bulk_create(
+                [LinkCheck(url=url, host=host_of(url)[:255]) for url in chunk if len(url) <= 500],
+                ignore_conflicts=True,
+            )
+
+
+def due_links(limit, now=None):
+    """Links due a probe — dead ones included, they just come due much less often."""
+    from .models import LinkCheck
+
+    now = now or timezone.now()
+    return list(LinkCheck.objects.filter(next_check_at__lte=now).order_by('next_check_at')[:limit])
+
+
+# ========================
+# PROBING (worker threads — no DB access)
+# ========================
+class HostThrottle:
+    """Per-host cap on in-flight requests plus a minimum spacing between request starts."""
+
+    def __init__(self, rate_per_second, max_in_flight):
+        self.interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self.max_in_flight = max_in_flight
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    @contextmanager
+    def slot(self, host):
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                state = self._hosts[host] = [threading.BoundedSemaphore(self.max_in_flight), 0.0]
+        semaphore = state[0]
+        with semaphore:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, state[1])
+                state[1] = start + self.interval
+            if start > now:
+                time.sleep(start - now)
+            yield
+
+
+_local = threading.local()
+
+
+def _session(host):
+    """Keep-alive session per (thread, host)."""
+    sessions = getattr(_local, 'sessions', None)
+    if sessions is None:
+        sessions = _local.sessions = {}
+    session = sessions.get(host)
+    if session is None:
+        session = sessions[host] = requests.Session()
+        session.headers['User-Agent'] = USER_AGENT
+    return session
+
+
+def probe(link, throttle):
+    """
+    Conditional HEAD (falls back to a 1-byte ranged GET where HEAD is refused).
+    Returns (link, status_code or None, etag, last_modified, error).
+    """
+    headers = {}
+    if link.etag:
+        headers['If-None-Match'] = link.etag
+    if link.last_modified:
+        headers['If-Modified-Since'] = link.last_modified
+    session = _session(link.host)
+    try:
+        with throttle.slot(link.host):
+            response = safe_request(session, 'HEAD', link.url, headers=headers, timeout=TIMEOUT)
+            if response.status_code in (405, 501):
+                response = safe_request(
+                    session, 'GET', link.url, headers={**headers, 'Range': 'bytes=0-0'},
+                    timeout=TIMEOUT, stream=True,
+                )
+                response.close()
+    except (requests.RequestException, UnsafeURL) as e:
+        return link, None, '', '', str(e)[:255]
+    return (
+        link,
+        response.status_code,
+        response.headers.get('ETag', '')[:255],
+        response.headers.get('Last-Modified', '')[:64],
+        '',
+    )
+
+
+# ========================
+# RESULTS (main thread)
+# ========================
+def deactivate_url(url):
+    """Switch off every active row pointing at `url`; returns {model label: [pk, ...]} switched off."""
+    changed = {}
+    for label, field in LINK_SOURCES:
+        qs = apps.get_model(label).objects.filter(**{field: url}, is_active=True)
+        pks = list(qs.values_list('pk', flat=True))
+        if pks:
+            qs.filter(pk__in=pks).update(is_active=False)
+            changed[label] = pks
+    return changed
+
+
+def reactivate(deactivated, url):
+    """Switch back on the rows deactivate_url() switched off, if they still point at `url`."""
+    for label, pks in deactivated.items():
+        field = dict(LINK_SOURCES)[label]
+        apps.get_model(label).objects.filter(pk__in=pks, **{field: url}, is_active=False).update(is_active=True)
+
+
+def record_probe(link, status_code, etag, last_modified, error, now=None, save=True):
+    """
+    Apply one probe result (and, when `save`, persist it and deactivate dead
+    or reactivate revived content). Returns 'alive', 'unchanged', 'dead',
+    'revived', 'missing' or 'error'.
+    """
+    now = now or timezone.now()
+    link.checked_at = now
+    link.status_code = status_code
+    link.last_error = error
+
+    if status_code == 304:
+        outcome = 'unchanged'
+    elif status_code is not None and status_code < 400:
+        outcome = 'alive'
+        link.etag, link.last_modified = etag, last_modified
+    elif status_code in DEAD_STATUSES:
+        outcome = 'missing'
+    else:
+        outcome = 'error'
+        link.last_error = error or f"HTTP {status_code}"
+
+    if outcome in ('alive', 'unchanged'):
+        link.failures = 0
+        link.next_check_at = now + CHECK_INTERVAL
+        if link.is_dead:
+            outcome = 'revived'
+            link.is_dead = False
+    elif link.is_dead:
+        link.failures += 1
+        link.next_check_at = now + DEAD_RECHECK_INTERVAL
+    else:
+        link.failures += 1
+        link.next_check_at = now + RETRY_BASE * 2 ** min(link.failures - 1, 6)
+        if outcome == 'missing' and link.failures >= DEAD_AFTER:
+            outcome = 'dead'
+            link.is_dead = True
+            link.next_check_at = now + DEAD_RECHECK_INTERVAL
+
+    if not save:
+        return outcome
+    with transaction.atomic():
+        if outcome == 'dead':
+            link.deactivated = deactivate_url(link.url)
+        elif outcome == 'revived':
+            reactivate(link.deactivated, link.url)
+            link.deactivated = {}
+        link.save(update_fields=[
+            'checked_at', 'status_code', 'etag', 'last_modified', 'failures',
+            'is_dead', 'deactivated', 'last_error', 'next_check_at',
+        ])
+    return outcome
+
+
+def interleave_by_host(links):
+    """Round-robin across hosts so one slow host doesn't occupy every worker thread."""
+    by_host = {}
+    for link in links:
+        by_host.setdefault(link.host, []).append(link)
+    queues = list(by_host.values())
+    ordered = []
+    for i in range(max(map(len, queues), default=0)):
+        ordered.extend(queue[i] for queue in queues if i < len(queue))
+    return ordered
+
+
+def check_links(links, pool, throttle, save=True, on_dead=None):
+    """Probe `links` on `pool`; returns {outcome: count}."""
+    counts = {'alive': 0, 'unchanged': 0, 'missing': 0, 'error': 0, 'dead': 0, 'revived': 0}
+    for result in pool.map(lambda link: probe(link, throttle), interleave_by_host(links)):
+        outcome = record_probe(*result, save=save)
+        counts[outcome] += 1
+        if outcome == 'dead' and on_dead:
+            on_dead(result[0])
+    return counts
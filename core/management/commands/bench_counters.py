@@ -0,0 +1,111 @@
+# core/management/commands/bench_counters.py
+#
+# Load-test a counting endpoint on a running server and report req/s and
+# latency percentiles. Compare the two deployments with the same worker count
+# (and check memory with --pids):
+#
+#   gunicorn diskwala.wsgi -w 4 -b 127.0.0.1:8001                                   # sync DRF views
+#   ASYNC_COUNTERS=True gunicorn diskwala.asgi -w 4 -k uvicorn.workers.UvicornWorker -b 127.0.0.1:8002
+#
+#   python manage.py bench_counters --base-url http://127.0.0.1:8001 --endpoint view --target <short_code> --pids <master pid>
+#   python manage.py bench_counters --base-url http://127.0.0.1:8002 --endpoint view --target <short_code> --pids <master pid>
+#
+# Every request carries a distinct X-Forwarded-For so "once per IP per day"
+# endpoints do the full write path instead of the cheap early return.
+# Writes real view rows — point it at a dev / staging database.
+
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+ENDPOINTS = {
+    'view': '/api/view/{target}/',
+    'download': '/api/download/{target}/',
+    'drama': '/api/drama/dramas/{target}/view/',
+    'episode': '/api/drama/episodes/{target}/view/',
+}
+
+
+def rss_mb(pids):
+    """Resident memory of the given processes and all their children (Linux /proc)."""
+    seen, stack, total_kb = set(), [int(p) for p in pids], 0
+    while stack:
+        pid = stack.pop()
+        if pid in seen:
+            continue
+        seen.add(pid)
+        try:
+            with open(f'/proc/{pid}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total_kb += int(line.split()[1])
+            with open(f'/proc/{pid}/task/{pid}/children') as f:
+                stack.extend(int(c) for c in f.read().split())
+        except OSError:
+            continue
+    return total_kb / 1024
+
+
+class Command(BaseCommand):
+    help = "Benchmark a counting endpoint (req/s, p50/p95/p99) against a running server"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--endpoint', choices=sorted(ENDPOINTS), default='view')
+        parser.add_argument('--target', required=True, help="short_code, or episode id for --endpoint episode")
+        parser.add_argument('--requests', type=int, default=5000)
+        parser.add_argument('--concurrency', type=int, default=64)
+        parser.add_argument('--warmup', type=int, default=200)
+        parser.add_argument('--pids', nargs='*', default=[], help="Server PIDs to sample RSS from")
+
+    def handle(self, *args, **options):
+        url = options['base_url'].rstrip('/') + ENDPOINTS[options['endpoint']].format(target=options['target'])
+        local = threading.local()
+        counter = iter(range(1, 10 ** 9))
+        counter_lock = threading.Lock()
+
+        def hit(_):
+            session = getattr(local, 'session', None)
+            if session is None:
+                session = local.session = requests.Session()
+            with counter_lock:
+                n = next(counter)
+            ip = f"10.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}"
+            started = time.perf_counter()
+            try:
+                ok = session.post(url, headers={'X-Forwarded-For': ip}, timeout=30).status_code < 500
+            except requests.exceptions.RequestException:
+                ok = False
+            return time.perf_counter() - started, ok
+
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            warm = list(pool.map(hit, range(options['warmup'])))
+            if warm and not any(ok for _, ok in warm):
+                raise CommandError(f"Every warm-up request to {url} failed")
+
+            rss_before = rss_mb(options['pids']) if options['pids'] else None
+            started = time.perf_counter()
+            results = list(pool.map(hit, range(options['requests'])))
+            elapsed = time.perf_counter() - started
+            rss_after = rss_mb(options['pids']) if options['pids'] else None
+
+        latencies = sorted(lat for lat, _ in results)
+        errors = sum(1 for _, ok in results if not ok)
+
+        def pct(p):
+            return latencies[min(int(len(latencies) * p), len(latencies) - 1)] * 1000
+
+        self.stdout.write(f"{url}  ({options['requests']} requests, concurrency {options['concurrency']}, client pid {os.getpid()})")
+        self.stdout.write(f"  throughput : {len(results) / elapsed:8.1f} req/s")
+        self.stdout.write(
+            f"  latency ms : mean {statistics.fmean(latencies) * 1000:.1f}  p50 {pct(0.50):.1f}"
+            f"  p95 {pct(0.95):.1f}  p99 {pct(0.99):.1f}  max {latencies[-1] * 1000:.1f}"
+        )
+        self.stdout.write(f"  errors     : {errors}")
+        if rss_before is not None:
+            self.stdout.write(f"  server RSS : {rss_before:.0f} MB → {rss_after:.0f} MB")
@@ -0,0 +1,53 @@
+# core/management/commands/check_links.py
+#
+#   python manage.py check_links                       # probe everything due, deactivate dead content
+#   python manage.py check_links --limit 500 --dry-run # probe only, change nothing
+#   python manage.py check_links --workers 64 --per-host 8 --rate 10
+#
+# Probes UserFile.external_file_url and DramaEpisode.video_url (see
+# core/linkcheck.py). Healthy links are re-checked weekly, failures back off
+# from an hour; two 404/410s in a row switch the file / episode off. Dead
+# links are rechecked monthly and switch their content back on if they answer.
+# Any HTTP server works as a stand-in for tests.
+
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from core.linkcheck import HostThrottle, check_links, due_links, sync_link_rows
+
+
+class Command(BaseCommand):
+    help = "Find dead external file / video URLs and deactivate their content"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=5000, help="Links probed per run")
+        parser.add_argument('--workers', type=int, default=32, help="Concurrent probes overall")
+        parser.add_argument('--per-host', type=int, default=4, help="Concurrent probes per host")
+        parser.add_argument('--rate', type=float, default=5.0, help="Request starts per second per host")
+        parser.add_argument('--no-sync', action='store_true', help="Skip picking up new URLs")
+        parser.add_argument('--dry-run', action='store_true', help="Probe and report; save nothing")
+
+    def handle(self, *args, **options):
+        if not options['no_sync']:
+            sync_link_rows()
+
+        links = due_links(options['limit'])
+        if not links:
+            self.stdout.write("No links due")
+            return
+
+        throttle = HostThrottle(options['rate'], options['per_host'])
+        with ThreadPoolExecutor(max_workers=options['workers'], thread_name_prefix='check-links') as pool:
+            counts = check_links(
+                links, pool, throttle,
+                save=not options['dry_run'],
+                on_dead=lambda link: self.stdout.write(f"dead: {link.url} (HTTP {link.status_code})"),
+            )
+
+        hosts = len({link.host for link in links})
+        self.stdout.write(
+            f"{len(links)} links on {hosts} hosts: " + ", ".join(f"{name} {n}" for name, n in counts.items())
+        )
+        if options['dry_run']:
+            self.stdout.write("dry run — nothing saved")
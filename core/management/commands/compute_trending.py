@@ -0,0 +1,45 @@
+# core/management/commands/compute_trending.py
+#
+#   python manage.py compute_trending            # files, dramas, categories
+#   python manage.py compute_trending --only file
+#
+# Run periodically (e.g. every 15 minutes from cron). Rebuilds the
+# TrendingScore table from the view logs of the last TRENDING_WINDOW_DAYS;
+# `?sort=trending` on the public listings reads that table.
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.services import TRENDING_HALF_LIFE_DAYS, TRENDING_WINDOW_DAYS, compute_file_trending
+from drama.services import compute_drama_trending
+
+
+class Command(BaseCommand):
+    help = "Recompute time-decayed trending scores for files, dramas and categories"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', choices=['file', 'drama'], help="Recompute one side only (drama includes categories)")
+
+    def handle(self, *args, **options):
+        only = options['only']
+        now = timezone.now()
+        self.stdout.write(
+            f"Window {TRENDING_WINDOW_DAYS}d, half-life {TRENDING_HALF_LIFE_DAYS}d"
+        )
+
+        if only in (None, 'file'):
+            started = time.perf_counter()
+            count = compute_file_trending(now)
+            self.stdout.write(f"files: {count} scored in {time.perf_counter() - started:.2f}s")
+
+        if only in (None, 'drama'):
+            started = time.perf_counter()
+            counts = compute_drama_trending(now)
+            self.stdout.write(
+                f"dramas: {counts['drama']}, categories: {counts['category']} "
+                f"scored in {time.perf_counter() - started:.2f}s"
+            )
+
+        self.stdout.write(self.style.SUCCESS("Trending scores updated"))
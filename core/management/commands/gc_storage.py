@@ -0,0 +1,92 @@
+# core/management/commands/gc_storage.py
+#
+#   python manage.py gc_storage --dry-run          # report orphans, delete nothing
+#   python manage.py gc_storage                    # delete orphans older than 24 h
+#   python manage.py gc_storage --min-age-hours 72 --prefix uploads/2025
+#   R2_ENDPOINT_URL=http://127.0.0.1:5000 python manage.py gc_storage --dry-run   # moto / MinIO
+#
+# Deletes R2 objects under the upload prefix that no database row references
+# (see core.storage.URL_REFERENCES): deleted files and abandoned presigned
+# uploads. The referenced keys are loaded into a set once, then the bucket
+# listing is streamed page by page against it. Objects younger than
+# --min-age-hours are never touched — they may be uploads still waiting for
+# registration — and every delete batch is re-checked against the database
+# first.
+
+from datetime import timedelta
+
+from botocore.exceptions import ClientError
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.storage import (
+    DELETE_BATCH, GC_PREFIX, delete_objects, iter_objects, referenced_keys, still_referenced,
+)
+
+
+class Command(BaseCommand):
+    help = "Delete unreferenced objects from the R2 bucket"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="List orphans without deleting")
+        parser.add_argument('--min-age-hours', type=float, default=24.0,
+                            help="Skip objects modified more recently than this")
+        parser.add_argument('--prefix', default=GC_PREFIX)
+        parser.add_argument('--batch', type=int, default=DELETE_BATCH, help="Keys per delete_objects call")
+        parser.add_argument('--verbose-keys', action='store_true', help="Print every orphan key")
+
+    def handle(self, *args, **options):
+        if not 1 <= options['batch'] <= DELETE_BATCH:
+            raise CommandError(f"--batch must be 1..{DELETE_BATCH}")
+        if not options['prefix']:
+            raise CommandError("Refusing to scan the whole bucket; pass a --prefix")
+
+        cutoff = timezone.now() - timedelta(hours=options['min_age_hours'])
+        dry_run = options['dry_run']
+        keep = referenced_keys()
+        self.stdout.write(f"{len(keep)} referenced keys in the database")
+
+        stats = {'scanned': 0, 'young': 0, 'orphans': 0, 'orphan_bytes': 0, 'deleted': 0, 'failed': 0}
+        pending = []
+        try:
+            for obj in iter_objects(options['prefix']):
+                stats['scanned'] += 1
+                if obj['Key'] in keep:
+                    continue
+                if obj['LastModified'] > cutoff:
+                    stats['young'] += 1
+                    continue
+                stats['orphans'] += 1
+                stats['orphan_bytes'] += obj.get('Size', 0)
+                if options['verbose_keys']:
+                    self.stdout.write(f"  orphan {obj['Key']} ({obj.get('Size', 0)} bytes)")
+                if not dry_run:
+                    pending.append(obj['Key'])
+                    if len(pending) >= options['batch']:
+                        self.flush(pending, stats)
+                        pending = []
+            if pending:
+                self.flush(pending, stats)
+        except ClientError as e:
+            raise CommandError(f"R2 error after {stats['scanned']} objects: {e}")
+
+        self.stdout.write(
+            f"scanned {stats['scanned']}, orphans {stats['orphans']} "
+            f"({stats['orphan_bytes'] / 1024 / 1024:.1f} MB), skipped young {stats['young']}"
+        )
+        if dry_run:
+            self.stdout.write("dry run — nothing deleted")
+        else:
+            self.stdout.write(f"deleted {stats['deleted']}, failed {stats['failed']}")
+
+    def flush(self, keys, stats):
+        # A file may have been registered since the reference set was built
+        live = still_referenced(keys)
+        keys = [key for key in keys if key not in live]
+        if not keys:
+            return
+        failed = delete_objects(keys)
+        stats['failed'] += len(failed)
+        stats['deleted'] += len(keys) - len(failed)
+        for key in failed:
+            self.stderr.write(f"could not delete {key}")
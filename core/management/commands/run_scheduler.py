@@ -0,0 +1,79 @@
+# core/management/commands/run_scheduler.py
+#
+#   python manage.py run_scheduler                  # long-running loop (one per node is fine)
+#   python manage.py run_scheduler --once           # run whatever is due, then exit (e.g. from cron)
+#   python manage.py run_scheduler --list           # registered tasks, next run, last result
+#   python manage.py run_scheduler --run core.expire_broadcast_notifications
+#
+# Tasks come from each app's tasks.py (see core/scheduler.py). Any number of
+# nodes may run the loop: each due task is claimed through its PeriodicTask
+# row, so only one node runs it per slot.
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.utils import timezone
+
+from core.models import PeriodicTask, TaskRun
+from core.scheduler import discover_tasks, due_tasks, node_name, registry, run_task, sync_task_rows
+
+
+class Command(BaseCommand):
+    help = "Run registered periodic tasks (cron-style) with cross-node locking"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Run due tasks once and exit")
+        parser.add_argument('--list', action='store_true', help="Show registered tasks and exit")
+        parser.add_argument('--run', metavar='TASK', help="Run one task now (still takes its lock)")
+        parser.add_argument('--tick', type=float, default=20.0, help="Seconds between due-task checks")
+
+    def handle(self, *args, **options):
+        discover_tasks()
+        sync_task_rows()
+        node = node_name()
+
+        if options['list']:
+            return self.list_tasks()
+
+        if options['run']:
+            spec = registry.get(options['run'])
+            if spec is None:
+                raise CommandError(f"Unknown task {options['run']!r}. Known: {', '.join(sorted(registry))}")
+            run = run_task(spec, node, force=True)
+            if run is None:
+                raise CommandError(f"{spec.name} is disabled or running on another node")
+            return self.report(run)
+
+        self.stdout.write(f"Scheduler {node}: {len(registry)} tasks")
+        while True:
+            # Long-running loop outside the request cycle: drop connections
+            # past CONN_MAX_AGE or broken before claiming (run_task does the
+            # same after each run)
+            close_old_connections()
+            for spec in due_tasks():
+                run = run_task(spec, node)
+                if run is not None:
+                    self.report(run)
+            if options['once']:
+                return
+            time.sleep(options['tick'])
+
+    def report(self, run):
+        line = f"{timezone.localtime(run.started_at):%H:%M:%S} {run.task_name}: {run.status} in {run.duration_ms} ms"
+        if run.rows is not None:
+            line += f", {run.rows} rows"
+        if run.status == 'failed':
+            self.stderr.write(self.style.ERROR(line))
+            self.stderr.write(run.error)
+        else:
+            self.stdout.write(line)
+
+    def list_tasks(self):
+        for task in PeriodicTask.objects.filter(name__in=list(registry)):
+            last = TaskRun.objects.filter(task_name=task.name).first()
+            status = f"last {last.status} {last.duration_ms} ms, rows={last.rows}" if last else "never run"
+            flag = '' if task.enabled else ' [disabled]'
+            self.stdout.write(
+                f"{task.name:40} {task.schedule:16} next {task.next_run_at:%Y-%m-%d %H:%M}  {status}{flag}"
+            )
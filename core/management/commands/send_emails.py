@@ -0,0 +1,59 @@
+# core/management/commands/send_emails.py
+#
+#   python manage.py send_emails                 # long-running worker
+#   python manage.py send_emails --once          # drain what is due, then exit
+#   BREVO_API_URL=http://127.0.0.1:8025/v3/smtp/email python manage.py send_emails --once
+#
+# Delivers EmailOutbox rows through Brevo from a thread pool. Threads only do
+# HTTP (over the shared, pooled core.brevo client); claiming rows and recording
+# results stays on the main thread, so the worker holds a single DB connection
+# — checked each poll like a request would be (CONN_MAX_AGE, broken links).
+# Safe to run several copies.
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.brevo import get_brevo_client
+from core.emails import claim_due_emails, deliver, email_service_configured, record_delivery
+
+
+class Command(BaseCommand):
+    help = "Send queued outbound emails (EmailOutbox) with retries and backoff"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8, help="Concurrent Brevo requests")
+        parser.add_argument('--batch', type=int, default=50, help="Rows claimed per poll")
+        parser.add_argument('--poll-interval', type=float, default=2.0, help="Seconds to sleep when idle")
+        parser.add_argument('--once', action='store_true', help="Exit when nothing is due")
+
+    def handle(self, *args, **options):
+        if not email_service_configured():
+            self.stderr.write(self.style.WARNING("BREVO_API_KEY is not set — requests will be rejected"))
+
+        with ThreadPoolExecutor(max_workers=options['workers'], thread_name_prefix='send-email') as pool:
+            while True:
+                close_old_connections()
+                emails = claim_due_emails(options['batch'])
+                if not emails:
+                    if options['once']:
+                        return
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                by_id = {email.id: email for email in emails}
+                sent = failed = deferred = 0
+                for email_id, error, retryable, defer in pool.map(deliver, emails):
+                    record_delivery(by_id[email_id], error, retryable, defer)
+                    if error is None:
+                        sent += 1
+                    elif defer is not None:
+                        deferred += 1
+                    else:
+                        failed += 1
+                        self.stderr.write(f"email {email_id}: {error}")
+                self.stdout.write(
+                    f"sent {sent}, failed {failed}, deferred {deferred} | brevo {get_brevo_client().stats()}"
+                )
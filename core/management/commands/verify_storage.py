@@ -0,0 +1,39 @@
+# core/management/commands/verify_storage.py
+#
+#   python manage.py verify_storage                   # HEAD every unchecked file once
+#   python manage.py verify_storage --workers 32 --batch 500
+#   python manage.py verify_storage --recount         # rebuild User.storage_bytes from scratch
+#
+# Fills UserFile.size_bytes / content_type with bounded-concurrency HEAD
+# requests (R2 via the S3 API, anything else over HTTP) and adds each size to
+# the owner's User.storage_bytes. Also runs every few minutes from
+# run_scheduler (core.verify_file_sizes); safe to run alongside it.
+
+from django.core.management.base import BaseCommand
+
+from core.storage import recount_storage, verify_pending_files
+
+
+class Command(BaseCommand):
+    help = "HEAD-check new files for size / content type and update per-user storage totals"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=16, help="Concurrent HEAD requests")
+        parser.add_argument('--batch', type=int, default=200, help="Files per batch")
+        parser.add_argument('--recount', action='store_true', help="Recompute User.storage_bytes and exit")
+
+    def handle(self, *args, **options):
+        if options['recount']:
+            users = recount_storage()
+            self.stdout.write(f"recounted storage for {users} users")
+            return
+
+        def report(stats):
+            self.stdout.write(
+                f"checked {stats['checked']} ({stats['bytes'] / 1024 / 1024:.1f} MB), "
+                f"missing {stats['missing']}, errors {stats['errors']}"
+            )
+
+        totals = verify_pending_files(options['workers'], options['batch'], on_batch=report)
+        self.stdout.write("total: ", ending='')
+        report(totals)
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_sitesettings_custom_ad_script_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userfile',
+            index=models.Index(fields=['user', '-created_at'], name='userfile_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0019_userfile_user_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['-created_at'], name='user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userfile',
+            index=models.Index(fields=['-created_at'], name='userfile_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='withdrawal',
+            index=models.Index(fields=['-requested_at'], name='withdrawal_requested_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='withdrawal',
+            index=models.Index(fields=['status', '-requested_at'], name='withdrawal_status_req_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:06
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            "UPDATE core_userfile SET search_vector = "
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+        )
+        # btree_gin lets one GIN index cover "user_id = ? AND search_vector @@ ?"
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS userfile_user_search_gin "
+            "ON core_userfile USING gin (user_id, search_vector)"
+        )
+    elif vendor == 'sqlite':
+        # Dev fallback: FTS5 shadow table, rowid = userfile.id
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS core_userfile_fts USING fts5(title, description)"
+        )
+        schema_editor.execute(
+            "INSERT INTO core_userfile_fts (rowid, title, description) "
+            "SELECT id, title, description FROM core_userfile"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS userfile_user_search_gin")
+    elif vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS core_userfile_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_admin_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userfile',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
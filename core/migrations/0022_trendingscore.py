@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_userfile_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('file', 'File'), ('drama', 'Drama'), ('category', 'Drama Category')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('score', models.FloatField(default=0)),
+                ('window_views', models.BigIntegerField(default=0, help_text='Raw views inside the scoring window')),
+                ('computed_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', '-score'], name='trending_kind_score_idx')],
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_trendingscore'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('file', 'File'), ('drama', 'Drama')], max_length=10)),
+                ('source_id', models.BigIntegerField()),
+                ('target_id', models.BigIntegerField()),
+                ('score', models.FloatField()),
+                ('co_views', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'source_id', '-score'], name='related_source_score_idx')],
+                'unique_together': {('kind', 'source_id', 'target_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0024_emailoutbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PeriodicTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('schedule', models.CharField(help_text='Cron expression: minute hour day month weekday (UTC)', max_length=100)),
+                ('enabled', models.BooleanField(default=True)),
+                ('next_run_at', models.DateTimeField()),
+                ('last_run_at', models.DateTimeField(blank=True, null=True)),
+                ('locked_by', models.CharField(blank=True, max_length=100)),
+                ('locked_until', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TaskRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_name', models.CharField(max_length=100)),
+                ('node', models.CharField(max_length=100)),
+                ('started_at', models.DateTimeField()),
+                ('duration_ms', models.PositiveIntegerField(default=0)),
+                ('rows', models.BigIntegerField(blank=True, help_text='Rows touched, as reported by the task', null=True)),
+                ('status', models.CharField(choices=[('success', 'Success'), ('failed', 'Failed')], max_length=10)),
+                ('error', models.TextField(blank=True)),
+            ],
+            options={
+                'ordering': ['-started_at'],
+                'indexes': [models.Index(fields=['task_name', '-started_at'], name='taskrun_task_started_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0027_storedobject'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sitesettings',
+            name='storage_quota_mb',
+            field=models.PositiveIntegerField(default=0, help_text='Per-user storage limit in MB (0 = unlimited)'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='storage_bytes',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userfile',
+            name='content_type',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='userfile',
+            name='size_bytes',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='userfile',
+            name='size_checked_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='userfile',
+            index=models.Index(condition=models.Q(('size_checked_at__isnull', True)), fields=['id'], name='userfile_unsized_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:28
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0028_storage_accounting'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LinkCheck',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.CharField(max_length=500, unique=True)),
+                ('host', models.CharField(max_length=255)),
+                ('status_code', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('etag', models.CharField(blank=True, max_length=255)),
+                ('last_modified', models.CharField(blank=True, max_length=64)),
+                ('failures', models.PositiveSmallIntegerField(default=0, help_text='Consecutive failed checks')),
+                ('is_dead', models.BooleanField(default=False)),
+                ('last_error', models.CharField(blank=True, max_length=255)),
+                ('checked_at', models.DateTimeField(blank=True, null=True)),
+                ('next_check_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['is_dead', 'next_check_at'], name='linkcheck_due_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0029_linkcheck'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='signup_pending',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0030_user_signup_pending'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PresignedUpload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=500, unique=True)),
+                ('sha256', models.CharField(max_length=64)),
+                ('size', models.BigIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='presigned_uploads', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0031_presignedupload'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='linkcheck',
+            name='linkcheck_due_idx',
+        ),
+        migrations.AddField(
+            model_name='linkcheck',
+            name='deactivated',
+            field=models.JSONField(blank=True, default=dict, help_text='{model label: [pk, ...]} switched off'),
+        ),
+        migrations.AddIndex(
+            model_name='linkcheck',
+            index=models.Index(fields=['next_check_at'], name='linkcheck_due_idx'),
+        ),
+    ]
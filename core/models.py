@@ -1,20 +1,35 @@
 # core/models.py → UPDATED FOR IMAGEKIT.IO DIRECT UPLOAD (NO SERVER STORAGE)
 
 from django.db import models
+from django.db.models import Q
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.search import SearchVectorField
 from django.utils import timezone
 from datetime import timedelta
 from decimal import Decimal
 import random
 import string
 
+from .search import FullTextIndex
+
 
 def generate_api_key():
     return ''.join(random.choices(string.ascii_letters + string.digits, k=32))
 
 
 def generate_short_code():
-    return ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
+    """Next code from the collision-free allocator (core/shortcodes.py)."""
+    from .shortcodes import allocate_short_codes
+    return allocate_short_codes(1)[0]
+
+
+class ShortCodeSequence(models.Model):
+    """Monotonic counter behind core.shortcodes; one row per sequence name."""
+    name = models.CharField(max_length=50, unique=True)
+    next_value = models.BigIntegerField(default=1)
+
+    def __str__(self):
+        return f"{self.name} → {self.next_value}"
 
 
 class User(AbstractUser):
@@ -28,6 +43,8 @@ class User(AbstractUser):
     youtube = models.CharField(max_length=255, blank=True, null=True)
     website = models.CharField(max_length=255, blank=True, null=True)
     email_verified = models.BooleanField(default=False)
+    # True only between OTP signup and signup_verify; cleanup_unverified_signups keys on it
+    signup_pending = models.BooleanField(default=False)
     email_otp = models.CharField(max_length=6, blank=True, null=True)
     email_otp_expiry = models.DateTimeField(null=True, blank=True)
     phone = models.CharField(max_length=15, blank=True)
@@ -38,8 +55,15 @@ class User(AbstractUser):
     total_earnings = models.DecimalField(max_digits=12, decimal_places=2, default=0.00)
     pending_earnings = models.DecimalField(max_digits=12, decimal_places=2, default=0.00)
     paid_earnings = models.DecimalField(max_digits=12, decimal_places=2, default=0.00)
+    # Sum of UserFile.size_bytes — kept up to date by verify_storage / the UserFile post_delete signal
+    storage_bytes = models.PositiveBigIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['-created_at'], name='user_created_idx'),
+        ]
+
     groups = models.ManyToManyField(
         'auth.Group',
         related_name='core_user_set',
@@ -57,6 +81,36 @@ class User(AbstractUser):
         return self.username
 
 
+class StoredObject(models.Model):
+    """
+    One R2 object, shared by every UserFile with the same content.
+    `refcount` counts those files; the object is deleted when it drops to zero.
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    size = models.BigIntegerField()
+    key = models.CharField(max_length=500, unique=True)
+    refcount = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.key} ×{self.refcount}"
+
+
+class PresignedUpload(models.Model):
+    """
+    A sha256-bound presigned PUT we issued. Only the user it was issued to can
+    turn that key into a StoredObject, and only for that hash and size.
+    """
+    key = models.CharField(max_length=500, unique=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='presigned_uploads')
+    sha256 = models.CharField(max_length=64)
+    size = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return self.key
+
+
 class UserFile(models.Model):
     FILE_TYPE_CHOICES = (
         ('video', 'Video'),
@@ -98,8 +152,29 @@ class UserFile(models.Model):
     unique_downloads = models.BigIntegerField(default=0)
     download_earnings = models.DecimalField(max_digits=10, decimal_places=4, default=0.0000)
 
+    # Filled by the verify_storage HEAD worker (core/storage.py)
+    size_bytes = models.PositiveBigIntegerField(null=True, blank=True)
+    content_type = models.CharField(max_length=100, blank=True)
+    size_checked_at = models.DateTimeField(null=True, blank=True)
+
+    # Deduplicated upload (content-hash registrations only)
+    stored_object = models.ForeignKey(
+        StoredObject, on_delete=models.SET_NULL, null=True, blank=True, related_name='files'
+    )
+
+    # Creator's own-file search (Postgres; per-user GIN index in migration 0021)
+    search_vector = SearchVectorField(null=True, editable=False)
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # MyFilesView keyset pagination: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+            models.Index(fields=['user', '-created_at'], name='userfile_user_created_idx'),
+            # Admin all-files listing
+            models.Index(fields=['-created_at'], name='userfile_created_idx'),
+            # verify_storage queue: files not HEAD-checked yet
+            models.Index(fields=['id'], name='userfile_unsized_idx', condition=Q(size_checked_at__isnull=True)),
+        ]
 
     def __str__(self):
         return self.title
@@ -108,6 +183,18 @@ class UserFile(models.Model):
         from django.urls import reverse
         return reverse('public_file_view', kwargs={'short_code': self.short_code})
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        if UserFile.search_index.needs_refresh(kwargs.get('update_fields')):
+            UserFile.search_index.refresh([self.pk])
+
+
+UserFile.search_index = FullTextIndex(
+    UserFile,
+    {'title': 'A', 'description': 'B'},
+    fts_table='core_userfile_fts',
+)
+
 
 class FileView(models.Model):
     file = models.ForeignKey(UserFile, on_delete=models.CASCADE, related_name='file_views')
@@ -139,6 +226,169 @@ class FileDownload(models.Model):
         return f"Download: {self.file.title} by {self.ip_address}"
 
 
+class TrendingScore(models.Model):
+    """
+    Precomputed, time-decayed popularity per item (compute_trending command).
+    Public listings order by this instead of sorting raw counters on the fly.
+    """
+    KIND_CHOICES = (
+        ('file', 'File'),
+        ('drama', 'Drama'),
+        ('category', 'Drama Category'),
+    )
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    score = models.FloatField(default=0)
+    window_views = models.BigIntegerField(default=0, help_text="Raw views inside the scoring window")
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('kind', 'object_id')
+        indexes = [
+            models.Index(fields=['kind', '-score'], name='trending_kind_score_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}:{self.object_id} = {self.score:.3f}"
+
+
+class RelatedItem(models.Model):
+    """
+    Top-k "viewers also watched" neighbours per item (compute_related command).
+    score = cosine similarity of the two items' viewer sets (same IP, same day).
+    """
+    KIND_CHOICES = (
+        ('file', 'File'),
+        ('drama', 'Drama'),
+    )
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    source_id = models.BigIntegerField()
+    target_id = models.BigIntegerField()
+    score = models.FloatField()
+    co_views = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('kind', 'source_id', 'target_id')
+        indexes = [
+            models.Index(fields=['kind', 'source_id', '-score'], name='related_source_score_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}:{self.source_id} → {self.target_id} ({self.score:.3f})"
+
+
+class EmailOutbox(models.Model):
+    """
+    Outbound transactional mail. Views insert a row and return; the
+    `send_emails` worker delivers it through Brevo with retries.
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    )
+
+    to_email = models.EmailField()
+    to_name = models.CharField(max_length=150, blank=True)
+    sender_name = models.CharField(max_length=100)
+    sender_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    html_content = models.TextField()
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(null=True, blank=True, help_text="Worker lease while status is 'sending'")
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} → {self.to_email} ({self.status})"
+
+
+class PeriodicTask(models.Model):
+    """
+    One row per task registered with core.scheduler. The row doubles as the
+    cross-node lock: a scheduler claims a due task with a conditional UPDATE
+    on locked_until, so with several nodes up only one of them runs it.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    schedule = models.CharField(max_length=100, help_text="Cron expression: minute hour day month weekday (UTC)")
+    enabled = models.BooleanField(default=True)
+    next_run_at = models.DateTimeField()
+    last_run_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return f"{self.name} [{self.schedule}]"
+
+
+class TaskRun(models.Model):
+    STATUS_CHOICES = (
+        ('success', 'Success'),
+        ('failed', 'Failed'),
+    )
+
+    task_name = models.CharField(max_length=100)
+    node = models.CharField(max_length=100)
+    started_at = models.DateTimeField()
+    duration_ms = models.PositiveIntegerField(default=0)
+    rows = models.BigIntegerField(null=True, blank=True, help_text="Rows touched, as reported by the task")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['task_name', '-started_at'], name='taskrun_task_started_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task_name} @ {self.started_at:%Y-%m-%d %H:%M} ({self.status})"
+
+
+class LinkCheck(models.Model):
+    """
+    Health of one external URL (UserFile.external_file_url /
+    DramaEpisode.video_url), maintained by `check_links`. Validators are kept
+    so unchanged targets answer 304 on the next round. Dead links keep being
+    rechecked on a slow schedule; `deactivated` remembers which rows the
+    checker switched off so a revived URL switches exactly those back on.
+    """
+    url = models.CharField(max_length=500, unique=True)
+    host = models.CharField(max_length=255)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    etag = models.CharField(max_length=255, blank=True)
+    last_modified = models.CharField(max_length=64, blank=True)
+    failures = models.PositiveSmallIntegerField(default=0, help_text="Consecutive failed checks")
+    is_dead = models.BooleanField(default=False)
+    deactivated = models.JSONField(default=dict, blank=True, help_text="{model label: [pk, ...]} switched off")
+    last_error = models.CharField(max_length=255, blank=True)
+    checked_at = models.DateTimeField(null=True, blank=True)
+    next_check_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['next_check_at'], name='linkcheck_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.url} ({'dead' if self.is_dead else self.status_code})"
+
+
 # core/models.py → Withdrawal model में ये changes करो
 
 class Withdrawal(models.Model):
@@ -168,6 +418,12 @@ class Withdrawal(models.Model):
     requested_at = models.DateTimeField(auto_now_add=True)
     processed_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-requested_at'], name='withdrawal_requested_idx'),
+            models.Index(fields=['status', '-requested_at'], name='withdrawal_status_req_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user} - ${self.amount} - {self.get_payment_method_display()} - {self.status}"
 
@@ -253,6 +509,11 @@ class SiteSettings(models.Model):
         help_text="YouTube channel full URL (e.g. https://www.youtube.com/@yourchannel)"
     )
 
+    storage_quota_mb = models.PositiveIntegerField(
+        default=0,
+        help_text="Per-user storage limit in MB (0 = unlimited)"
+    )
+
     class Meta:
         verbose_name = "Site Setting"
         verbose_name_plural = "Site Settings"
@@ -264,6 +525,10 @@ class SiteSettings(models.Model):
     def get_settings(cls):
         return cls.objects.first() or cls.objects.create()
 
+    @classmethod
+    async def aget_settings(cls):
+        return await cls.objects.afirst() or await cls.objects.acreate()
+
 
 class BotLink(models.Model):
     name = models.CharField(max_length=100, help_text="Bot ka naam (jaise TB Converter)")
@@ -0,0 +1,109 @@
+# core/pagination.py
+# Keyset (cursor) pagination — "WHERE (created_at, id) < (last_created_at, last_id)"
+# instead of OFFSET, so every page costs the same no matter how deep the client scrolls.
+
+import base64
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opaque-cursor pagination over a fixed, unique ordering.
+
+    `ordering` must end with a unique column (normally `id`) so the keyset
+    is total. Query params: ?cursor=<opaque>&page_size=<n>.
+    Works with model instances and with `.values()` dict rows.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+
+    def __init__(self, ordering=None, page_size=None, max_page_size=None):
+        if ordering is not None:
+            self.ordering = tuple(ordering)
+        if page_size is not None:
+            self.page_size = page_size
+        if max_page_size is not None:
+            self.max_page_size = max_page_size
+        self.next_cursor = None
+
+    # ---------- cursor encoding ----------
+    def encode_cursor(self, values):
+        raw = json.dumps(values, default=str, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        except (ValueError, TypeError):
+            raise ValidationError({"cursor": "Invalid cursor"})
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise ValidationError({"cursor": "Invalid cursor"})
+        return values
+
+    # ---------- helpers ----------
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            size = self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def _fields(self):
+        return [(f.lstrip('-'), f.startswith('-')) for f in self.ordering]
+
+    def keyset_filter(self, values):
+        """(a, b) after (va, vb) → a <op> va OR (a = va AND b <op> vb)"""
+        fields = self._fields()
+        condition = Q()
+        for i, (name, desc) in enumerate(fields):
+            term = Q(**{f"{name}__{'lt' if desc else 'gt'}": values[i]})
+            for j in range(i):
+                term &= Q(**{fields[j][0]: values[j]})
+            condition |= term
+        return condition
+
+    def row_values(self, row):
+        if isinstance(row, dict):
+            return [row[name] for name, _ in self._fields()]
+        return [getattr(row, name) for name, _ in self._fields()]
+
+    # ---------- DRF pagination API ----------
+    def paginate_queryset(self, queryset, request, view=None):
+        cursor = request.query_params.get(self.cursor_query_param)
+        return self.page(queryset, self.get_page_size(request), cursor)
+
+    def page(self, queryset, size, cursor=None):
+        """One page after `cursor` (or the first page); sets self.next_cursor."""
+        queryset = queryset.order_by(*self.ordering)
+        if cursor:
+            queryset = queryset.filter(self.keyset_filter(self.decode_cursor(cursor)))
+
+        rows = list(queryset[:size + 1])
+        has_more = len(rows) > size
+        rows = rows[:size]
+        self.next_cursor = self.encode_cursor(self.row_values(rows[-1])) if has_more else None
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            'results': data,
+            'next_cursor': self.next_cursor,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'results': schema,
+                'next_cursor': {'type': 'string', 'nullable': True},
+            },
+        }
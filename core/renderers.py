@@ -0,0 +1,75 @@
+# core/renderers.py
+# NDJSON (one JSON object per line) for full admin exports.
+# DRF treats ?format=ndjson as a renderer override, so the renderer must be
+# registered on the view (ADMIN_RENDERERS); the rows themselves go out via
+# ndjson_stream(). admin_list_response() is the shared tail of every admin
+# listing (core and drama): NDJSON export or one keyset page.
+
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+from rest_framework.settings import api_settings
+
+from .pagination import KeysetPagination
+from .utils import chunked
+
+ADMIN_EXPORT_CHUNK = 2000
+
+
+class NDJSONRenderer(BaseRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Only hit for non-streamed responses (errors, permission denied, ...)
+        if data is None:
+            return b''
+        rows = data if isinstance(data, list) else [data]
+        return ''.join(_dump(row) for row in rows).encode(self.charset)
+
+
+def _dump(row):
+    return json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+def wants_ndjson(request):
+    return request.query_params.get('format') == NDJSONRenderer.format
+
+
+def ndjson_stream(rows, filename=None):
+    """Stream an iterable of dicts as NDJSON without building the body in memory."""
+    response = StreamingHttpResponse(
+        (_dump(row) for row in rows),
+        content_type=f"{NDJSONRenderer.media_type}; charset=utf-8",
+    )
+    if filename:
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+ADMIN_RENDERERS = api_settings.DEFAULT_RENDERER_CLASSES + [NDJSONRenderer]
+
+
+def admin_list_response(request, qs, to_row, filename, ordering=('-created_at', '-id'), attach=None):
+    """
+    Shared tail of the admin listings:
+    ?format=ndjson → full export streamed with .iterator(); otherwise one keyset page.
+    `attach(rows)` may decorate a batch of rows with per-batch aggregates.
+    """
+    if wants_ndjson(request):
+        def rows():
+            for batch in chunked(qs.order_by(*ordering).iterator(chunk_size=ADMIN_EXPORT_CHUNK), ADMIN_EXPORT_CHUNK):
+                if attach:
+                    attach(batch)
+                for r in batch:
+                    yield to_row(r)
+        return ndjson_stream(rows(), filename=filename)
+
+    paginator = KeysetPagination(ordering=ordering)
+    page = paginator.paginate_queryset(qs, request)
+    if attach:
+        attach(page)
+    return paginator.get_paginated_response([to_row(r) for r in page])
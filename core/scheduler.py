@@ -0,0 +1,236 @@
+# core/scheduler.py
+# Cron-style periodic tasks, run by `python manage.py run_scheduler`.
+#
+# Each app declares its tasks in a `tasks.py` module:
+#
+#   from core.scheduler import periodic_task
+#
+#   @periodic_task('*/15 * * * *')
+#   def expire_notifications():
+#       return BroadcastNotification.objects.filter(...).update(is_active=False)
+#
+# A task returns the number of rows it touched (an int, a dict of ints, or
+# None); that number and the duration land in TaskRun for capacity planning.
+# Schedules are UTC.
+
+import os
+import socket
+import time
+import traceback
+from dataclasses import dataclass
+from datetime import timedelta, timezone as dt_timezone
+
+from django.db import close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+# ========================
+# CRON EXPRESSIONS
+# ========================
+CRON_FIELDS = (
+    ('minute', 0, 59),
+    ('hour', 0, 23),
+    ('day', 1, 31),
+    ('month', 1, 12),
+    ('weekday', 0, 7),      # 0 and 7 = Sunday
+)
+
+
+class CronError(ValueError):
+    pass
+
+
+def _parse_field(text, low, high, name):
+    values = set()
+    for part in text.split(','):
+        step = 1
+        if '/' in part:
+            part, step_text = part.split('/', 1)
+            if not step_text.isdigit() or int(step_text) == 0:
+                raise CronError(f"Bad step in {name}: {text!r}")
+            step = int(step_text)
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start_text, end_text = part.split('-', 1)
+            if not (start_text.isdigit() and end_text.isdigit()):
+                raise CronError(f"Bad range in {name}: {text!r}")
+            start, end = int(start_text), int(end_text)
+        elif part.isdigit():
+            start = end = int(part)
+            if step != 1:
+                end = high
+        else:
+            raise CronError(f"Bad value in {name}: {text!r}")
+        if not (low <= start <= high and low <= end <= high and start <= end):
+            raise CronError(f"{name} out of range {low}-{high}: {text!r}")
+        values.update(range(start, end + 1, step))
+    if name == 'weekday':
+        values = {v % 7 for v in values}
+    return frozenset(values)
+
+
+class CronSchedule:
+    """Five-field cron expression: minute hour day-of-month month day-of-week."""
+
+    def __init__(self, expression):
+        parts = expression.split()
+        if len(parts) != 5:
+            raise CronError(f"Expected 5 fields, got {expression!r}")
+        self.expression = expression
+        fields = {name: _parse_field(text, low, high, name) for text, (name, low, high) in zip(parts, CRON_FIELDS)}
+        self.minutes = fields['minute']
+        self.hours = fields['hour']
+        self.days = fields['day']
+        self.months = fields['month']
+        self.weekdays = fields['weekday']
+        # Classic cron: if both day fields are restricted, either may match
+        self.day_any = parts[2] != '*' and parts[4] != '*'
+
+    def _day_matches(self, dt):
+        weekday = (dt.weekday() + 1) % 7
+        if self.day_any:
+            return dt.day in self.days or weekday in self.weekdays
+        return dt.day in self.days and weekday in self.weekdays
+
+    def next_after(self, dt):
+        """First matching minute strictly after `dt` (aware datetimes, evaluated in UTC)."""
+        dt = dt.astimezone(dt_timezone.utc).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = dt + timedelta(days=366 * 5)
+        while dt < limit:
+            if dt.month not in self.months or not self._day_matches(dt):
+                dt = (dt + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if dt.hour not in self.hours:
+                dt = (dt + timedelta(hours=1)).replace(minute=0)
+                continue
+            if dt.minute not in self.minutes:
+                dt += timedelta(minutes=1)
+                continue
+            return dt
+        raise CronError(f"{self.expression!r} never fires")
+
+
+# ========================
+# REGISTRY
+# ========================
+@dataclass
+class TaskSpec:
+    name: str
+    func: object
+    schedule: CronSchedule
+    lease: timedelta
+
+
+registry = {}
+
+
+def periodic_task(schedule, name=None, lease=timedelta(minutes=30)):
+    """
+    Register a task. `lease` bounds how long other nodes wait before assuming
+    a node that claimed the task has died; keep it above the task's worst runtime.
+    """
+    cron = CronSchedule(schedule)
+
+    def decorator(func):
+        task_name = name or f"{func.__module__.rsplit('.', 2)[0]}.{func.__name__}"
+        registry[task_name] = TaskSpec(task_name, func, cron, lease)
+        return func
+    return decorator
+
+
+def discover_tasks():
+    autodiscover_modules('tasks')
+    return registry
+
+
+def node_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+# ========================
+# RUNNING
+# ========================
+def sync_task_rows(now=None):
+    """Create / update one PeriodicTask row per registered task."""
+    from .models import PeriodicTask
+
+    now = now or timezone.now()
+    rows = {row.name: row for row in PeriodicTask.objects.all()}
+    for spec in registry.values():
+        row = rows.get(spec.name)
+        if row is None:
+            PeriodicTask.objects.get_or_create(
+                name=spec.name,
+                defaults={'schedule': spec.schedule.expression, 'next_run_at': spec.schedule.next_after(now)},
+            )
+        elif row.schedule != spec.schedule.expression:
+            PeriodicTask.objects.filter(pk=row.pk).update(
+                schedule=spec.schedule.expression, next_run_at=spec.schedule.next_after(now)
+            )
+
+
+def claim_task(spec, node, now=None, force=False):
+    """
+    Atomically take the task's lease. The conditional UPDATE is the lock: it
+    matches only while the lease is free (and, unless forced, the task is due),
+    so exactly one node's UPDATE returns 1.
+    """
+    from .models import PeriodicTask
+
+    now = now or timezone.now()
+    qs = PeriodicTask.objects.filter(name=spec.name, enabled=True).filter(
+        Q(locked_until__isnull=True) | Q(locked_until__lt=now)
+    )
+    if not force:
+        qs = qs.filter(next_run_at__lte=now)
+    return qs.update(locked_by=node, locked_until=now + spec.lease) == 1
+
+
+def run_task(spec, node, force=False):
+    """Run one task if this node wins its lease; returns the TaskRun or None."""
+    from .models import PeriodicTask, TaskRun
+
+    if not claim_task(spec, node, force=force):
+        return None
+
+    started_at = timezone.now()
+    started = time.perf_counter()
+    rows, error = None, ''
+    try:
+        result = spec.func()
+        if isinstance(result, dict):        # e.g. {'drama': 120, 'category': 9}
+            result = sum(v for v in result.values() if isinstance(v, int))
+        rows = result if isinstance(result, int) else None
+    except Exception:
+        error = traceback.format_exc()
+    # A long or failed task may leave the connection past CONN_MAX_AGE or
+    # broken — record the run on a healthy one
+    close_old_connections()
+
+    finished = timezone.now()
+    run = TaskRun.objects.create(
+        task_name=spec.name,
+        node=node,
+        started_at=started_at,
+        duration_ms=int((time.perf_counter() - started) * 1000),
+        rows=rows,
+        status='failed' if error else 'success',
+        error=error,
+    )
+    PeriodicTask.objects.filter(name=spec.name, locked_by=node).update(
+        last_run_at=started_at,
+        next_run_at=spec.schedule.next_after(finished),
+        locked_by='',
+        locked_until=None,
+    )
+    return run
+
+
+def due_tasks(now=None):
+    from .models import PeriodicTask
+
+    now = now or timezone.now()
+    names = PeriodicTask.objects.filter(enabled=True, next_run_at__lte=now).values_list('name', flat=True)
+    return [registry[name] for name in names if name in registry]
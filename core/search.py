@@ -0,0 +1,154 @@
+# core/search.py
+# Full-text search index shared by the apps.
+#
+# Postgres (production): a `search_vector` tsvector column on the model, GIN
+# indexed, refreshed with one set-based UPDATE whenever the source text changes.
+# SQLite (local dev):    an FTS5 shadow table keyed by rowid = model pk.
+#
+# The GIN index / FTS5 table themselves are created by vendor-aware migrations.
+
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import BigIntegerField, F, Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+from django.db.models.signals import post_delete
+
+from .utils import chunked
+
+SEARCH_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+MAX_SEARCH_TOKENS = 8
+
+# Postgres setweight() letters → FTS5 bm25() column weights
+FTS5_WEIGHTS = {'A': 10.0, 'B': 4.0, 'C': 2.0, 'D': 1.0}
+
+# search_rank is the score scaled to an integer so keyset cursors on
+# (-search_rank, -id) compare exactly: a float4 ts_rank written into a cursor
+# and read back as float8 no longer equals itself, which skipped or repeated
+# rows across pages.
+RANK_SCALE = 10 ** 9
+
+
+def search_tokens(term):
+    return SEARCH_TOKEN_RE.findall(term or '')[:MAX_SEARCH_TOKENS]
+
+
+class FullTextIndex:
+    """
+    Weighted index over some text columns of one model.
+
+        index = FullTextIndex(Drama, {'title': 'A', 'description': 'B'}, 'drama_drama_fts')
+        index.refresh([drama.pk])            # after save
+        qs = index.search(qs, 'love story')  # filtered + annotated with search_rank
+
+    search_rank: higher is better on both backends, an integer (score ×
+    RANK_SCALE). Every query token is prefix-matched, so partial words
+    typed into a search box still hit. Deleted rows drop out of the FTS5
+    table through a post_delete receiver.
+    """
+    config = 'simple'  # titles mix Hindi/English — no stemming
+    vector_field = 'search_vector'
+
+    def __init__(self, model, fields, fts_table):
+        self.model = model
+        self.fields = fields
+        self.fts_table = fts_table
+        post_delete.connect(self._deleted, sender=model, weak=False, dispatch_uid=f'fts:{fts_table}')
+
+    @property
+    def vendor(self):
+        return connection.vendor
+
+    def vector_expression(self):
+        vector = None
+        for field, weight in self.fields.items():
+            part = SearchVector(field, weight=weight, config=self.config)
+            vector = part if vector is None else vector + part
+        return vector
+
+    def needs_refresh(self, update_fields):
+        """save(update_fields=['views', ...]) from counters must not rewrite the index."""
+        return update_fields is None or bool(set(update_fields) & set(self.fields))
+
+    # ---------- maintenance ----------
+    def refresh(self, pks):
+        pks = list(pks)
+        if not pks:
+            return
+        if self.vendor == 'postgresql':
+            self.model._base_manager.filter(pk__in=pks).update(
+                **{self.vector_field: self.vector_expression()}
+            )
+        elif self.vendor == 'sqlite':
+            self._sqlite_refresh(pks)
+
+    def discard(self, pks):
+        """Drop rows from the index (the Postgres column goes with the row itself)."""
+        pks = list(pks)
+        if pks and self.vendor == 'sqlite':
+            placeholders = ', '.join(['%s'] * len(pks))
+            with connection.cursor() as cursor:
+                cursor.execute(f"DELETE FROM {self.fts_table} WHERE rowid IN ({placeholders})", pks)
+
+    def _deleted(self, sender, instance, **kwargs):
+        self.discard([instance.pk])
+
+    def rebuild(self, queryset=None, batch_size=5000):
+        """Re-index every row (or `queryset`) in pk batches; returns rows touched."""
+        queryset = self.model._base_manager.all() if queryset is None else queryset
+        total = 0
+        for pks in chunked(queryset.order_by('pk').values_list('pk', flat=True).iterator(chunk_size=batch_size), batch_size):
+            self.refresh(pks)
+            total += len(pks)
+        return total
+
+    def _sqlite_refresh(self, pks):
+        table = self.model._meta.db_table
+        columns = ', '.join(self.fields)
+        placeholders = ', '.join(['%s'] * len(pks))
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.fts_table} WHERE rowid IN ({placeholders})", pks)
+            cursor.execute(
+                f"INSERT INTO {self.fts_table} (rowid, {columns}) "
+                f"SELECT id, {columns} FROM {table} WHERE id IN ({placeholders})",
+                pks,
+            )
+
+    # ---------- querying ----------
+    def search(self, queryset, term):
+        tokens = search_tokens(term)
+        if not tokens:
+            return queryset.none().annotate(search_rank=Value(0, output_field=BigIntegerField()))
+
+        if self.vendor == 'postgresql':
+            query = SearchQuery(
+                ' & '.join(f"{t}:*" for t in tokens), search_type='raw', config=self.config
+            )
+            return queryset.filter(**{self.vector_field: query}).annotate(
+                search_rank=Cast(SearchRank(F(self.vector_field), query) * RANK_SCALE, BigIntegerField())
+            )
+
+        if self.vendor == 'sqlite':
+            match = ' '.join('"%s"*' % t.replace('"', '') for t in tokens)
+            table = self.model._meta.db_table
+            weights = ', '.join(str(FTS5_WEIGHTS[w]) for w in self.fields.values())
+            # Join the FTS5 table (a correlated subquery would re-run MATCH per row)
+            return queryset.extra(
+                tables=[self.fts_table],
+                where=[f"{self.fts_table}.rowid = {table}.id", f"{self.fts_table} MATCH %s"],
+                params=[match],
+            ).annotate(
+                # bm25() is lower-is-better; negate so both backends sort DESC
+                search_rank=RawSQL(
+                    f"CAST(-bm25({self.fts_table}, {weights}) * {RANK_SCALE} AS INTEGER)", [],
+                    output_field=BigIntegerField(),
+                )
+            )
+
+        # Other backends: unranked substring match
+        condition = Q()
+        for field in self.fields:
+            condition |= Q(**{f"{field}__icontains": term})
+        return queryset.filter(condition).annotate(search_rank=Value(0, output_field=BigIntegerField()))
@@ -29,9 +29,9 @@ class UserProfileSerializer(serializers.ModelSerializer):
             'youtube', 'website',
             'telegram_channel', 'support_link', 'allow_download',
             'total_earnings', 'pending_earnings', 'paid_earnings',
-            'api_key', 'email_verified'
+            'api_key', 'email_verified', 'storage_bytes'
         ]
-        read_only_fields = ['total_earnings', 'pending_earnings', 'paid_earnings', 'api_key']
+        read_only_fields = ['total_earnings', 'pending_earnings', 'paid_earnings', 'api_key', 'storage_bytes']
 
     def to_internal_value(self, data):
         if not isinstance(data, dict):
@@ -59,7 +59,8 @@ class FileSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'title', 'file_url', 'thumbnail_url', 'uploaded_by',  # ← uploaded_by add kiya
             'file_type', 'views', 'short_code', 'is_active', 'created_at',
-            'downloads', 'download_earnings', 'allow_download'
+            'downloads', 'download_earnings', 'allow_download',
+            'size_bytes', 'content_type',
         ]
 
     def get_file_url(self, obj):
@@ -118,6 +119,7 @@ class SiteSettingsSerializer(serializers.ModelSerializer):
             # नए फील्ड्स (third-party ads के लिए)
             'custom_ad_script',
             'custom_ad_script_enabled',
+            'storage_quota_mb',
         ]
 
 # core/serializers.py → end mein add
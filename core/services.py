@@ -1,7 +1,15 @@
 # core/services.py
 
+import heapq
+import math
+from datetime import timedelta
 from decimal import Decimal
 
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
 def calculate_earnings_per_1000_views(views: int, rate_per_1000: Decimal) -> Decimal:
     """
     Calculate earnings based on per 1000 views rate
@@ -28,4 +36,196 @@ def detect_file_type(file_name_or_type):
     """
     Dummy function - file_type ab frontend se direct aata hai
     """
-    return "other"
\ No newline at end of file
+    return "other"
+
+
+# ========================
+# TRENDING (time-decayed popularity)
+# ========================
+TRENDING_HALF_LIFE_DAYS = 3
+TRENDING_WINDOW_DAYS = 30
+
+
+def decayed_scores(daily_counts, today, half_life_days=TRENDING_HALF_LIFE_DAYS):
+    """
+    daily_counts: iterable of (object_id, day, count) — one row per item per day.
+    score = Σ count · 0.5^(age_days / half_life): a view today is worth 1,
+    a view one half-life ago 0.5, so old hits fade instead of winning forever.
+    Returns {object_id: [score, raw_views]}.
+    """
+    decay = math.log(2) / half_life_days
+    scores = {}
+    for object_id, day, count in daily_counts:
+        age = max((today - day).days, 0)
+        entry = scores.setdefault(object_id, [0.0, 0])
+        entry[0] += count * math.exp(-decay * age)
+        entry[1] += count
+    return scores
+
+
+def merge_scores(*score_maps):
+    merged = {}
+    for scores in score_maps:
+        for object_id, (score, views) in scores.items():
+            entry = merged.setdefault(object_id, [0.0, 0])
+            entry[0] += score
+            entry[1] += views
+    return merged
+
+
+def store_trending_scores(kind, scores, computed_at, batch_size=1000):
+    """Upsert this run's scores for `kind` and drop items that fell out of the window."""
+    from .models import TrendingScore
+
+    rows = [
+        TrendingScore(kind=kind, object_id=object_id, score=score, window_views=views, computed_at=computed_at)
+        for object_id, (score, views) in scores.items()
+    ]
+    with transaction.atomic():
+        TrendingScore.objects.bulk_create(
+            rows,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['kind', 'object_id'],
+            update_fields=['score', 'window_views', 'computed_at'],
+        )
+        TrendingScore.objects.filter(kind=kind, computed_at__lt=computed_at).delete()
+    return len(rows)
+
+
+def compute_file_trending(now=None):
+    """Daily FileView rollup over the window → decayed file scores. Returns rows stored."""
+    from .models import FileView
+
+    now = now or timezone.now()
+    daily = FileView.objects.filter(
+        viewed_at__gte=now - timedelta(days=TRENDING_WINDOW_DAYS)
+    ).annotate(day=TruncDate('viewed_at')).values_list('file_id', 'day').annotate(n=Count('id')).order_by()
+
+    scores = decayed_scores(daily.iterator(chunk_size=5000), now.date())
+    return store_trending_scores('file', scores, now)
+
+
+def trending_score_subquery(kind):
+    """Annotation: precomputed score for each row of the outer queryset (0 if unranked)."""
+    from django.db.models import FloatField, OuterRef, Subquery, Value
+    from django.db.models.functions import Coalesce
+    from .models import TrendingScore
+
+    return Coalesce(
+        Subquery(
+            TrendingScore.objects.filter(kind=kind, object_id=OuterRef('pk')).values('score')[:1]
+        ),
+        Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+# ========================
+# RELATED CONTENT (co-view similarity)
+# ========================
+RELATED_WINDOW_DAYS = 30
+RELATED_TOP_K = 12
+RELATED_MIN_CO_VIEWS = 2
+# Baskets bigger than this are crawlers / shared NAT IPs — they would add
+# O(n²) noise pairs, so they are skipped.
+RELATED_MAX_BASKET = 40
+
+
+def co_view_similarity(rows, top_k=RELATED_TOP_K, min_co_views=RELATED_MIN_CO_VIEWS,
+                       max_basket=RELATED_MAX_BASKET):
+    """
+    rows: (ip, day, item_id) sorted by (ip, day) — streamed, one basket in memory at a time.
+    Counts how many baskets each item and each item pair appear in (a sparse
+    upper-triangular co-occurrence matrix as a dict), then keeps the top_k
+    neighbours per item by cosine = co(a, b) / sqrt(n(a) · n(b)).
+    Returns {item_id: [(neighbour_id, score, co_views), ...]}.
+    """
+    item_counts = {}
+    pair_counts = {}
+
+    def add_basket(items):
+        if len(items) > max_basket:
+            return
+        for item in items:
+            item_counts[item] = item_counts.get(item, 0) + 1
+        if len(items) < 2:
+            return
+        ordered = sorted(items)
+        for i, a in enumerate(ordered):
+            for b in ordered[i + 1:]:
+                pair_counts[(a, b)] = pair_counts.get((a, b), 0) + 1
+
+    basket_key, basket = None, set()
+    for ip, day, item_id in rows:
+        if (ip, day) != basket_key:
+            add_basket(basket)
+            basket_key, basket = (ip, day), set()
+        basket.add(item_id)
+    add_basket(basket)
+
+    neighbours = {}
+    for (a, b), co in pair_counts.items():
+        if co < min_co_views:
+            continue
+        score = co / math.sqrt(item_counts[a] * item_counts[b])
+        neighbours.setdefault(a, []).append((b, score, co))
+        neighbours.setdefault(b, []).append((a, score, co))
+
+    return {
+        item: heapq.nlargest(top_k, candidates, key=lambda c: (c[1], c[2]))
+        for item, candidates in neighbours.items()
+    }
+
+
+def store_related_items(kind, neighbours, batch_size=1000):
+    """Replace every `kind` row with this run's neighbour lists; returns rows stored."""
+    from .models import RelatedItem
+
+    rows = [
+        RelatedItem(kind=kind, source_id=source, target_id=target, score=score, co_views=co)
+        for source, candidates in neighbours.items()
+        for target, score, co in candidates
+    ]
+    with transaction.atomic():
+        RelatedItem.objects.filter(kind=kind).delete()
+        RelatedItem.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def related_ids(kind, object_id, limit=RELATED_TOP_K):
+    """Neighbour ids, best first — one index range scan on related_source_score_idx."""
+    from .models import RelatedItem
+
+    return list(
+        RelatedItem.objects.filter(kind=kind, source_id=object_id)
+        .order_by('-score').values_list('target_id', flat=True)[:limit]
+    )
+
+
+def compute_file_related(now=None, **options):
+    from .models import FileView
+
+    now = now or timezone.now()
+    rows = FileView.objects.filter(
+        viewed_at__gte=now - timedelta(days=RELATED_WINDOW_DAYS)
+    ).annotate(day=TruncDate('viewed_at')).values_list(
+        'ip_address', 'day', 'file_id'
+    ).order_by('ip_address', 'day')
+
+    return store_related_items('file', co_view_similarity(rows.iterator(chunk_size=5000), **options))
+
+
+def related_files(file_obj, limit=RELATED_TOP_K):
+    """Active related files, best first, as small card dicts."""
+    from .models import UserFile
+
+    ids = related_ids('file', file_obj.pk, limit)
+    if not ids:
+        return []
+    cards = {
+        row['id']: row for row in UserFile.objects.filter(pk__in=ids, is_active=True).values(
+            'id', 'short_code', 'title', 'file_type', 'external_thumbnail_url', 'views'
+        )
+    }
+    return [cards[pk] for pk in ids if pk in cards]
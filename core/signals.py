@@ -0,0 +1,24 @@
+# core/signals.py
+# Model signal receivers, connected in CoreConfig.ready().
+
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .models import User, UserFile
+from .storage import release_stored_object
+
+
+@receiver(post_delete, sender=UserFile)
+def release_file_storage(sender, instance, **kwargs):
+    """
+    Every delete path (views, Django admin, user CASCADE, cleanup tasks) gives
+    back the file's verified bytes and drops its shared object's reference.
+    """
+    if instance.size_bytes:
+        User.objects.filter(pk=instance.user_id).update(
+            storage_bytes=Greatest(F('storage_bytes') - instance.size_bytes, Value(0))
+        )
+    if instance.stored_object_id:
+        release_stored_object(instance.stored_object_id)
@@ -0,0 +1,473 @@
+# core/storage.py
+# Cloudflare R2 (S3 API) helpers shared by the upload endpoints.
+
+import base64
+import logging
+import re
+import threading
+import uuid
+
+import boto3
+import requests
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from django.apps import apps
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Value
+from django.utils import timezone
+
+from .urlguard import UnsafeURL, safe_request
+
+logger = logging.getLogger(__name__)
+
+PRESIGN_EXPIRES = 3600
+
+_r2_client = None
+_r2_client_lock = threading.Lock()
+
+
+def get_r2_client():
+    """
+    One S3 client per worker process, built on first use. Building a client
+    loads the botocore service model (tens of ms); clients are thread-safe,
+    so every request reuses this one.
+    """
+    global _r2_client
+    if _r2_client is None:
+        with _r2_client_lock:
+            if _r2_client is None:
+                _r2_client = boto3.session.Session().client(
+                    's3',
+                    endpoint_url=settings.R2_ENDPOINT_URL,
+                    aws_access_key_id=settings.R2_ACCESS_KEY_ID,
+                    aws_secret_access_key=settings.R2_SECRET_ACCESS_KEY,
+                    region_name='auto',
+                    config=Config(signature_version='s3v4', max_pool_connections=32),
+                )
+    return _r2_client
+
+
+def new_upload_key(file_name):
+    ext = file_name.rsplit('.', 1)[-1] if '.' in file_name else ''
+    return f"uploads/{uuid.uuid4()}.{ext}" if ext else f"uploads/{uuid.uuid4()}"
+
+
+def public_url(key):
+    return f"{settings.R2_PUBLIC_URL}/{key}"
+
+
+def presign_put(key, content_type, expires=PRESIGN_EXPIRES, sha256=None):
+    """
+    Presigning is local HMAC work — no network round trip. With `sha256` the
+    checksum header is signed too, so R2 rejects a body with any other content.
+    """
+    params = {
+        'Bucket': settings.R2_BUCKET_NAME,
+        'Key': key,
+        'ContentType': content_type,
+    }
+    if sha256:
+        params['ChecksumSHA256'] = sha256_base64(sha256)
+    return get_r2_client().generate_presigned_url('put_object', Params=params, ExpiresIn=expires)
+
+
+def presign_upload(file_name, content_type, sha256=None):
+    key = new_upload_key(file_name)
+    upload = {
+        'presigned_url': presign_put(key, content_type, sha256=sha256),
+        'public_url': public_url(key),
+        'key': key,
+    }
+    if sha256:
+        # Signed headers: the PUT must send exactly these
+        upload['headers'] = {'Content-Type': content_type, 'x-amz-checksum-sha256': sha256_base64(sha256)}
+    return upload
+
+
+def delete_object(key):
+    get_r2_client().delete_object(Bucket=settings.R2_BUCKET_NAME, Key=key)
+
+
+def object_key(url):
+    """Bucket key for one of our public R2 URLs, else None (ImageKit, external links)."""
+    prefix = f"{settings.R2_PUBLIC_URL}/"
+    if not url or not settings.R2_PUBLIC_URL or not url.startswith(prefix):
+        return None
+    return url[len(prefix):].split('?', 1)[0] or None
+
+
+# ========================
+# GARBAGE COLLECTION (gc_storage)
+# Every column that may hold one of our public R2 URLs. An object under
+# GC_PREFIX that none of them mentions is an orphan: a deleted file, or a
+# presigned upload that was never registered.
+# ========================
+GC_PREFIX = 'uploads/'
+URL_REFERENCES = (
+    ('core.UserFile', ('external_file_url', 'external_thumbnail_url')),
+    ('drama.Drama', ('thumbnail_url', 'poster_url')),
+    ('drama.DramaEpisode', ('video_url', 'thumbnail_url')),
+    ('core.SiteSettings', ('seo_og_image', 'favicon_url')),
+)
+DELETE_BATCH = 1000                  # delete_objects limit
+
+
+def referenced_keys():
+    """Set of bucket keys referenced anywhere in the database."""
+    keys = set(apps.get_model('core.StoredObject').objects.values_list('key', flat=True).iterator())
+    for label, fields in URL_REFERENCES:
+        for row in apps.get_model(label).objects.values_list(*fields).iterator(chunk_size=5000):
+            keys.update(filter(None, map(object_key, row)))
+    return keys
+
+
+def still_referenced(keys):
+    """Subset of `keys` referenced right now — re-checked just before deleting."""
+    from django.db.models import Q
+
+    urls = [public_url(key) for key in keys]
+    found = set(apps.get_model('core.StoredObject').objects.filter(key__in=keys).values_list('key', flat=True))
+    for label, fields in URL_REFERENCES:
+        query = Q()
+        for field in fields:
+            query |= Q(**{f'{field}__in': urls})
+        for row in apps.get_model(label).objects.filter(query).values_list(*fields):
+            found.update(filter(None, map(object_key, row)))
+    return found & set(keys)
+
+
+def iter_objects(prefix=GC_PREFIX):
+    """Stream the bucket listing one list_objects_v2 page (≤1000 keys) at a time."""
+    paginator = get_r2_client().get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=settings.R2_BUCKET_NAME, Prefix=prefix):
+        yield from page.get('Contents', [])
+
+
+def delete_objects(keys):
+    """Batch delete (≤ DELETE_BATCH keys); returns the keys R2 reported as failed."""
+    response = get_r2_client().delete_objects(
+        Bucket=settings.R2_BUCKET_NAME,
+        Delete={'Objects': [{'Key': key} for key in keys], 'Quiet': True},
+    )
+    return [error['Key'] for error in response.get('Errors', [])]
+
+
+# ========================
+# CONTENT-HASH DEDUPLICATION
+# Client sends the file's SHA-256 (hex) and size with presign / registration.
+# Presign: a known object comes back as {"duplicate": true, ...} — nothing to
+# upload. Registration: the file references the shared StoredObject and
+# bumps its refcount; deleting the UserFile by any path (view, admin,
+# cascade) drops it again via the post_delete receiver in core/signals.py.
+# ========================
+SHA256_RE = re.compile(r'^[0-9a-f]{64}$')
+
+
+def sha256_base64(sha256):
+    return base64.b64encode(bytes.fromhex(sha256)).decode()
+
+
+def parse_content_hash(data):
+    """
+    (sha256, size, None) from request data; (None, None, None) when the client
+    sent no hash; (None, None, error message) when it is malformed.
+    """
+    sha256 = data.get('sha256')
+    if not sha256:
+        return None, None, None
+    sha256 = str(sha256).lower()
+    try:
+        size = int(data.get('size'))
+    except (TypeError, ValueError):
+        size = 0
+    if not SHA256_RE.match(sha256) or size <= 0:
+        return None, None, "sha256 must be 64 hex characters and size a positive integer"
+    return sha256, size, None
+
+
+def find_stored_objects(hashes):
+    """{(sha256, size): StoredObject} for the given pairs — one query."""
+    from .models import StoredObject
+
+    if not hashes:
+        return {}
+    found = StoredObject.objects.filter(sha256__in={sha256 for sha256, _ in hashes})
+    return {(obj.sha256, obj.size): obj for obj in found if (obj.sha256, obj.size) in hashes}
+
+
+def grant_presigned_uploads(user, grants):
+    """Record sha256-bound presigns as (key, sha256, size) — the only keys `user` may claim."""
+    from .models import PresignedUpload
+
+    PresignedUpload.objects.bulk_create([
+        PresignedUpload(key=key, user=user, sha256=sha256, size=size) for key, sha256, size in grants
+    ])
+
+
+def object_matches(key, sha256, size):
+    """HEAD the object: it must exist with this size and R2 must hold this exact checksum."""
+    try:
+        head = get_r2_client().head_object(Bucket=settings.R2_BUCKET_NAME, Key=key, ChecksumMode='ENABLED')
+    except ClientError:
+        return False
+    return head.get('ContentLength') == size and head.get('ChecksumSHA256') == sha256_base64(sha256)
+
+
+def claim_stored_object(user, sha256, size, file_url):
+    """
+    Take a reference on the StoredObject for this content. Returns it, or None
+    when the content is not deduplicated. A new StoredObject is only created
+    for a key presigned to this same user for this hash and size, and only
+    once R2 reports that checksum — otherwise anyone could register someone
+    else's URL (or junk) under a hash and later delete it. Call inside the
+    transaction that creates the UserFile.
+    """
+    from .models import PresignedUpload, StoredObject
+
+    existing = StoredObject.objects.select_for_update().filter(sha256=sha256, size=size).first()
+    if existing is None:
+        key = object_key(file_url)
+        if key is None:
+            return None
+        grant = PresignedUpload.objects.select_for_update().filter(
+            key=key, user=user, sha256=sha256, size=size,
+        ).first()
+        if grant is None or not object_matches(key, sha256, size):
+            return None
+        try:
+            with transaction.atomic():
+                created = StoredObject.objects.create(sha256=sha256, size=size, key=key, refcount=1)
+                grant.delete()
+                return created
+        except IntegrityError:
+            # Registered concurrently: share theirs, our upload becomes an orphan
+            existing = StoredObject.objects.select_for_update().filter(sha256=sha256, size=size).first()
+            if existing is None:
+                return None
+    StoredObject.objects.filter(pk=existing.pk).update(refcount=F('refcount') + 1)
+    existing.refcount += 1
+    return existing
+
+
+def release_stored_object(stored_object_id):
+    """Drop one reference; the last one deletes the row and, after commit, the R2 object."""
+    from .models import StoredObject
+
+    with transaction.atomic():
+        obj = StoredObject.objects.select_for_update().filter(pk=stored_object_id).first()
+        if obj is None:
+            return
+        if obj.refcount > 1:
+            StoredObject.objects.filter(pk=obj.pk).update(refcount=F('refcount') - 1)
+            return
+        obj.delete()
+        transaction.on_commit(lambda: _delete_object_quietly(obj.key))
+
+
+def _delete_object_quietly(key):
+    try:
+        delete_object(key)
+    except ClientError:
+        logger.exception("Could not delete R2 object %s", key)
+
+
+# ========================
+# SIZE VERIFICATION (verify_storage)
+# New files are HEAD-checked in the background for size and content type;
+# each verified size is added to User.storage_bytes exactly once, so quota
+# checks read one column instead of summing the user's files.
+# ========================
+HEAD_TIMEOUT = 10
+_local = threading.local()
+
+
+def _session():
+    """Keep-alive session per verifier thread (requests.Session is not thread-safe)."""
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = _local.session = requests.Session()
+    return session
+
+
+def head_file(url):
+    """
+    (size, content_type) for a stored file. Size is None when the file is
+    gone or its URL is not a public http(s) address. Raises OSError on transient failures (timeouts, 5xx) so the file
+    can be retried later.
+    """
+    key = object_key(url)
+    if key is not None:
+        try:
+            head = get_r2_client().head_object(Bucket=settings.R2_BUCKET_NAME, Key=key)
+        except ClientError as e:
+            code = e.response.get('Error', {}).get('Code', '')
+            if code in ('404', 'NoSuchKey', 'NotFound'):
+                return None, ''
+            raise OSError(f"R2 HEAD {key}: {e}")
+        return head['ContentLength'], head.get('ContentType', '')
+
+    try:
+        response = safe_request(_session(), 'HEAD', url, timeout=HEAD_TIMEOUT)
+    except UnsafeURL:
+        return None, ''         # never fetched, never counted
+    except requests.RequestException as e:
+        raise OSError(f"HEAD {url}: {e}")
+    if response.status_code in (404, 410):
+        return None, ''
+    if response.status_code >= 400:
+        raise OSError(f"HEAD {url}: HTTP {response.status_code}")
+    length = response.headers.get('Content-Length')
+    content_type = response.headers.get('Content-Type', '').split(';', 1)[0].strip()
+    return (int(length) if length and length.isdigit() else None), content_type[:100]
+
+
+def _head_job(row):
+    file_id, user_id, url = row
+    try:
+        size, content_type = head_file(url)
+    except OSError as e:
+        return file_id, user_id, None, '', str(e)
+    return file_id, user_id, size, content_type, None
+
+
+def record_file_size(file_id, user_id, size, content_type):
+    """
+    Store the HEAD result once: the update only matches an unchecked row, so
+    concurrent verifiers (or a delete in between) can't double-count bytes.
+    """
+    from .models import User, UserFile
+
+    with transaction.atomic():
+        updated = UserFile.objects.filter(pk=file_id, size_checked_at__isnull=True).update(
+            size_bytes=size, content_type=content_type, size_checked_at=timezone.now(),
+        )
+        if updated and size:
+            User.objects.filter(pk=user_id).update(storage_bytes=F('storage_bytes') + size)
+    return bool(updated)
+
+
+def verify_file_sizes(pool, batch=200, after_id=0):
+    """
+    HEAD one batch of unchecked files with id > after_id on `pool` (a
+    ThreadPoolExecutor; threads only do HTTP, results are written from the
+    calling thread). Returns (stats, last id seen — None when nothing is left).
+    """
+    from .models import UserFile
+
+    rows = list(
+        UserFile.objects.filter(size_checked_at__isnull=True, id__gt=after_id)
+        .exclude(external_file_url__isnull=True).exclude(external_file_url='')
+        .order_by('id').values_list('id', 'user_id', 'external_file_url')[:batch]
+    )
+    stats = {'checked': 0, 'missing': 0, 'errors': 0, 'bytes': 0}
+    for file_id, user_id, size, content_type, error in pool.map(_head_job, rows):
+        if error:
+            # Transient: stays unchecked for the next pass
+            stats['errors'] += 1
+            continue
+        if record_file_size(file_id, user_id, size, content_type):
+            stats['checked'] += 1
+            stats['bytes'] += size or 0
+            if size is None:
+                stats['missing'] += 1
+    return stats, (rows[-1][0] if rows else None)
+
+
+def verify_pending_files(workers=16, batch=200, max_batches=None, on_batch=None):
+    """One pass over every unchecked file, `batch` at a time. Returns summed stats."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    totals = {'checked': 0, 'missing': 0, 'errors': 0, 'bytes': 0}
+    after_id, batches = 0, 0
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='verify-storage') as pool:
+        while max_batches is None or batches < max_batches:
+            stats, after_id = verify_file_sizes(pool, batch, after_id)
+            if after_id is None:
+                break
+            batches += 1
+            for name, value in stats.items():
+                totals[name] += value
+            if on_batch:
+                on_batch(stats)
+    return totals
+
+
+def recount_storage():
+    """Rebuild every User.storage_bytes from UserFile.size_bytes (drift repair)."""
+    from django.db.models import OuterRef, Subquery, Sum
+    from django.db.models.functions import Coalesce
+
+    from .models import User, UserFile
+
+    totals = UserFile.objects.filter(user=OuterRef('pk')).order_by().values('user').annotate(
+        total=Sum('size_bytes')
+    ).values('total')
+    return User.objects.update(storage_bytes=Coalesce(Subquery(totals), Value(0)))
+
+
+# ========================
+# MULTIPART UPLOADS (large videos)
+# Client flow: create → presign part URLs (any order, in batches) → PUT parts
+# in parallel, keeping each ETag → complete (or abort). A failed part is
+# re-presigned and re-sent alone.
+# ========================
+MULTIPART_MAX_PARTS = 10000          # S3 / R2 limit
+MULTIPART_PRESIGN_BATCH = 100
+MULTIPART_TOKEN_SALT = 'core.storage.multipart'
+MULTIPART_TOKEN_MAX_AGE = 7 * 24 * 3600
+
+
+def multipart_token(user_id, key, upload_id):
+    """Opaque handle binding an upload to its owner; later calls must present it."""
+    from django.core import signing
+    return signing.dumps({'u': user_id, 'k': key, 'id': upload_id}, salt=MULTIPART_TOKEN_SALT)
+
+
+def read_multipart_token(token, user_id):
+    """(key, upload_id), or None if the token is forged, expired or someone else's."""
+    from django.core import signing
+    try:
+        data = signing.loads(token, salt=MULTIPART_TOKEN_SALT, max_age=MULTIPART_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return None
+    if data.get('u') != user_id:
+        return None
+    return data['k'], data['id']
+
+
+def create_multipart_upload(file_name, content_type):
+    key = new_upload_key(file_name)
+    response = get_r2_client().create_multipart_upload(
+        Bucket=settings.R2_BUCKET_NAME, Key=key, ContentType=content_type,
+    )
+    return key, response['UploadId']
+
+
+def presign_upload_part(key, upload_id, part_number, expires=PRESIGN_EXPIRES):
+    return get_r2_client().generate_presigned_url(
+        'upload_part',
+        Params={
+            'Bucket': settings.R2_BUCKET_NAME,
+            'Key': key,
+            'UploadId': upload_id,
+            'PartNumber': part_number,
+        },
+        ExpiresIn=expires,
+    )
+
+
+def complete_multipart_upload(key, upload_id, parts):
+    """parts: [(part_number, etag), ...] in any order."""
+    return get_r2_client().complete_multipart_upload(
+        Bucket=settings.R2_BUCKET_NAME,
+        Key=key,
+        UploadId=upload_id,
+        MultipartUpload={'Parts': [
+            {'PartNumber': number, 'ETag': etag} for number, etag in sorted(parts)
+        ]},
+    )
+
+
+def abort_multipart_upload(key, upload_id):
+    get_r2_client().abort_multipart_upload(Bucket=settings.R2_BUCKET_NAME, Key=key, UploadId=upload_id)
@@ -0,0 +1,104 @@
+# core/tasks.py
+# Periodic jobs for the core app — picked up by `run_scheduler` (core/scheduler.py).
+
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .scheduler import periodic_task
+
+UNVERIFIED_SIGNUP_TTL = timedelta(days=2)
+EMAIL_OUTBOX_RETENTION = timedelta(days=30)
+TASK_RUN_RETENTION = timedelta(days=90)
+PRESIGNED_UPLOAD_RETENTION = timedelta(days=2)
+DELETE_BATCH = 1000
+
+
+def _delete_in_batches(qs, batch_size=DELETE_BATCH):
+    """Delete by pk batches so one big cleanup never holds long row locks."""
+    total = 0
+    while True:
+        pks = list(qs.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return total
+        total += qs.model.objects.filter(pk__in=pks).delete()[1].get(qs.model._meta.label, 0)
+
+
+@periodic_task('*/10 * * * *')
+def expire_broadcast_notifications():
+    """Switch off notifications past their expires_at (get_active_notification filters them too)."""
+    from .models import BroadcastNotification
+    return BroadcastNotification.objects.filter(
+        is_active=True, expires_at__lt=timezone.now()
+    ).update(is_active=False)
+
+
+@periodic_task('15 * * * *')
+def cleanup_unverified_signups():
+    """
+    OTP signups that were never verified free the username / email again.
+    Keyed on signup_pending only: banned or re-verifying real users are also
+    inactive / unverified and must never match.
+    """
+    from .models import User
+    return _delete_in_batches(User.objects.filter(
+        signup_pending=True,
+        is_staff=False,
+        is_superuser=False,
+        created_at__lt=timezone.now() - UNVERIFIED_SIGNUP_TTL,
+    ))
+
+
+@periodic_task('*/15 * * * *')
+def compute_file_trending():
+    from .services import compute_file_trending
+    return compute_file_trending()
+
+
+@periodic_task('30 2 * * *', lease=timedelta(hours=2))
+def compute_file_related():
+    from .services import compute_file_related
+    return compute_file_related()
+
+
+@periodic_task('45 3 * * *')
+def compact_email_outbox():
+    from .models import EmailOutbox
+    return _delete_in_batches(EmailOutbox.objects.filter(
+        status__in=['sent', 'failed'], created_at__lt=timezone.now() - EMAIL_OUTBOX_RETENTION
+    ))
+
+
+@periodic_task('0 4 * * 0')
+def compact_task_runs():
+    from .models import TaskRun
+    return _delete_in_batches(TaskRun.objects.filter(started_at__lt=timezone.now() - TASK_RUN_RETENTION))
+
+
+@periodic_task('50 * * * *')
+def expire_presigned_uploads():
+    """Drop dedup grants for presigned keys that were never registered."""
+    from .models import PresignedUpload
+    return _delete_in_batches(PresignedUpload.objects.filter(
+        created_at__lt=timezone.now() - PRESIGNED_UPLOAD_RETENTION
+    ))
+
+
+@periodic_task('*/5 * * * *')
+def verify_file_sizes():
+    """HEAD newly registered files for size / content type (capped per run)."""
+    from .storage import verify_pending_files
+    return verify_pending_files(max_batches=10)['checked']
+
+
+@periodic_task('20 */6 * * *', lease=timedelta(hours=2))
+def check_links():
+    """Probe due external URLs; dead ones switch their file / episode off."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    from .linkcheck import HostThrottle, due_links, sync_link_rows
+    from .linkcheck import check_links as probe_links
+
+    sync_link_rows()
+    with ThreadPoolExecutor(max_workers=32, thread_name_prefix='check-links') as pool:
+        return probe_links(due_links(5000), pool, HostThrottle(5.0, 4))
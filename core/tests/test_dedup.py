@@ -0,0 +1,96 @@
+import hashlib
+
+from core.models import PresignedUpload, StoredObject, User, UserFile
+
+from .r2 import BUCKET, PUBLIC_URL, R2TestCase
+
+CONTENT = b'episode-one' * 1000
+SHA256 = hashlib.sha256(CONTENT).hexdigest()
+
+
+class DedupTests(R2TestCase):
+    def setUp(self):
+        super().setUp()
+        self.alice = User.objects.create_user(username='alice', email='alice@example.com', password='x')
+        self.mallory = User.objects.create_user(username='mallory', email='mallory@example.com', password='x')
+
+    def presign(self, user, sha256=SHA256, size=len(CONTENT)):
+        response = self.api(user).post('/api/r2/presign/', {
+            'file_name': 'ep1.mp4', 'file_type': 'video/mp4', 'sha256': sha256, 'size': size,
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def register(self, user, file_url, sha256=SHA256, size=len(CONTENT)):
+        response = self.api(user).post('/api/upload/', {
+            'file_url': file_url, 'file_type': 'video', 'title': 'ep1', 'sha256': sha256, 'size': size,
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        return UserFile.objects.get(pk=response.json()['id'])
+
+    def upload_with_checksum(self, key, body=CONTENT):
+        self.s3.put_object(Bucket=BUCKET, Key=key, Body=body, ChecksumAlgorithm='SHA256')
+
+    def test_duplicate_content_shares_one_object_until_last_delete(self):
+        upload = self.presign(self.alice)
+        self.assertIn('x-amz-checksum-sha256', upload['headers'])
+        self.upload_with_checksum(upload['key'])
+        first = self.register(self.alice, upload['public_url'])
+        self.assertEqual(first.stored_object.refcount, 1)
+        self.assertFalse(PresignedUpload.objects.exists())
+
+        duplicate = self.presign(self.mallory)
+        self.assertTrue(duplicate['duplicate'])
+        second = self.register(self.mallory, duplicate['public_url'])
+        self.assertEqual(second.stored_object_id, first.stored_object_id)
+        self.assertEqual(StoredObject.objects.get().refcount, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.api(self.alice).delete(f'/api/files/{first.pk}/delete/').status_code, 200)
+        self.assertEqual(StoredObject.objects.get().refcount, 1)
+        self.assertEqual(self.keys(), [upload['key']])
+
+        admin = User.objects.create_superuser(username='root', email='root@example.com', password='x')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.api(admin).delete(f'/api/admin/file/{second.pk}/').status_code, 200)
+        self.assertFalse(StoredObject.objects.exists())
+        self.assertEqual(self.keys(), [])
+
+    def test_user_cascade_releases_reference(self):
+        upload = self.presign(self.alice)
+        self.upload_with_checksum(upload['key'])
+        self.register(self.alice, upload['public_url'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.alice.delete()
+        self.assertFalse(StoredObject.objects.exists())
+        self.assertEqual(self.keys(), [])
+
+    def test_registering_someone_elses_url_cannot_delete_it(self):
+        victim_key = 'uploads/victim.mp4'
+        self.upload_with_checksum(victim_key)
+        self.register(self.alice, f'{PUBLIC_URL}/{victim_key}', sha256=None, size=None)
+        # Mallory holds a genuine grant, just not for the victim's key
+        self.presign(self.mallory)
+
+        stolen = self.register(self.mallory, f'{PUBLIC_URL}/{victim_key}')
+        self.assertIsNone(stolen.stored_object_id)
+        self.assertFalse(StoredObject.objects.exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api(self.mallory).delete(f'/api/files/{stolen.pk}/delete/')
+        self.assertEqual(self.keys(), [victim_key])
+
+    def test_junk_under_a_popular_hash_is_not_deduplicated(self):
+        junk = b'x' * len(CONTENT)
+
+        unchecked = self.presign(self.mallory)
+        self.s3.put_object(Bucket=BUCKET, Key=unchecked['key'], Body=junk)
+        self.assertIsNone(self.register(self.mallory, unchecked['public_url']).stored_object_id)
+
+        mismatched = self.presign(self.mallory)
+        self.upload_with_checksum(mismatched['key'], junk)
+        self.assertIsNone(self.register(self.mallory, mismatched['public_url']).stored_object_id)
+
+        self.assertFalse(StoredObject.objects.exists())
+        self.assertNotIn('duplicate', self.presign(self.alice))
@@ -0,0 +1,132 @@
+import json
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core import brevo
+from core.brevo import BrevoClient, CircuitBreaker
+from core.emails import MAX_ATTEMPTS, deliver, queue_email, record_delivery
+from core.models import EmailOutbox
+
+
+class FakeBrevo(BaseHTTPRequestHandler):
+    """Answers POSTs with the next queued status (201 when the queue is empty)."""
+    statuses = []
+    received = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        FakeBrevo.received.append(json.loads(self.rfile.read(int(self.headers['Content-Length']))))
+        status = FakeBrevo.statuses.pop(0) if FakeBrevo.statuses else 201
+        body = b'{"messageId": "1"}' if status < 300 else b'{"message": "nope"}'
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class OutboxDeliveryTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeBrevo)
+        cls.url = f'http://127.0.0.1:{cls.server.server_port}/v3/smtp/email'
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        FakeBrevo.statuses = []
+        FakeBrevo.received = []
+        self.breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+        self.client = BrevoClient(self.url, 'key', breaker=self.breaker)
+        patcher = mock.patch('core.emails.get_brevo_client', return_value=self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def send(self, email):
+        record_delivery(email, *deliver(email)[1:])
+        email.refresh_from_db()
+        return email
+
+    def test_sent(self):
+        email = self.send(queue_email('a@example.com', 'A', 'Hi', '<p>hi</p>'))
+        self.assertEqual((email.status, email.attempts), ('sent', 1))
+        self.assertEqual(FakeBrevo.received[0]['to'], [{'email': 'a@example.com', 'name': 'A'}])
+
+    def test_server_errors_back_off_until_max_attempts(self):
+        email = queue_email('a@example.com', 'A', 'Hi', '<p>hi</p>')
+        delays = []
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            FakeBrevo.statuses = [500]
+            self.breaker.record_success()           # keep the circuit out of this test
+            before = timezone.now()
+            email = self.send(email)
+            self.assertEqual(email.attempts, attempt)
+            if attempt < MAX_ATTEMPTS:
+                self.assertEqual(email.status, 'pending')
+                delays.append((email.next_attempt_at - before).total_seconds())
+        self.assertEqual(email.status, 'failed')
+        self.assertTrue(all(later > earlier for earlier, later in zip(delays, delays[1:])))
+
+    def test_only_unprocessed_statuses_are_retried_in_place(self):
+        FakeBrevo.statuses = [503]
+        email = self.send(queue_email('a@example.com', 'A', 'Hi', '<p>hi</p>'))
+        self.assertEqual((email.status, len(FakeBrevo.received)), ('sent', 2))
+
+        # A 502 / 504 may already have been delivered: no second POST, the outbox backs off
+        FakeBrevo.statuses, FakeBrevo.received = [502], []
+        email = self.send(queue_email('b@example.com', 'B', 'Hi', '<p>hi</p>'))
+        self.assertEqual((email.status, email.attempts, len(FakeBrevo.received)), ('pending', 1, 1))
+
+    def test_rejected_request_fails_at_once(self):
+        FakeBrevo.statuses = [400]
+        email = self.send(queue_email('bad', 'A', 'Hi', '<p>hi</p>'))
+        self.assertEqual((email.status, email.attempts), ('failed', 1))
+        self.assertEqual(self.breaker.state, 'closed')
+
+    def test_open_circuit_defers_without_spending_attempts(self):
+        FakeBrevo.statuses = [500, 500, 500]
+        for _ in range(3):
+            self.send(queue_email('a@example.com', 'A', 'Hi', '<p>hi</p>'))
+        self.assertEqual(self.breaker.state, 'open')
+
+        email = self.send(queue_email('b@example.com', 'B', 'Hi', '<p>hi</p>'))
+        self.assertEqual((email.status, email.attempts), ('pending', 0))
+        self.assertIn('circuit open', email.last_error)
+        self.assertGreater(email.next_attempt_at, timezone.now() + timedelta(seconds=50))
+        self.assertEqual(len(FakeBrevo.received), 3)
+        self.assertEqual(self.client.stats()['short_circuited'], 1)
+
+    def test_unexpected_exception_is_retryable(self):
+        email = queue_email('a@example.com', 'A', 'Hi', '<p>hi</p>')
+        with mock.patch.object(self.client, 'send', side_effect=RuntimeError('boom')):
+            email = self.send(email)
+        self.assertEqual((email.status, email.attempts), ('pending', 1))
+        self.assertIn('RuntimeError: boom', email.last_error)
+
+    @override_settings(BREVO_API_KEY='key')
+    def test_worker_drains_outbox(self):
+        for i in range(5):
+            queue_email(f'{i}@example.com', str(i), 'Hi', '<p>hi</p>')
+        FakeBrevo.statuses = [201, 400]
+        # Patched out: a real close inside the TestCase transaction would end it
+        with mock.patch.object(brevo, '_client', self.client), \
+                mock.patch('core.management.commands.send_emails.close_old_connections') as close_old:
+            call_command('send_emails', '--once', '--workers', '2', '--batch', '3',
+                         stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(close_old.call_count, 3)        # every poll: two batches, then the empty one
+        self.assertEqual(EmailOutbox.objects.filter(status='sent').count(), 4)
+        self.assertEqual(EmailOutbox.objects.filter(status='failed').count(), 1)
@@ -0,0 +1,62 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.utils import timezone
+
+from core.models import User, UserFile
+
+from .r2 import BUCKET, PUBLIC_URL, R2TestCase
+
+
+class GcStorageTests(R2TestCase):
+    def setUp(self):
+        super().setUp()
+        user = User.objects.create_user(username='u', email='u@example.com', password='x')
+        for key in ('uploads/kept.mp4', 'uploads/thumb.jpg', 'uploads/orphan-1.mp4', 'uploads/orphan-2.mp4',
+                    'other/outside-prefix.mp4'):
+            self.s3.put_object(Bucket=BUCKET, Key=key, Body=b'12345')
+        UserFile.objects.create(
+            user=user, title='kept', file_type='video',
+            external_file_url=f'{PUBLIC_URL}/uploads/kept.mp4',
+            external_thumbnail_url=f'{PUBLIC_URL}/uploads/thumb.jpg',
+        )
+        self.all_keys = self.keys()
+
+    def gc(self, *args, hours_later=25):
+        out = StringIO()
+        later = timezone.now() + timedelta(hours=hours_later)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            call_command('gc_storage', *args, stdout=out)
+        return out.getvalue()
+
+    def test_dry_run_deletes_nothing(self):
+        output = self.gc('--dry-run', '--verbose-keys')
+        self.assertIn('orphans 2', output)
+        self.assertIn('orphan uploads/orphan-1.mp4', output)
+        self.assertEqual(self.keys(), self.all_keys)
+
+    def test_deletes_only_old_unreferenced_objects(self):
+        output = self.gc()
+        self.assertIn('deleted 2, failed 0', output)
+        self.assertEqual(self.keys(), ['other/outside-prefix.mp4', 'uploads/kept.mp4', 'uploads/thumb.jpg'])
+
+    def test_min_age_guard_keeps_recent_uploads(self):
+        output = self.gc(hours_later=0)
+        self.assertIn('skipped young 2', output)
+        self.assertEqual(self.keys(), self.all_keys)
+
+        self.gc('--min-age-hours', '48')
+        self.assertEqual(self.keys(), self.all_keys)
+
+    def test_rechecks_references_before_deleting(self):
+        # A registration landing after the reference set was built must still protect its key
+        UserFile.objects.create(
+            user=User.objects.get(), title='late', file_type='video',
+            external_file_url=f'{PUBLIC_URL}/uploads/orphan-1.mp4',
+        )
+        with mock.patch('core.management.commands.gc_storage.referenced_keys', return_value=set()):
+            self.gc()
+        self.assertEqual(self.keys(), ['other/outside-prefix.mp4', 'uploads/kept.mp4',
+                                       'uploads/orphan-1.mp4', 'uploads/thumb.jpg'])
@@ -0,0 +1,110 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.linkcheck import DEAD_RECHECK_INTERVAL, HostThrottle, check_links, due_links, sync_link_rows
+from core.models import LinkCheck, User, UserFile
+
+
+class Handler(BaseHTTPRequestHandler):
+    """/ok answers with an ETag (304 when it matches), /gone with 404 until revived, /nohead refuses HEAD."""
+    requests = []
+    revived = False
+
+    def log_message(self, *args):
+        pass
+
+    def respond(self):
+        Handler.requests.append((self.command, self.path))
+        if self.path == '/redirect':
+            self.send_response(302)
+            self.send_header('Location', '/ok')
+        elif self.path == '/ok' or (self.path == '/gone' and Handler.revived):
+            if self.headers.get('If-None-Match') == '"v1"':
+                self.send_response(304)
+            else:
+                self.send_response(200)
+                self.send_header('ETag', '"v1"')
+        elif self.path == '/nohead':
+            self.send_response(405 if self.command == 'HEAD' else 206)
+        else:
+            self.send_response(404)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    do_HEAD = do_GET = respond
+
+
+@override_settings(FETCH_ALLOW_PRIVATE_HOSTS=True)
+class LinkCheckTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        cls.base = f'http://127.0.0.1:{cls.server.server_port}'
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        Handler.requests = []
+        Handler.revived = False
+        self.user = User.objects.create_user(username='u', email='u@example.com', password='x')
+
+    def add_file(self, path):
+        return UserFile.objects.create(user=self.user, title=path, file_type='video',
+                                       external_file_url=f'{self.base}{path}')
+
+    def run_round(self, now=None):
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            return check_links(due_links(100, now=now), pool, HostThrottle(100.0, 4))
+
+    def test_alive_then_unchanged(self):
+        self.add_file('/ok')
+        self.add_file('/redirect')
+        self.add_file('/nohead')
+        sync_link_rows()
+        counts = self.run_round()
+        self.assertEqual(counts['alive'], 3)
+        self.assertIn(('GET', '/nohead'), Handler.requests)
+
+        counts = self.run_round(now=timezone.now() + timedelta(days=8))
+        self.assertEqual(counts['unchanged'], 2)
+
+    def test_dead_link_is_rechecked_slowly_and_revived(self):
+        file = self.add_file('/gone')
+        sync_link_rows()
+        self.assertEqual(self.run_round()['missing'], 1)
+        self.assertEqual(self.run_round(now=timezone.now() + timedelta(hours=2))['dead'], 1)
+        file.refresh_from_db()
+        self.assertFalse(file.is_active)
+
+        link = LinkCheck.objects.get()
+        self.assertTrue(link.is_dead)
+        self.assertEqual(link.deactivated, {'core.UserFile': [file.pk]})
+        self.assertEqual(due_links(100, now=timezone.now() + timedelta(days=7)), [])
+
+        Handler.revived = True
+        later = timezone.now() + DEAD_RECHECK_INTERVAL + timedelta(hours=1)
+        self.assertEqual(self.run_round(now=later)['revived'], 1)
+        file.refresh_from_db()
+        self.assertTrue(file.is_active)
+        self.assertFalse(LinkCheck.objects.get().is_dead)
+
+    @override_settings(FETCH_ALLOW_PRIVATE_HOSTS=False)
+    def test_internal_addresses_are_never_probed(self):
+        file = self.add_file('/gone')
+        sync_link_rows()
+        for days in (0, 1, 3):
+            self.assertEqual(self.run_round(now=timezone.now() + timedelta(days=days))['error'], 1)
+        self.assertEqual(Handler.requests, [])
+        file.refresh_from_db()
+        self.assertTrue(file.is_active)
@@ -0,0 +1,46 @@
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core.models import User, UserFile
+
+
+class MyFilesSearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='u', email='u@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        # Repeated words give a spread of ranks with plenty of ties
+        self.files = [
+            UserFile.objects.create(
+                user=self.user, file_type='video', external_file_url=f'https://x.com/{i}.mp4',
+                title=' '.join(['love'] * (i % 4 + 1) + ['story', str(i)]),
+                description='love ' * (i % 3),
+            )
+            for i in range(37)
+        ]
+
+    def search(self, term, **params):
+        response = self.client.get('/api/my-files/search/', {'q': term, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_cursor_pages_cover_every_match_once(self):
+        seen, cursor = [], None
+        while True:
+            page = self.search('love', page_size=5, **({'cursor': cursor} if cursor else {}))
+            seen += [row['id'] for row in page['results']]
+            cursor = page['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(sorted(seen), sorted(f.pk for f in self.files))
+        self.assertEqual(seen, [row['id'] for row in self.search('love', page_size=100)['results']])
+
+    def test_deleted_files_leave_the_index(self):
+        self.files[0].delete()
+        UserFile.objects.filter(pk__in=[f.pk for f in self.files[1:10]]).delete()
+        self.assertEqual(len(self.search('story', page_size=100)['results']), 27)
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT count(*) FROM core_userfile_fts")
+                self.assertEqual(cursor.fetchone()[0], 27)
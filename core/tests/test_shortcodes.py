@@ -0,0 +1,88 @@
+import re
+import threading
+import time
+
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from core import shortcodes
+from core.shortcodes import CODE_SPACE, allocate_short_codes, encode, permute, reserve_sequence
+
+CODE_RE = re.compile(r'^[0-9A-Z]{9}$')
+
+
+class PermutationTests(TestCase):
+    def test_sampled_ranges_map_one_to_one_inside_the_code_space(self):
+        keys = shortcodes._round_keys()
+        for start in (0, 10 ** 9, CODE_SPACE - 5000):
+            values = [permute(n, keys) for n in range(start, start + 5000)]
+            self.assertEqual(len(set(values)), len(values))
+            self.assertTrue(all(0 <= value < CODE_SPACE for value in values))
+
+    def test_feistel_round_trips(self):
+        # Each round is invertible: running the rounds backwards recovers the input
+        keys = shortcodes._round_keys()
+        half, mask = shortcodes.HALF_BITS, shortcodes.HALF_MASK
+        for n in (0, 1, 12345, CODE_SPACE - 1):
+            value = shortcodes._feistel(n, keys)
+            left, right = value >> half, value & mask
+            for key in reversed(keys):
+                digest = shortcodes.hmac.new(key, left.to_bytes(3, 'big'), shortcodes.hashlib.sha256).digest()
+                left, right = right ^ (int.from_bytes(digest[:3], 'big') & mask), left
+            self.assertEqual((left << half) | right, n)
+
+    def test_bounds(self):
+        with self.assertRaises(ValueError):
+            permute(CODE_SPACE)
+        with self.assertRaises(ValueError):
+            permute(-1)
+
+    def test_codes_are_nine_base36_characters(self):
+        self.assertEqual(encode(0), '000000000')
+        self.assertEqual(encode(CODE_SPACE - 1), 'ZZZZZZZZZ')
+        codes = allocate_short_codes(500)
+        self.assertTrue(all(CODE_RE.match(code) for code in codes))
+        self.assertEqual(len(set(codes)), 500)
+
+    def test_codes_depend_on_the_key(self):
+        first = [encode(permute(n)) for n in range(1, 20)]
+        with override_settings(SHORT_CODE_KEY='another key'):
+            second = [encode(permute(n)) for n in range(1, 20)]
+        self.assertNotEqual(first, second)
+
+
+class ReserveSequenceTests(TransactionTestCase):
+    def test_concurrent_reservations_never_overlap(self):
+        ranges, errors = [], []
+
+        def reserve_once(count):
+            # SQLite's shared-cache test DB refuses, rather than waits for, a
+            # locked table; the failed transaction rolled back, so try again
+            while True:
+                try:
+                    return reserve_sequence(count)
+                except OperationalError as e:
+                    if 'locked' not in str(e):
+                        raise
+                    time.sleep(0.001)
+
+        def reserve(count):
+            try:
+                for _ in range(10):
+                    start = reserve_once(count)
+                    ranges.append(range(start, start + count))
+            except Exception as e:       # surfaced below; a thread can't fail the test itself
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=reserve, args=(size,)) for size in (1, 3, 7, 50) * 2]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        numbers = [n for reserved in ranges for n in reserved]
+        self.assertEqual(len(numbers), len(set(numbers)))
+        self.assertEqual(sorted(numbers), list(range(1, len(numbers) + 1)))
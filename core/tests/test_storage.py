@@ -0,0 +1,76 @@
+import io
+import threading
+
+import requests
+from django.test import SimpleTestCase, TestCase
+
+from core import storage
+from core.models import User, UserFile
+from core.urlguard import UnsafeURL, check_url, safe_request
+
+
+class RedirectingSession:
+    """Answers every request with a redirect to `location`, recording the URLs asked for."""
+
+    def __init__(self, location):
+        self.location = location
+        self.requested = []
+
+    def request(self, method, url, **kwargs):
+        self.requested.append(url)
+        response = requests.Response()
+        response.status_code = 302
+        response.headers['Location'] = self.location
+        response.url = url
+        response.raw = io.BytesIO()
+        return response
+
+
+class UrlGuardTests(SimpleTestCase):
+    def test_rejects_non_http_and_internal_addresses(self):
+        for url in (
+            'ftp://93.184.216.34/a.mp4',
+            'file:///etc/passwd',
+            'http://127.0.0.1:8000/admin/',
+            'http://localhost/',
+            'http://10.0.0.5/a.mp4',
+            'http://169.254.169.254/latest/meta-data/',
+            'http://[::1]/',
+            'http://[::ffff:127.0.0.1]/',
+        ):
+            with self.assertRaises(UnsafeURL, msg=url):
+                check_url(url)
+
+    def test_accepts_public_address(self):
+        check_url('https://93.184.216.34/a.mp4')
+
+    def test_every_redirect_hop_is_checked(self):
+        session = RedirectingSession('http://169.254.169.254/latest/meta-data/')
+        with self.assertRaises(UnsafeURL):
+            safe_request(session, 'HEAD', 'http://93.184.216.34/a.mp4', timeout=1)
+        self.assertEqual(session.requested, ['http://93.184.216.34/a.mp4'])
+
+    def test_head_file_never_fetches_internal_urls(self):
+        self.assertEqual(storage.head_file('http://127.0.0.1:9/a.mp4'), (None, ''))
+
+    def test_session_per_thread(self):
+        sessions = []
+        thread = threading.Thread(target=lambda: sessions.append(storage._session()))
+        thread.start()
+        thread.join()
+        self.assertIs(storage._session(), storage._session())
+        self.assertIsNot(sessions[0], storage._session())
+
+
+class StorageBytesTests(TestCase):
+    def test_every_delete_path_gives_bytes_back(self):
+        user = User.objects.create_user(username='u', email='u@example.com', password='x', storage_bytes=300)
+        files = [
+            UserFile.objects.create(user=user, title='t', file_type='video',
+                                    external_file_url=f'https://x.com/{i}.mp4', size_bytes=100)
+            for i in range(3)
+        ]
+        files[0].delete()
+        UserFile.objects.filter(pk=files[1].pk).delete()
+        user.refresh_from_db()
+        self.assertEqual(user.storage_bytes, 100)
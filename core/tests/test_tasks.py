@@ -0,0 +1,67 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import PeriodicTask, TaskRun, User, UserFile, Withdrawal
+from core.scheduler import CronSchedule, TaskSpec, registry
+from core.tasks import cleanup_unverified_signups
+
+
+class CleanupUnverifiedSignupsTests(TestCase):
+    def make_user(self, username, age=timedelta(days=3), **fields):
+        user = User.objects.create_user(username=username, email=f'{username}@example.com', password='x', **fields)
+        User.objects.filter(pk=user.pk).update(created_at=timezone.now() - age)
+        return user
+
+    def test_abandoned_otp_signup_is_deleted(self):
+        user = self.make_user('pending', is_active=False, email_verified=False, signup_pending=True)
+        self.assertEqual(cleanup_unverified_signups(), 1)
+        self.assertFalse(User.objects.filter(pk=user.pk).exists())
+
+    def test_recent_otp_signup_is_kept(self):
+        self.make_user('fresh', age=timedelta(hours=1), is_active=False, signup_pending=True)
+        self.assertEqual(cleanup_unverified_signups(), 0)
+
+    def test_banned_unverified_user_survives(self):
+        user = self.make_user('banned', is_active=False, email_verified=False)
+        UserFile.objects.create(user=user, title='t', file_type='video', external_file_url='https://x.com/a.mp4')
+        Withdrawal.objects.create(user=user, amount=5, payment_method='upi', payment_details={})
+        self.assertEqual(cleanup_unverified_signups(), 0)
+        self.assertTrue(User.objects.filter(pk=user.pk).exists())
+        self.assertEqual(UserFile.objects.filter(user=user).count(), 1)
+        self.assertEqual(Withdrawal.objects.filter(user=user).count(), 1)
+
+    def test_signup_verify_clears_pending_flag(self):
+        user = self.make_user('verifying', is_active=False, signup_pending=True)
+        user.email_otp = '123456'
+        user.email_otp_expiry = timezone.now() + timedelta(minutes=5)
+        user.save()
+        response = self.client.post('/api/signup/verify/', {'email': user.email, 'otp': '123456'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(cleanup_unverified_signups(), 0)
+        self.assertTrue(User.objects.get(pk=user.pk).is_active)
+
+
+class SchedulerConnectionTests(TestCase):
+    def setUp(self):
+        def broken():
+            raise RuntimeError("boom")
+
+        self.spec = TaskSpec('tests.broken', broken, CronSchedule('* * * * *'), timedelta(minutes=5))
+        patcher = mock.patch.dict(registry, {self.spec.name: self.spec}, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_connections_are_checked_each_tick_and_after_each_run(self):
+        PeriodicTask.objects.create(name=self.spec.name, schedule='* * * * *', next_run_at=timezone.now())
+        # Patched: a real close inside the TestCase transaction would end it
+        with mock.patch('core.management.commands.run_scheduler.close_old_connections') as tick, \
+                mock.patch('core.scheduler.close_old_connections') as after_run, \
+                mock.patch('core.management.commands.run_scheduler.discover_tasks'):
+            call_command('run_scheduler', '--once', stdout=StringIO(), stderr=StringIO())
+        self.assertEqual((tick.call_count, after_run.call_count), (1, 1))
+        self.assertEqual(TaskRun.objects.get().status, 'failed')
@@ -0,0 +1,71 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core.models import StoredObject, User, UserFile
+from core.views import UPLOAD_BATCH_MAX
+
+KNOWN = 'a' * 64
+UNKNOWN = 'b' * 64
+
+
+def file_row(i, **fields):
+    return {'file_url': f'https://x.com/{i}.mp4', 'file_type': 'video', 'title': f'holiday clip {i}', **fields}
+
+
+class UploadBatchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='u', email='u@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.stored = StoredObject.objects.create(sha256=KNOWN, size=100, key='uploads/known.mp4', refcount=1)
+
+    def post(self, files):
+        return self.client.post('/api/upload/', {'files': files}, format='json')
+
+    def test_batch_creates_every_file(self):
+        response = self.post([file_row(i) for i in range(3)] + [{'file_type': 'video', 'sha256': KNOWN, 'size': 100}])
+        self.assertEqual(response.status_code, 201)
+        files = response.json()['files']
+        self.assertEqual(len(files), 4)
+        self.assertEqual(len({f['short_code'] for f in files}), 4)
+        self.assertTrue(all(len(f['short_code']) == 9 for f in files))
+        self.assertEqual(UserFile.objects.filter(user=self.user).count(), 4)
+        self.assertEqual(StoredObject.objects.get().refcount, 2)
+
+    def test_cap(self):
+        response = self.post([file_row(i) for i in range(UPLOAD_BATCH_MAX + 1)])
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(UserFile.objects.exists())
+        self.assertEqual(self.post([]).status_code, 400)
+        self.assertEqual(self.post(file_row(0)).status_code, 400)
+
+    def test_errors_are_keyed_by_index(self):
+        response = self.post([
+            file_row(0),
+            'not an object',
+            file_row(2, file_type='movie'),
+            {'title': 'no url'},
+            file_row(4, sha256='xyz', size=1),
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(sorted(response.json()['files']), ['1', '2', '3', '4'])
+        self.assertEqual(response.json()['files']['2'], 'Invalid file_type')
+        self.assertFalse(UserFile.objects.exists())
+
+    def test_attach_error_rolls_back_the_whole_batch(self):
+        response = self.post([
+            {'file_type': 'video', 'sha256': KNOWN, 'size': 100},
+            file_row(1),
+            {'file_type': 'video', 'sha256': UNKNOWN, 'size': 100},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.json()['files']), ['2'])
+        self.assertFalse(UserFile.objects.exists())
+        # The reference taken for row 0 was rolled back with the batch
+        self.assertEqual(StoredObject.objects.get().refcount, 1)
+
+    def test_batch_is_searchable(self):
+        self.assertEqual(self.post([file_row(i) for i in range(3)]).status_code, 201)
+        response = self.client.get('/api/my-files/search/', {'q': 'holiday'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 3)
@@ -0,0 +1,112 @@
+import requests
+
+from core import storage
+from core.models import User
+from core.views import R2_PRESIGN_BATCH_MAX
+
+from .r2 import BUCKET, PUBLIC_URL, R2TestCase
+
+
+class PresignTests(R2TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='u', email='u@example.com', password='x')
+
+    def put(self, upload, body, content_type):
+        response = requests.put(upload['presigned_url'], data=body, headers={'Content-Type': content_type})
+        self.assertEqual(response.status_code, 200)
+
+    def test_presigned_put_lands_at_the_public_key(self):
+        response = self.api(self.user).post('/api/r2/presign/', {'file_name': 'clip.mp4', 'file_type': 'video/mp4'})
+        self.assertEqual(response.status_code, 200)
+        upload = response.json()
+        self.assertTrue(upload['key'].startswith('uploads/') and upload['key'].endswith('.mp4'))
+        self.assertEqual(upload['public_url'], f"{PUBLIC_URL}/{upload['key']}")
+
+        self.put(upload, b'video bytes', 'video/mp4')
+        head = self.s3.head_object(Bucket=BUCKET, Key=upload['key'])
+        self.assertEqual((head['ContentLength'], head['ContentType']), (11, 'video/mp4'))
+
+    def test_batch_presign(self):
+        files = [{'file_name': f'ep{i}.mp4', 'file_type': 'video/mp4'} for i in range(3)]
+        response = self.api(self.user).post('/api/r2/presign/batch/', {'files': files}, format='json')
+        self.assertEqual(response.status_code, 200)
+        uploads = response.json()['uploads']
+        self.assertEqual(len({upload['key'] for upload in uploads}), 3)
+        for upload in uploads:
+            self.put(upload, b'x', 'video/mp4')
+        self.assertEqual(self.keys(), sorted(upload['key'] for upload in uploads))
+
+    def test_batch_limits(self):
+        api = self.api(self.user)
+        too_many = [{'file_name': 'a.mp4', 'file_type': 'video/mp4'}] * (R2_PRESIGN_BATCH_MAX + 1)
+        self.assertEqual(api.post('/api/r2/presign/batch/', {'files': too_many}, format='json').status_code, 400)
+        self.assertEqual(api.post('/api/r2/presign/batch/', {'files': []}, format='json').status_code, 400)
+        self.assertEqual(api.post('/api/r2/presign/batch/', {'files': ['a.mp4']}, format='json').status_code, 400)
+
+    def test_client_is_built_once(self):
+        self.assertIs(storage.get_r2_client(), storage.get_r2_client())
+
+
+class MultipartTests(R2TestCase):
+    PART_SIZE = 5 * 1024 * 1024      # S3 minimum for every part but the last
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='u', email='u@example.com', password='x')
+        self.client_api = self.api(self.user)
+
+    def create(self):
+        response = self.client_api.post('/api/r2/multipart/create/', {'file_name': 'movie.mp4', 'file_type': 'video/mp4'})
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    def upload_parts(self, token, bodies):
+        response = self.client_api.post('/api/r2/multipart/parts/', {
+            'upload_token': token, 'part_numbers': list(range(len(bodies), 0, -1)),
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        parts = []
+        for part in response.json()['parts']:
+            put = requests.put(part['url'], data=bodies[part['part_number'] - 1])
+            self.assertEqual(put.status_code, 200)
+            parts.append({'part_number': part['part_number'], 'etag': put.headers['ETag']})
+        return parts
+
+    def test_parts_upload_and_complete(self):
+        upload = self.create()
+        bodies = [b'a' * self.PART_SIZE, b'b' * 1000]
+        parts = self.upload_parts(upload['upload_token'], bodies)
+
+        response = self.client_api.post('/api/r2/multipart/complete/', {
+            'upload_token': upload['upload_token'], 'parts': parts[::-1],
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['public_url'], upload['public_url'])
+        head = self.s3.head_object(Bucket=BUCKET, Key=upload['key'])
+        self.assertEqual((head['ContentLength'], head['ContentType']), (self.PART_SIZE + 1000, 'video/mp4'))
+
+    def test_complete_rejects_bad_etag(self):
+        upload = self.create()
+        parts = self.upload_parts(upload['upload_token'], [b'a' * 1000])
+        parts[0]['etag'] = '"0000"'
+        response = self.client_api.post('/api/r2/multipart/complete/', {
+            'upload_token': upload['upload_token'], 'parts': parts,
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.keys(), [])
+
+    def test_token_is_bound_to_its_user(self):
+        upload = self.create()
+        other = User.objects.create_user(username='o', email='o@example.com', password='x')
+        response = self.api(other).post('/api/r2/multipart/parts/', {
+            'upload_token': upload['upload_token'], 'part_numbers': [1],
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_abort_frees_parts(self):
+        upload = self.create()
+        self.upload_parts(upload['upload_token'], [b'a' * 1000])
+        response = self.client_api.post('/api/r2/multipart/abort/', {'upload_token': upload['upload_token']})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Uploads', self.s3.list_multipart_uploads(Bucket=BUCKET))
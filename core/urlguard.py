@@ -0,0 +1,62 @@
+# core/urlguard.py
+# Guard for server-side fetches of user-supplied URLs (verify_storage,
+# check_links; ffprobe / HLS packaging also need an allowed media host). Without it any uploader could point
+# a file at http://169.254.169.254/ or an internal admin port and read the
+# answer back through size, status or duration fields.
+
+import ipaddress
+import socket
+from urllib.parse import urljoin, urlsplit
+
+import requests
+from django.conf import settings
+
+ALLOWED_SCHEMES = ('http', 'https')
+MAX_REDIRECTS = 5
+
+
+class UnsafeURL(Exception):
+    pass
+
+
+def _is_public(address):
+    ip = ipaddress.ip_address(address.split('%', 1)[0])
+    if ip.version == 6 and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    return ip.is_global
+
+
+def check_url(url):
+    """
+    Raise UnsafeURL unless `url` is http(s) and every address its host
+    resolves to is public (no private, loopback, link-local or reserved
+    ranges). FETCH_ALLOW_PRIVATE_HOSTS switches the address check off for
+    local development.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ALLOWED_SCHEMES or not parts.hostname:
+        raise UnsafeURL(f"Only http(s) URLs can be fetched: {url[:100]}")
+    if settings.FETCH_ALLOW_PRIVATE_HOSTS:
+        return
+    try:
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        infos = socket.getaddrinfo(parts.hostname, port, proto=socket.IPPROTO_TCP)
+    except (socket.gaierror, UnicodeError, ValueError) as e:
+        raise UnsafeURL(f"Cannot resolve {parts.hostname}: {e}")
+    if not all(_is_public(info[4][0]) for info in infos):
+        raise UnsafeURL(f"{parts.hostname} resolves to a non-public address")
+
+
+def safe_request(session, method, url, max_redirects=MAX_REDIRECTS, **kwargs):
+    """
+    session.request() that checks the URL and follows redirects by hand,
+    checking every hop. Raises UnsafeURL or requests.TooManyRedirects.
+    """
+    for _ in range(max_redirects + 1):
+        check_url(url)
+        response = session.request(method, url, allow_redirects=False, **kwargs)
+        if not response.is_redirect:
+            return response
+        response.close()
+        url = urljoin(url, response.headers['Location'])
+    raise requests.TooManyRedirects(f"More than {max_redirects} redirects")
@@ -1,6 +1,7 @@
 # core/urls.py
 # FINAL & COMPLETE — User + Admin + System Endpoints
 
+from django.conf import settings
 from django.urls import path
 from rest_framework.authtoken.views import ObtainAuthToken
 
@@ -12,6 +13,7 @@ from .views import (
     ProfileView,
     UploadFileView,
     MyFilesView,
+    MyFilesSearchView,
     AnalyticsView,
     CreateWithdrawalView,
     WithdrawalListView,
@@ -42,6 +44,11 @@ from .views import (
     billing_summary,
     public_site_settings,
     r2_presign,
+    r2_presign_batch,
+    r2_multipart_create,
+    r2_multipart_parts,
+    r2_multipart_complete,
+    r2_multipart_abort,
 
     # ========================
     # ADMIN AUTH & PANEL
@@ -69,6 +76,10 @@ from .views import (
 # SYSTEM / INTERNAL VIEWS
 # ========================
 
+if settings.ASYNC_COUNTERS:
+    # ASGI deployments: async fast path, same URLs and responses
+    from .async_views import increment_view, increment_download
+
 urlpatterns = [
 
     # =====================================================
@@ -86,6 +97,7 @@ urlpatterns = [
     path("imagekit/auth/", imagekit_auth, name="imagekit_auth"),
     path("system/migrate-authtoken/", migrate_authtoken),
     path("my-files/", MyFilesView.as_view(), name="my_files"),
+    path("my-files/search/", MyFilesSearchView.as_view(), name="my_files_search"),
     path("analytics/", AnalyticsView.as_view(), name="analytics"),
     path("withdraw/", CreateWithdrawalView.as_view(), name="withdraw"),
     path("withdrawals/", WithdrawalListView.as_view(), name="withdrawals"),
@@ -95,6 +107,11 @@ urlpatterns = [
     # File update (title / thumbnail etc.)
     path("files/<int:pk>/update/", update_file, name="update_file"),
     path('r2/presign/', r2_presign, name="r2_presign"),
+    path('r2/presign/batch/', r2_presign_batch, name="r2_presign_batch"),
+    path('r2/multipart/create/', r2_multipart_create, name="r2_multipart_create"),
+    path('r2/multipart/parts/', r2_multipart_parts, name="r2_multipart_parts"),
+    path('r2/multipart/complete/', r2_multipart_complete, name="r2_multipart_complete"),
+    path('r2/multipart/abort/', r2_multipart_abort, name="r2_multipart_abort"),
 
     # Public file access (short URL)
     path("f/<str:short_code>/", public_file_view, name="public_file_view"),
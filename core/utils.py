@@ -1,4 +1,10 @@
 import hashlib
+from datetime import datetime, time, timedelta
+from itertools import islice
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
 
 def get_client_ip(request):
     x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
@@ -15,4 +21,45 @@ def is_unique_view_today(file, ip):
         file=file,
         ip_address=ip,
         viewed_at__date=date.today()
-    ).exists()
\ No newline at end of file
+    ).exists()
+
+
+def chunked(iterable, size):
+    """Yield lists of up to `size` items from any iterable (e.g. qs.iterator())."""
+    it = iter(iterable)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+# ========================
+# ADMIN LIST FILTERS
+# ========================
+def filter_by_date_range(qs, request, field):
+    """
+    ?date_from=YYYY-MM-DD&date_to=YYYY-MM-DD (both inclusive).
+    Plain range on the column (no __date cast) so the index stays usable.
+    """
+    for param, lookup, shift in (('date_from', 'gte', 0), ('date_to', 'lt', 1)):
+        value = request.query_params.get(param)
+        if not value:
+            continue
+        try:
+            day = parse_date(value)
+        except ValueError:
+            day = None
+        if day is None:
+            raise ValidationError({param: "Use YYYY-MM-DD"})
+        bound = timezone.make_aware(datetime.combine(day + timedelta(days=shift), time.min))
+        qs = qs.filter(**{f"{field}__{lookup}": bound})
+    return qs
+
+
+def filter_by_username_prefix(qs, request, field='username'):
+    """?username=<prefix> — case-sensitive startswith uses the username LIKE index."""
+    prefix = request.query_params.get('username', '').strip()
+    if prefix:
+        qs = qs.filter(**{f"{field}__startswith": prefix})
+    return qs
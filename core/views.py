@@ -11,13 +11,10 @@ import io
 import random
 import string
 import time
-import boto3
 import hashlib
-import requests
 import hmac
 import binascii
-import uuid
-from django.db import connection
+from django.db import connection, transaction
 from datetime import timedelta
 from decimal import Decimal
 
@@ -37,15 +34,30 @@ from django.core.mail import send_mail
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, generics
-from rest_framework.decorators import api_view, permission_classes, authentication_classes
+from rest_framework.decorators import api_view, permission_classes, authentication_classes, renderer_classes
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated, AllowAny, BasePermission
 from rest_framework.authtoken.models import Token
+from botocore.exceptions import ClientError
 
 from .models import UserFile, FileView, Withdrawal, SiteSettings, BotLink, FileDownload, BroadcastNotification, User
 from .serializers import UserProfileSerializer, FileSerializer, WithdrawalSerializer, BotLinkSerializer, BroadcastNotificationSerializer, SiteSettingsSerializer
-from .services import calculate_earnings_per_1000_views, calculate_earnings_per_1000_downloads
-from .utils import get_client_ip, is_unique_view_today
+from .services import calculate_earnings_per_1000_views, calculate_earnings_per_1000_downloads, related_files, trending_score_subquery
+from .emails import (
+    email_service_configured, queue_email_verification_otp, queue_login_otp,
+    queue_password_reset_otp, queue_signup_otp,
+)
+from .pagination import KeysetPagination
+from .shortcodes import allocate_short_codes
+from .storage import (
+    MULTIPART_MAX_PARTS, MULTIPART_PRESIGN_BATCH,
+    abort_multipart_upload, complete_multipart_upload, create_multipart_upload,
+    multipart_token, presign_upload, presign_upload_part, read_multipart_token,
+    public_url as storage_public_url,
+    claim_stored_object, find_stored_objects, grant_presigned_uploads, parse_content_hash,
+)
+from .renderers import ADMIN_RENDERERS, admin_list_response
+from .utils import get_client_ip, is_unique_view_today, filter_by_date_range, filter_by_username_prefix
 
 User = get_user_model()
 
@@ -139,43 +151,12 @@ def send_email_otp(request):
     user.email_otp_expiry = timezone.now() + timedelta(minutes=10)
     user.save(update_fields=['email_otp', 'email_otp_expiry'])
 
-    api_key = os.environ.get("BREVO_API_KEY")
-    if not api_key:
+    if not email_service_configured():
         return Response({"error": "Email service not configured"}, status=500)
 
-    url = "https://api.brevo.com/v3/smtp/email"
-    payload = {
-        "sender": {"name": "DiskWala", "email": "diskwala01@gmail.com"},
-        "to": [{"email": user.email, "name": user.username}],
-        "subject": "DiskWala - Email Verification OTP",
-        "htmlContent": f"""
-        <html>
-          <body>
-            <h2>Welcome to DiskWala!</h2>
-            <p>Your OTP for email verification is: <strong style="font-size:1.5em">{otp}</strong></p>
-            <p>This OTP is valid for <strong>10 minutes</strong> only.</p>
-            <p>Do not share this OTP with anyone.</p>
-            <br>
-            <p>Thanks,<br>DiskWala Team</p>
-          </body>
-        </html>
-        """
-    }
-    headers = {
-        "accept": "application/json",
-        "api-key": api_key,
-        "content-type": "application/json"
-    }
-
-    try:
-        response = requests.post(url, json=payload, headers=headers, timeout=10)
-        response.raise_for_status()
-        return Response({"message": "OTP sent successfully to your email"})
-    except requests.exceptions.RequestException as e:
-        print("Brevo API Error:", e)
-        if hasattr(e, 'response') and e.response is not None:
-            print("Response:", e.response.text)
-        return Response({"error": "Failed to send OTP. Please try again later."}, status=500)
+    # Outbox row — the send_emails worker delivers it
+    queue_email_verification_otp(user, otp)
+    return Response({"message": "OTP sent successfully to your email"})
 
 @api_view(['POST'])
 @authentication_classes([TokenAuthentication])
@@ -207,35 +188,166 @@ def verify_email_otp(request):
 # ========================
 # FILE UPLOAD & PUBLIC VIEW
 # ========================
+UPLOAD_BATCH_MAX = 100
+
+
+def _validate_upload(item):
+    """(cleaned fields, content hash, None) or (None, None, error message) for one file descriptor."""
+    if not isinstance(item, dict):
+        return None, None, "Each file must be an object"
+    sha256, size, hash_error = parse_content_hash(item)
+    if hash_error:
+        return None, None, hash_error
+    file_url = item.get('file_url') or ''
+    file_type = item.get('file_type')
+    if (not file_url and not sha256) or not file_type:
+        return None, None, "file_url and file_type are required"
+    if file_type not in ['video', 'image', 'other']:
+        return None, None, "Invalid file_type"
+    return {
+        'title': item.get('title') or 'Untitled',
+        'file_type': file_type,
+        'allow_download': item.get('allow_download', True),
+        'external_file_url': file_url,
+        'external_thumbnail_url': item.get('thumbnail_url') or file_url,
+    }, (sha256, size) if sha256 else None, None
+
+
+def _attach_stored_object(user, fields, content_hash):
+    """
+    Point `fields` at the shared StoredObject for this content (taking a
+    reference). Returns an error message when a hash-only registration names
+    content we don't have. Runs inside the transaction that creates the file.
+    """
+    if content_hash is None:
+        return None
+    file_url = fields['external_file_url']
+    stored = claim_stored_object(user, *content_hash, file_url)
+    if stored is None:
+        return None if file_url else "Unknown sha256 — upload the file and register it with file_url"
+    url = storage_public_url(stored.key)
+    if fields['external_thumbnail_url'] in ('', file_url):
+        fields['external_thumbnail_url'] = url
+    fields['external_file_url'] = url
+    fields['stored_object'] = stored
+    return None
+
+
+def _storage_quota_error(user, incoming_bytes):
+    """
+    403 response when the upload would push the user past SiteSettings.storage_quota_mb.
+    Reads the running User.storage_bytes total (sizes land there once
+    verify_storage has HEAD-checked a file) plus the client-declared sizes.
+    """
+    quota_mb = SiteSettings.get_settings().storage_quota_mb
+    if not quota_mb:
+        return None
+    quota_bytes = quota_mb * 1024 * 1024
+    if user.storage_bytes + incoming_bytes <= quota_bytes:
+        return None
+    return Response({
+        "error": "Storage quota exceeded",
+        "storage_bytes": user.storage_bytes,
+        "quota_bytes": quota_bytes,
+    }, status=403)
+
+
 class UploadFileView(APIView):
+    """
+    Register uploaded file(s).
+    Single: {"file_url", "file_type", "title", "thumbnail_url", "allow_download"}
+    Batch:  {"files": [{...}, ...]} (up to UPLOAD_BATCH_MAX) → {"files": [...]}; all-or-nothing
+    Either form may add "sha256" + "size"; known content then needs no file_url
+    and shares the existing R2 object.
+    """
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        file_url = request.data.get('file_url')
+        if 'files' in request.data:
+            return self.post_batch(request, request.data.get('files'))
+
+        file_url = request.data.get('file_url') or ''
         thumbnail_url = request.data.get('thumbnail_url')
         title = request.data.get('title', 'Untitled')
         file_type = request.data.get('file_type')
         allow_download = request.data.get('allow_download', True)
 
-        if not file_url or not file_type:
+        sha256, size, hash_error = parse_content_hash(request.data)
+        if hash_error:
+            return Response({"error": hash_error}, status=400)
+
+        if (not file_url and not sha256) or not file_type:
             return Response({"error": "file_url and file_type are required"}, status=400)
 
         if file_type not in ['video', 'image', 'other']:
             return Response({"error": "Invalid file_type"}, status=400)
 
-        user_file = UserFile.objects.create(
-            user=request.user,
-            title=title,
-            file_type=file_type,
-            short_code=''.join(random.choices(string.ascii_uppercase + string.digits, k=8)),
-            allow_download=allow_download,
-            external_file_url=file_url,
-            external_thumbnail_url=thumbnail_url or file_url,
-        )
+        quota_error = _storage_quota_error(request.user, size or 0)
+        if quota_error:
+            return quota_error
+
+        fields = {
+            'external_file_url': file_url,
+            'external_thumbnail_url': thumbnail_url or file_url,
+        }
+        with transaction.atomic():
+            error = _attach_stored_object(request.user, fields, (sha256, size) if sha256 else None)
+            if error:
+                return Response({"error": error}, status=400)
+            user_file = UserFile.objects.create(
+                user=request.user,
+                title=title,
+                file_type=file_type,
+                allow_download=allow_download,
+                **fields,
+            )
 
         return Response(FileSerializer(user_file, context={'request': request}).data, status=201)
 
+    def post_batch(self, request, files):
+        if not isinstance(files, list) or not files:
+            return Response({"error": "files must be a non-empty list"}, status=400)
+        if len(files) > UPLOAD_BATCH_MAX:
+            return Response({"error": f"At most {UPLOAD_BATCH_MAX} files per request"}, status=400)
+
+        cleaned, errors = [], {}
+        for index, item in enumerate(files):
+            fields, content_hash, error = _validate_upload(item)
+            if error:
+                errors[index] = error
+            else:
+                cleaned.append((fields, content_hash))
+        if errors:
+            return Response({"error": "Invalid files", "files": errors}, status=400)
+
+        quota_error = _storage_quota_error(request.user, sum(h[1] for _, h in cleaned if h))
+        if quota_error:
+            return quota_error
+
+        # Allocator codes are unique by construction — no taken-check, no retry
+        codes = allocate_short_codes(len(cleaned))
+        with transaction.atomic():
+            for index, (fields, content_hash) in enumerate(cleaned):
+                error = _attach_stored_object(request.user, fields, content_hash)
+                if error:
+                    errors[index] = error
+            if errors:
+                # Undo the refcounts already taken for this batch
+                transaction.set_rollback(True)
+                return Response({"error": "Invalid files", "files": errors}, status=400)
+            created = UserFile.objects.bulk_create([
+                UserFile(user=request.user, short_code=code, **fields)
+                for code, (fields, _) in zip(codes, cleaned)
+            ])
+
+        # bulk_create skips save(), so index the batch for "search my files" here
+        UserFile.search_index.refresh([f.pk for f in created])
+
+        return Response({
+            "files": FileSerializer(created, many=True, context={'request': request}).data
+        }, status=201)
+
 
 @api_view(['PATCH'])
 @authentication_classes([TokenAuthentication])
@@ -404,6 +516,9 @@ def public_file_view(request, short_code):
         'website': file_obj.user.website or None,
         'telegram_channel': file_obj.user.telegram_channel or None,
         'support_link': file_obj.user.support_link or None,
+
+        # "Viewers also watched" — precomputed by compute_related
+        'related': related_files(file_obj),
     })
 
     # ====================
@@ -442,13 +557,20 @@ def user_files_view(request, username):
     """
     Username se user ki saari active video files return karo
     URL: /api/user-files/{username}/
+    ?sort=trending → top 12 by precomputed decayed popularity instead of all-time views
     """
     try:
         user = get_object_or_404(User, username=username)
         files = UserFile.objects.filter(
             user=user,
             is_active=True,  # Sirf videos
-        ).order_by('-views', '-created_at')[:12]  # Top 12 by views, newest
+        )
+        if request.query_params.get('sort') == 'trending':
+            files = files.annotate(
+                trending_score=trending_score_subquery('file')
+            ).order_by('-trending_score', '-views', '-created_at')[:12]
+        else:
+            files = files.order_by('-views', '-created_at')[:12]  # Top 12 by views, newest
         
         serializer = FileSerializer(files, many=True, context={'request': request})
         return Response({'files': serializer.data})
@@ -541,9 +663,43 @@ class MyFilesView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        files = request.user.files.all().order_by('-created_at')
-        serializer = FileSerializer(files, many=True, context={'request': request})
-        return Response(serializer.data)
+        files = request.user.files.select_related('user')
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(files, request, view=self)
+        serializer = FileSerializer(page, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
+
+
+class MyFilesSearchView(APIView):
+    """
+    Search within the creator's own files.
+    ?q=<text> (ranked full-text over title + description)
+    ?file_type=video|image|other  ?is_active=true|false
+    ?cursor= ?page_size=
+    """
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        files = UserFile.objects.filter(user=request.user).select_related('user')
+
+        file_type = request.query_params.get('file_type')
+        if file_type:
+            files = files.filter(file_type=file_type)
+        is_active = request.query_params.get('is_active')
+        if is_active in ('true', 'false'):
+            files = files.filter(is_active=(is_active == 'true'))
+
+        term = request.query_params.get('q', '').strip()
+        if term:
+            files = UserFile.search_index.search(files, term)
+            paginator = KeysetPagination(ordering=('-search_rank', '-id'))
+        else:
+            paginator = KeysetPagination()
+
+        page = paginator.paginate_queryset(files, request, view=self)
+        serializer = FileSerializer(page, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
 
 
 class AnalyticsView(APIView):
@@ -704,67 +860,111 @@ class WithdrawalListView(generics.ListAPIView):
 # ADMIN PANEL — ONLY SUPERUSER
 # ========================
 
-@api_view(['GET'])
-@permission_classes([IsSuperuser])
-def admin_users(request):
-    users = User.objects.all().annotate(
-        file_count=Count('files'),
-        view_earnings=Sum('files__earnings'),
-        download_earnings=Sum('files__download_earnings')
-    )
-
-    data = []
 
-    for u in users:
-        total = (u.view_earnings or 0) + (u.download_earnings or 0)
+def _attach_user_file_totals(rows):
+    # Aggregate files only for the users on this page / export chunk
+    totals = {
+        t['user_id']: t for t in UserFile.objects.filter(
+            user_id__in=[r['id'] for r in rows]
+        ).values('user_id').annotate(
+            file_count=Count('id'),
+            view_earnings=Sum('earnings'),
+            download_earnings=Sum('download_earnings'),
+        ).order_by()
+    }
+    for r in rows:
+        r['_totals'] = totals.get(r['id'], {})
 
-        data.append({
-            "id": u.id,
-            "username": u.username,
-            "email": u.email,
 
-            # REAL CALCULATED EARNINGS
-            "total_earnings": float(total),
+def _admin_user_row(u):
+    t = u['_totals']
+    total = (t.get('view_earnings') or 0) + (t.get('download_earnings') or 0)
+    return {
+        "id": u['id'],
+        "username": u['username'],
+        "email": u['email'],
 
-            # Existing fields
-            "pending_earnings": float(u.pending_earnings or 0),
-            "paid_earnings": float(u.paid_earnings or 0),
+        # REAL CALCULATED EARNINGS
+        "total_earnings": float(total),
 
-            "file_count": u.file_count,
-            "is_active": u.is_active,
-            "created_at": u.created_at
-        })
+        # Existing fields
+        "pending_earnings": float(u['pending_earnings'] or 0),
+        "paid_earnings": float(u['paid_earnings'] or 0),
 
-    return Response(data)
+        "file_count": t.get('file_count', 0),
+        "is_active": u['is_active'],
+        "created_at": u['created_at']
+    }
 
 
 @api_view(['GET'])
 @permission_classes([IsSuperuser])
-def admin_all_files(request):
-    files = UserFile.objects.select_related('user').all()
+@renderer_classes(ADMIN_RENDERERS)
+def admin_users(request):
+    """
+    Filters: ?status=active|banned ?username=<prefix> ?date_from= ?date_to=
+    Paging: ?cursor= ?page_size=   Export: ?format=ndjson
+    """
+    users = User.objects.all()
 
-    data = []
-    for f in files:
-        data.append({
-            "id": f.id,
-            "title": f.title or "Untitled",
-            "user_username": f.user.username if f.user else "Deleted User",
-            "views": f.views,
-            "downloads": f.downloads,
-            "earnings": round(float(f.earnings), 5),
-            "is_active": f.is_active,
-            "created_at": f.created_at.strftime("%b %d, %Y"),
-            "file_url": f.external_file_url or "",
-            "thumbnail_url": (
-                f.external_thumbnail_url
-                or (f.external_file_url if f.file_type == "image" else
-                    "https://via.placeholder.com/80x80/333/fff?text=No+Image")
-            ),
-            # Ye line add kar do ↓↓↓
-            "short_code": f.short_code,
-        })
+    status_filter = request.query_params.get('status')
+    if status_filter in ('active', 'banned'):
+        users = users.filter(is_active=(status_filter == 'active'))
+    users = filter_by_username_prefix(users, request)
+    users = filter_by_date_range(users, request, 'created_at')
+
+    users = users.values(
+        'id', 'username', 'email', 'pending_earnings', 'paid_earnings', 'is_active', 'created_at'
+    )
+    return admin_list_response(
+        request, users, _admin_user_row, 'users.ndjson', attach=_attach_user_file_totals
+    )
 
-    return Response(data)
+
+def _admin_file_row(f):
+    return {
+        "id": f['id'],
+        "title": f['title'] or "Untitled",
+        "user_username": f['user__username'] or "Deleted User",
+        "views": f['views'],
+        "downloads": f['downloads'],
+        "earnings": round(float(f['earnings']), 5),
+        "is_active": f['is_active'],
+        "created_at": f['created_at'].strftime("%b %d, %Y"),
+        "file_url": f['external_file_url'] or "",
+        "thumbnail_url": (
+            f['external_thumbnail_url']
+            or (f['external_file_url'] if f['file_type'] == "image" else
+                "https://via.placeholder.com/80x80/333/fff?text=No+Image")
+        ),
+        "short_code": f['short_code'],
+    }
+
+
+@api_view(['GET'])
+@permission_classes([IsSuperuser])
+@renderer_classes(ADMIN_RENDERERS)
+def admin_all_files(request):
+    """
+    Filters: ?status=active|inactive ?file_type= ?username=<prefix> ?date_from= ?date_to=
+    Paging: ?cursor= ?page_size=   Export: ?format=ndjson
+    """
+    files = UserFile.objects.all()
+
+    status_filter = request.query_params.get('status')
+    if status_filter in ('active', 'inactive'):
+        files = files.filter(is_active=(status_filter == 'active'))
+    file_type = request.query_params.get('file_type')
+    if file_type:
+        files = files.filter(file_type=file_type)
+    files = filter_by_username_prefix(files, request, 'user__username')
+    files = filter_by_date_range(files, request, 'created_at')
+
+    files = files.values(
+        'id', 'title', 'user__username', 'views', 'downloads', 'earnings', 'is_active',
+        'created_at', 'file_type', 'external_file_url', 'external_thumbnail_url', 'short_code',
+    )
+    return admin_list_response(request, files, _admin_file_row, 'files.ndjson')
 
 
 @api_view(['GET'])
@@ -856,6 +1056,9 @@ def admin_settings(request):
             # ★★★ Custom Third-Party Ad Script (नया फीचर) ★★★
             "custom_ad_script": settings_obj.custom_ad_script or "",
             "custom_ad_script_enabled": settings_obj.custom_ad_script_enabled,
+
+            # Storage
+            "storage_quota_mb": settings_obj.storage_quota_mb,
         })
 
     elif request.method == 'PATCH':
@@ -917,6 +1120,13 @@ def admin_settings(request):
         if 'custom_ad_script_enabled' in request.data:
             settings_obj.custom_ad_script_enabled = bool(request.data['custom_ad_script_enabled'])
 
+        # Storage (0 = unlimited)
+        if 'storage_quota_mb' in request.data:
+            try:
+                settings_obj.storage_quota_mb = max(0, int(request.data['storage_quota_mb']))
+            except (TypeError, ValueError):
+                return Response({"error": "storage_quota_mb must be an integer"}, status=400)
+
         # Save to database
         settings_obj.save()
 
@@ -931,23 +1141,43 @@ def admin_settings(request):
 
     return Response({"error": "Method not allowed"}, status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
+def _admin_withdrawal_row(w):
+    return {
+        'id': w['id'],
+        'user_username': w['user__username'],
+        'amount': str(w['amount']),
+        'payment_method': w['payment_method'],
+        'payment_details': w['payment_details'],
+        'status': w['status'],
+        'requested_at': w['requested_at'].isoformat(),
+        'processed_at': w['processed_at'].isoformat() if w['processed_at'] else None,
+    }
+
+
 @api_view(['GET'])
 @permission_classes([IsSuperuser])
+@renderer_classes(ADMIN_RENDERERS)
 def admin_withdrawals(request):
-    withdrawals = Withdrawal.objects.select_related('user').all().order_by('-requested_at')
-    data = []
-    for w in withdrawals:
-        data.append({
-            'id': w.id,
-            'user_username': w.user.username,
-            'amount': str(w.amount),
-            'payment_method': w.payment_method,
-            'payment_details': w.payment_details,  # ← yahi missing tha
-            'status': w.status,
-            'requested_at': w.requested_at.isoformat(),
-            'processed_at': w.processed_at.isoformat() if w.processed_at else None,
-        })
-    return Response(data)
+    """
+    Filters: ?status=pending|paid|rejected ?username=<prefix> ?date_from= ?date_to=
+    Paging: ?cursor= ?page_size=   Export: ?format=ndjson
+    """
+    withdrawals = Withdrawal.objects.all()
+
+    status_filter = request.query_params.get('status')
+    if status_filter and status_filter != 'all':
+        withdrawals = withdrawals.filter(status=status_filter)
+    withdrawals = filter_by_username_prefix(withdrawals, request, 'user__username')
+    withdrawals = filter_by_date_range(withdrawals, request, 'requested_at')
+
+    withdrawals = withdrawals.values(
+        'id', 'user__username', 'amount', 'payment_method', 'payment_details',
+        'status', 'requested_at', 'processed_at',
+    )
+    return admin_list_response(
+        request, withdrawals, _admin_withdrawal_row, 'withdrawals.ndjson',
+        ordering=('-requested_at', '-id'),
+    )
 
 
 @api_view(['POST'])
@@ -994,7 +1224,7 @@ def admin_ban_user(request, pk):
 @permission_classes([IsSuperuser])
 def admin_delete_file(request, pk):
     file = get_object_or_404(UserFile, pk=pk)
-    file.delete()
+    file.delete()  # core/signals.py releases the shared R2 object and storage bytes
     return Response({"message": "File deleted permanently"})
 
 
@@ -1319,42 +1549,12 @@ def forgot_password(request):
     user.email_otp_expiry = timezone.now() + timedelta(minutes=10)
     user.save(update_fields=['email_otp', 'email_otp_expiry'])
 
-    # Send Email via Brevo
-    api_key = os.environ.get("BREVO_API_KEY")
-    if not api_key:
+    if not email_service_configured():
         return Response({"error": "Email service not configured"}, status=500)
 
-    url = "https://api.brevo.com/v3/smtp/email"
-    payload = {
-        "sender": {"name": "Royaldisk", "email": "Royaldisk01@gmail.com"},
-        "to": [{"email": user.email, "name": user.username}],
-        "subject": "Royaldisk - Password Reset OTP",
-        "htmlContent": f"""
-        <html>
-          <body>
-            <h2>Password Reset Request</h2>
-            <p>Your OTP for password reset is: <strong style="font-size:1.5em">{otp}</strong></p>
-            <p>This OTP is valid for <strong>10 minutes</strong> only.</p>
-            <p>If you didn't request this, ignore this email.</p>
-            <br>
-            <p>Thanks,<br>Royaldisk Team</p>
-          </body>
-        </html>
-        """
-    }
-    headers = {
-        "accept": "application/json",
-        "api-key": api_key,
-        "content-type": "application/json"
-    }
-
-    try:
-        response = requests.post(url, json=payload, headers=headers, timeout=10)
-        response.raise_for_status()
-        return Response({"message": "If email exists, OTP has been sent."})
-    except requests.exceptions.RequestException as e:
-        print("Brevo Error:", e)
-        return Response({"error": "Failed to send OTP"}, status=500)
+    # Outbox row — the send_emails worker delivers it
+    queue_password_reset_otp(user, otp)
+    return Response({"message": "If email exists, OTP has been sent."})
 
 
 @api_view(['POST'])
@@ -1407,35 +1607,178 @@ def get_active_notification(request):
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def r2_presign(request):
+    """
+    Body: {"file_name", "file_type"} plus optional "sha256" (hex) and "size".
+    With a hash, content we already store comes back as {"duplicate": true,
+    "key", "public_url"} — skip the upload and register with the sha256.
+    """
     file_name = request.data.get('file_name', 'file')
     file_type = request.data.get('file_type', 'application/octet-stream')
+    sha256, size, hash_error = parse_content_hash(request.data)
+    if hash_error:
+        return Response({"error": hash_error}, status=400)
 
-    ext = file_name.rsplit('.', 1)[-1] if '.' in file_name else ''
-    key = f"uploads/{uuid.uuid4()}.{ext}" if ext else f"uploads/{uuid.uuid4()}"
+    if sha256:
+        existing = find_stored_objects({(sha256, size)}).get((sha256, size))
+        if existing:
+            return JsonResponse(_duplicate_upload(existing))
+    upload = presign_upload(file_name, file_type, sha256=sha256)
+    if sha256:
+        grant_presigned_uploads(request.user, [(upload['key'], sha256, size)])
+    return JsonResponse(upload)
 
-    s3 = boto3.client(
-        's3',
-        endpoint_url=f"https://{settings.R2_ACCOUNT_ID}.r2.cloudflarestorage.com",
-        aws_access_key_id=settings.R2_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.R2_SECRET_ACCESS_KEY,
-        region_name='auto'
-    )
 
-    presigned_url = s3.generate_presigned_url(
-        'put_object',
-        Params={
-            'Bucket': settings.R2_BUCKET_NAME,
-            'Key': key,
-            'ContentType': file_type
-        },
-        ExpiresIn=3600
-    )
+def _duplicate_upload(stored):
+    return {'duplicate': True, 'key': stored.key, 'public_url': storage_public_url(stored.key)}
+
+
+R2_PRESIGN_BATCH_MAX = 50
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def r2_presign_batch(request):
+    """
+    Sign several uploads in one call (multi-file / episode uploads).
+    Body: {"files": [{"file_name": "ep1.mp4", "file_type": "video/mp4", "sha256"?, "size"?}, ...]}
+    """
+    files = request.data.get('files')
+    if not isinstance(files, list) or not files:
+        return Response({"error": "files must be a non-empty list"}, status=400)
+    if len(files) > R2_PRESIGN_BATCH_MAX:
+        return Response({"error": f"At most {R2_PRESIGN_BATCH_MAX} files per batch"}, status=400)
+    if not all(isinstance(f, dict) for f in files):
+        return Response({"error": "Each file must be an object with file_name and file_type"}, status=400)
+
+    hashes = []
+    for f in files:
+        sha256, size, hash_error = parse_content_hash(f)
+        if hash_error:
+            return Response({"error": hash_error}, status=400)
+        hashes.append((sha256, size) if sha256 else None)
+    existing = find_stored_objects({h for h in hashes if h})
+
+    uploads = [
+        _duplicate_upload(existing[h]) if h in existing else presign_upload(
+            str(f.get('file_name') or 'file'),
+            str(f.get('file_type') or 'application/octet-stream'),
+            sha256=h[0] if h else None,
+        )
+        for f, h in zip(files, hashes)
+    ]
+    grant_presigned_uploads(request.user, [
+        (upload['key'], *h) for upload, h in zip(uploads, hashes) if h and not upload.get('duplicate')
+    ])
+    return Response({"uploads": uploads})
+
+# ========================
+# R2 MULTIPART UPLOADS (large videos)
+# ========================
+def _multipart_upload_or_error(request):
+    found = read_multipart_token(str(request.data.get('upload_token', '')), request.user.id)
+    if found is None:
+        return None, Response({"error": "Invalid or expired upload_token"}, status=400)
+    return found, None
+
+
+def _part_number(value):
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return None
+    return number if 1 <= number <= MULTIPART_MAX_PARTS else None
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def r2_multipart_create(request):
+    """Body: {"file_name": "movie.mp4", "file_type": "video/mp4"}"""
+    file_name = str(request.data.get('file_name') or 'file')
+    file_type = str(request.data.get('file_type') or 'application/octet-stream')
+
+    try:
+        key, upload_id = create_multipart_upload(file_name, file_type)
+    except ClientError as e:
+        return Response({"error": f"Could not start upload: {e}"}, status=502)
+
+    return Response({
+        'upload_token': multipart_token(request.user.id, key, upload_id),
+        'key': key,
+        'public_url': storage_public_url(key),
+        'max_parts': MULTIPART_MAX_PARTS,
+    }, status=201)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def r2_multipart_parts(request):
+    """
+    Body: {"upload_token": "...", "part_numbers": [1, 2, 3]}
+    Up to MULTIPART_PRESIGN_BATCH URLs per call; ask again for a failed part.
+    """
+    upload, error = _multipart_upload_or_error(request)
+    if error:
+        return error
+    key, upload_id = upload
+
+    raw = request.data.get('part_numbers')
+    if not isinstance(raw, list) or not raw:
+        return Response({"error": "part_numbers must be a non-empty list"}, status=400)
+    if len(raw) > MULTIPART_PRESIGN_BATCH:
+        return Response({"error": f"At most {MULTIPART_PRESIGN_BATCH} parts per call"}, status=400)
+    numbers = [_part_number(n) for n in raw]
+    if None in numbers:
+        return Response({"error": f"Part numbers must be 1..{MULTIPART_MAX_PARTS}"}, status=400)
+
+    return Response({"parts": [
+        {'part_number': n, 'url': presign_upload_part(key, upload_id, n)} for n in sorted(set(numbers))
+    ]})
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def r2_multipart_complete(request):
+    """Body: {"upload_token": "...", "parts": [{"part_number": 1, "etag": "\"abc...\""}, ...]}"""
+    upload, error = _multipart_upload_or_error(request)
+    if error:
+        return error
+    key, upload_id = upload
+
+    raw = request.data.get('parts')
+    if not isinstance(raw, list) or not raw or len(raw) > MULTIPART_MAX_PARTS:
+        return Response({"error": "parts must be a non-empty list"}, status=400)
+    parts = {}
+    for part in raw:
+        number = _part_number(part.get('part_number')) if isinstance(part, dict) else None
+        etag = part.get('etag') if isinstance(part, dict) else None
+        if number is None or not etag:
+            return Response({"error": "Each part needs part_number and etag"}, status=400)
+        parts[number] = str(etag)
+
+    try:
+        complete_multipart_upload(key, upload_id, parts.items())
+    except ClientError as e:
+        return Response({"error": f"Could not complete upload: {e}"}, status=400)
+
+    return Response({'key': key, 'public_url': storage_public_url(key)})
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def r2_multipart_abort(request):
+    """Body: {"upload_token": "..."} — frees the parts already stored."""
+    upload, error = _multipart_upload_or_error(request)
+    if error:
+        return error
+    key, upload_id = upload
+
+    try:
+        abort_multipart_upload(key, upload_id)
+    except ClientError as e:
+        return Response({"error": f"Could not abort upload: {e}"}, status=400)
+
+    return Response({"message": "Upload aborted"})
 
-    return JsonResponse({
-        'presigned_url': presigned_url,
-        'public_url': f"{settings.R2_PUBLIC_URL}/{key}",
-        'key': key
-    })
 
 @api_view(['GET', 'POST'])
 @permission_classes([IsSuperuser])
@@ -1582,66 +1925,33 @@ def signup(request):
     if User.objects.filter(email=email).exists():
         return Response({"error": "Email already registered"}, status=400)
 
-    # Create user (inactive till OTP verify)
-    user = User.objects.create_user(
-        username=username,
-        email=email,
-        password=password,
-        is_active=False,
-        email_verified=False
-    )
+    if not email_service_configured():
+        return Response({"error": "Email service not configured on server"}, status=500)
 
-    # Generate OTP
-    otp = ''.join(random.choices('0123456789', k=6))
-    user.email_otp = otp
-    user.email_otp_expiry = timezone.now() + timedelta(minutes=10)
-    user.save(update_fields=['email_otp', 'email_otp_expiry'])
+    # User + OTP + outbox row commit together — no half-created accounts
+    with transaction.atomic():
+        # Create user (inactive till OTP verify)
+        user = User.objects.create_user(
+            username=username,
+            email=email,
+            password=password,
+            is_active=False,
+            email_verified=False,
+            signup_pending=True,
+        )
 
-    # Brevo API call (same as your working send_email_otp)
-    api_key = os.environ.get("BREVO_API_KEY")
-    if not api_key:
-        user.delete()  # rollback
-        return Response({"error": "Email service not configured on server"}, status=500)
+        # Generate OTP
+        otp = ''.join(random.choices('0123456789', k=6))
+        user.email_otp = otp
+        user.email_otp_expiry = timezone.now() + timedelta(minutes=10)
+        user.save(update_fields=['email_otp', 'email_otp_expiry'])
 
-    url = "https://api.brevo.com/v3/smtp/email"
-    payload = {
-        "sender": {"name": "DiskWala", "email": "diskwala01@gmail.com"},  # ← apna verified sender daalo
-        "to": [{"email": user.email, "name": user.username or user.email}],
-        "subject": "RoyalDisk - Account Verification OTP",
-        "htmlContent": f"""
-        <html>
-          <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-            <h2>Welcome to RoyalDisk!</h2>
-            <p>Thank you for signing up. Your OTP for account verification is:</p>
-            <h1 style="font-size: 2.8em; letter-spacing: 10px; color: #6366f1; margin: 20px 0;">{otp}</h1>
-            <p>This OTP is valid for <strong>10 minutes</strong> only.</p>
-            <p><strong>Do not share this OTP with anyone.</strong></p>
-            <br>
-            <p>If you didn't sign up, please ignore this email.</p>
-            <p>Thanks,<br>RoyalDisk Team</p>
-          </body>
-        </html>
-        """
-    }
-    headers = {
-        "accept": "application/json",
-        "api-key": api_key,
-        "content-type": "application/json"
-    }
+        queue_signup_otp(user, otp)
 
-    try:
-        response = requests.post(url, json=payload, headers=headers, timeout=10)
-        response.raise_for_status()
-        return Response({
-            "message": "Account created. OTP sent to your email.",
-            "email": email
-        }, status=201)
-    except requests.exceptions.RequestException as e:
-        user.delete()  # rollback on failure
-        print("Brevo signup error:", str(e))
-        if hasattr(e, 'response') and e.response is not None:
-            print("Brevo response:", e.response.text)
-        return Response({"error": "Failed to send OTP. Please try again."}, status=500)
+    return Response({
+        "message": "Account created. OTP sent to your email.",
+        "email": email
+    }, status=201)
 
 
 @api_view(['POST'])
@@ -1667,6 +1977,7 @@ def signup_verify(request):
     # Success → activate account
     user.is_active = True
     user.email_verified = True
+    user.signup_pending = False
     user.email_otp = None
     user.email_otp_expiry = None
     user.save()
@@ -1704,48 +2015,12 @@ def login_otp_request(request):
     user.email_otp_expiry = timezone.now() + timedelta(minutes=10)
     user.save(update_fields=['email_otp', 'email_otp_expiry'])
 
-    # Brevo API call (exact copy of your working send_email_otp logic)
-    api_key = os.environ.get("BREVO_API_KEY")
-    if not api_key:
+    if not email_service_configured():
         return Response({"error": "Email service not configured on server"}, status=500)
 
-    url = "https://api.brevo.com/v3/smtp/email"
-    payload = {
-        "sender": {"name": "DiskWala", "email": "diskwala01@gmail.com"},  # ← change to your sender
-        "to": [{"email": user.email, "name": user.username or user.email}],
-        "subject": "RoyalDisk Login OTP",
-        "htmlContent": f"""
-        <html>
-          <body style="font-family: Arial, sans-serif; line-height: 1.6;">
-            <h2>Welcome back to RoyalDisk!</h2>
-            <p>Your one-time password (OTP) for login is:</p>
-            <h1 style="font-size: 2.5em; letter-spacing: 8px; color: #6366f1;">{otp}</h1>
-            <p>This OTP is valid for <strong>10 minutes</strong> only.</p>
-            <p><strong>Do not share this OTP with anyone.</strong></p>
-            <br>
-            <p>Thanks,<br>RoyalDisk Team</p>
-            <p style="font-size:0.85em; color:#666;">
-              If you didn't request this, please ignore this email.
-            </p>
-          </body>
-        </html>
-        """
-    }
-    headers = {
-        "accept": "application/json",
-        "api-key": api_key,
-        "content-type": "application/json"
-    }
-
-    try:
-        response = requests.post(url, json=payload, headers=headers, timeout=10)
-        response.raise_for_status()
-        return Response({"message": "OTP sent successfully to your email"}, status=200)
-    except requests.exceptions.RequestException as e:
-        print("Brevo API Error:", str(e))
-        if hasattr(e, 'response') and e.response is not None:
-            print("Brevo Response:", e.response.text)
-        return Response({"error": "Failed to send OTP. Please try again later."}, status=500)
+    # Outbox row — the send_emails worker delivers it
+    queue_login_otp(user, otp)
+    return Response({"message": "OTP sent successfully to your email"}, status=200)
 
 
 @api_view(['POST'])
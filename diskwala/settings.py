@@ -1,5 +1,6 @@
 from pathlib import Path
 import os
+from urllib.parse import urlsplit
 import dj_database_url
 
 # ============================
@@ -20,8 +21,14 @@ R2_ACCESS_KEY_ID = os.environ.get('R2_ACCESS_KEY_ID')
 R2_SECRET_ACCESS_KEY = os.environ.get('R2_SECRET_ACCESS_KEY')
 R2_BUCKET_NAME = os.environ.get('R2_BUCKET_NAME', 'royaldisk')
 R2_PUBLIC_URL = os.environ.get('R2_PUBLIC_URL', 'https://pub-c5942c99410941639275bfe9aca80906.r2.dev')
+# Override to point at a local S3 stand-in (MinIO / moto server) in dev
+R2_ENDPOINT_URL = os.environ.get('R2_ENDPOINT_URL') or f"https://{R2_ACCOUNT_ID}.r2.cloudflarestorage.com"
 SECRET_KEY = os.environ.get("SECRET_KEY", "unsafe-secret-key")
 SYSTEM_SECRET = os.environ.get("SYSTEM_SECRET", "dev-secret")
+# Key of the short-code permutation (core/shortcodes.py). Set it explicitly in
+# production and never change it: a new key maps future sequence numbers onto
+# codes that may already have been handed out.
+SHORT_CODE_KEY = os.environ.get("SHORT_CODE_KEY", SECRET_KEY)
 
 DEBUG = os.environ.get("DEBUG", "False") == "True"
 
@@ -102,6 +109,8 @@ if DATABASE_URL:
             ssl_require=True,
         )
     }
+    # Trigram lookups (drama autocomplete) + pg extensions in migrations
+    INSTALLED_APPS.append("django.contrib.postgres")
 else:
     # Local development (SQLite)
     DATABASES = {
@@ -112,6 +121,28 @@ else:
     }
 
 
+# ============================
+# CACHE
+# ============================
+# Shared Redis when available so invalidation reaches every worker;
+# otherwise per-process memory (short TTLs keep it from going stale).
+REDIS_URL = os.environ.get("REDIS_URL")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+
 # ============================
 # AUTH
 # ============================
@@ -147,6 +178,12 @@ EMAIL_HOST_PASSWORD = os.environ.get("BREVO_SMTP_KEY")
 DEFAULT_FROM_EMAIL = 'diskwala01@gmail.com'  # Ya jo bhi aap use karna chahte ho
 SERVER_EMAIL = 'diskwala01@gmail.com'
 
+# Brevo transactional API — OTP / reset mails go through the EmailOutbox
+# table and the `send_emails` worker. Point BREVO_API_URL at a local fake
+# server to exercise the worker without sending real mail.
+BREVO_API_KEY = os.environ.get("BREVO_API_KEY")
+BREVO_API_URL = os.environ.get("BREVO_API_URL", "https://api.brevo.com/v3/smtp/email")
+
 # ============================
 # STATIC FILES
 # ============================
@@ -165,6 +202,29 @@ MEDIA_ROOT = BASE_DIR / "media"
 # ============================
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Serve the counting endpoints (view / download / drama & episode views) from
+# the native async views in core/async_views.py and drama/async_views.py.
+# Enable only under an ASGI server (uvicorn / gunicorn -k uvicorn.workers.UvicornWorker).
+ASYNC_COUNTERS = os.environ.get("ASYNC_COUNTERS", "False") == "True"
+if ASYNC_COUNTERS:
+    # Async views run their queries on short-lived sync_to_async threads, and
+    # persistent connections are per thread — they would pile up idle, so
+    # close each connection at the end of the request instead.
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+
+# ============================
+# MEDIA TOOLS (drama/media.py workers)
+# ============================
+FFPROBE_BINARY = os.environ.get("FFPROBE_BINARY", "ffprobe")
+FFMPEG_BINARY = os.environ.get("FFMPEG_BINARY", "ffmpeg")
+# core/urlguard.py: allow fetching user URLs on private / loopback hosts (local dev only)
+FETCH_ALLOW_PRIVATE_HOSTS = os.environ.get("FETCH_ALLOW_PRIVATE_HOSTS", "False") == "True"
+# Only hosts ffprobe / ffmpeg may read episode sources from: our R2 bucket and
+# ImageKit. Extra hosts: MEDIA_SOURCE_HOSTS=cdn.example.com,media.example.com
+MEDIA_SOURCE_HOSTS = [urlsplit(R2_PUBLIC_URL).hostname, "ik.imagekit.io"] + [
+    host.strip().lower() for host in os.environ.get("MEDIA_SOURCE_HOSTS", "").split(",") if host.strip()
+]
+
 # ============================
 # DJANGO REST FRAMEWORK
 # ============================
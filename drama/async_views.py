@@ -0,0 +1,90 @@
+# drama/async_views.py
+# Async counterparts of increment_drama_view / increment_episode_view for
+# ASGI deployments (settings.ASYNC_COUNTERS) — see core/async_views.py.
+# The (item, ip, view_date) unique constraint does the once-per-day check:
+# insert the view log first, and an IntegrityError means "already viewed".
+
+from decimal import Decimal
+
+from django.db import IntegrityError
+from django.db.models import F
+from django.http import JsonResponse
+from django.shortcuts import aget_object_or_404
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from core.models import SiteSettings
+from core.services import calculate_earnings_per_1000_views
+from core.utils import get_client_ip
+from .models import Drama, DramaEpisode, DramaView, EpisodeView
+from .services import episode_view_earnings_sum
+
+
+async def acalculate_episode_view_earning(increment=1):
+    settings = await SiteSettings.aget_settings()
+    rate = settings.earning_per_1000_views or Decimal('1.0000')
+    return calculate_earnings_per_1000_views(increment, rate)
+
+
+@csrf_exempt
+@require_POST
+async def increment_drama_view(request, short_code):
+    drama = await aget_object_or_404(
+        Drama,
+        short_code=short_code,
+        status='approved',
+        is_archived=False
+    )
+    ip = get_client_ip(request)
+
+    try:
+        await DramaView.objects.acreate(drama_id=drama.pk, ip_address=ip)
+    except IntegrityError:
+        return JsonResponse({"message": "Already viewed today", "views": drama.views})
+
+    inc_earning = await acalculate_episode_view_earning(1)
+    await Drama.objects.filter(pk=drama.pk).aupdate(
+        views=F('views') + 1,
+        view_earnings=F('view_earnings') + inc_earning,
+        earnings=F('earnings') + inc_earning,
+    )
+
+    return JsonResponse({
+        "message": "View counted",
+        "views": drama.views + 1,
+        "earning_increment": float(inc_earning)
+    })
+
+
+@csrf_exempt
+@require_POST
+async def increment_episode_view(request, episode_id):
+    episode = await aget_object_or_404(
+        DramaEpisode,
+        id=episode_id,
+        is_active=True,
+        drama__status='approved',
+        drama__is_archived=False
+    )
+    ip = get_client_ip(request)
+
+    try:
+        await EpisodeView.objects.acreate(episode_id=episode.pk, ip_address=ip)
+    except IntegrityError:
+        return JsonResponse({"message": "Already viewed today", "views": episode.views})
+
+    inc_earning = await acalculate_episode_view_earning(1)
+    await DramaEpisode.objects.filter(pk=episode.pk).aupdate(
+        views=F('views') + 1,
+        view_earnings=F('view_earnings') + inc_earning,
+        earnings=F('earnings') + inc_earning,
+    )
+    # update_drama_earnings(): drama totals re-summed from its episodes, in one UPDATE
+    total = episode_view_earnings_sum()
+    await Drama.objects.filter(pk=episode.drama_id).aupdate(view_earnings=total, earnings=total)
+
+    return JsonResponse({
+        "message": "View counted",
+        "views": episode.views + 1,
+        "earning_increment": float(inc_earning)
+    })
@@ -0,0 +1,228 @@
+# drama/hls.py
+# Offline HLS packaging for drama episodes, run by `package_hls`.
+#
+# One ffmpeg run per episode reads video_url, encodes the rungs of HLS_LADDER
+# that don't exceed the source height (split once, scaled per rung, keyframes
+# forced every segment), and writes a VOD playlist per rung plus a master
+# playlist. The output goes to R2 under hls/<episode id>/<build>/; a fresh
+# build id per run means CDN-cached playlists are never overwritten. Segments
+# and rung playlists are immutable; the master playlist is cached briefly, so
+# the build a --force run replaces can be deleted (purge_hls_builds) once
+# RETIRED_BUILD_GRACE has passed. A deleted episode's whole hls/<id>/ tree
+# goes the same way, and a failed upload removes its partial build at once.
+# The source must be an allowed media host (drama/media.py source_url) and
+# ffmpeg may only speak http(s).
+#
+# package_episode() runs in a worker process and never touches the database —
+# the parent writes hls_url from its return value.
+
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from core.storage import DELETE_BATCH, delete_objects, get_r2_client, iter_objects, object_key, public_url
+from core.utils import chunked
+
+from .media import PROTOCOL_WHITELIST, source_url
+
+# (height, video bitrate, audio bitrate) — lowest rung first
+HLS_LADDER = (
+    (240, '400k', '64k'),
+    (480, '1000k', '96k'),
+    (720, '2500k', '128k'),
+)
+SEGMENT_SECONDS = 6
+FFMPEG_TIMEOUT = 3 * 3600
+UPLOAD_THREADS = 8
+CONTENT_TYPES = {
+    '.m3u8': 'application/vnd.apple.mpegurl',
+    '.ts': 'video/mp2t',
+}
+SEGMENT_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+MASTER_CACHE_CONTROL = 'public, max-age=300'
+# Replaced builds outlive the master max-age and any playback session in progress
+RETIRED_BUILD_GRACE = timedelta(days=1)
+PURGE_BATCH = 200                    # retired prefixes per purge_hls_builds run
+
+logger = logging.getLogger(__name__)
+
+
+class PackagingError(Exception):
+    pass
+
+
+def ffmpeg_available():
+    return shutil.which(settings.FFMPEG_BINARY) is not None
+
+
+def ladder_for(source_height):
+    """Rungs up to the source height (all of them when it is unknown); never empty."""
+    if not source_height:
+        return list(HLS_LADDER)
+    return [rung for rung in HLS_LADDER if rung[0] <= source_height] or [HLS_LADDER[0]]
+
+
+def has_audio(url):
+    """True unless ffprobe positively finds no audio stream."""
+    try:
+        result = subprocess.run(
+            [settings.FFPROBE_BINARY, '-v', 'error', '-protocol_whitelist', PROTOCOL_WHITELIST,
+             '-select_streams', 'a',
+             '-show_entries', 'stream=index', '-of', 'csv=p=0', url],
+            capture_output=True, text=True, timeout=120,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return True
+    return result.returncode != 0 or bool(result.stdout.strip())
+
+
+def ffmpeg_command(url, out_dir, rungs, audio=True, threads=0):
+    split = f"[0:v]split={len(rungs)}" + ''.join(f"[s{i}]" for i in range(len(rungs)))
+    scales = [f"[s{i}]scale=-2:{height}[v{i}]" for i, (height, _, _) in enumerate(rungs)]
+    command = [
+        settings.FFMPEG_BINARY, '-hide_banner', '-loglevel', 'error', '-y',
+        '-protocol_whitelist', PROTOCOL_WHITELIST, '-i', url,
+        '-filter_complex', ';'.join([split] + scales),
+    ]
+    stream_map = []
+    for i, (height, video_rate, audio_rate) in enumerate(rungs):
+        command += [
+            '-map', f'[v{i}]',
+            f'-c:v:{i}', 'libx264', f'-b:v:{i}', video_rate,
+            f'-maxrate:v:{i}', video_rate, f'-bufsize:v:{i}', video_rate,
+        ]
+        if audio:
+            command += ['-map', 'a:0', f'-c:a:{i}', 'aac', f'-b:a:{i}', audio_rate]
+            stream_map.append(f'v:{i},a:{i},name:{height}p')
+        else:
+            stream_map.append(f'v:{i},name:{height}p')
+    if audio:
+        command += ['-ac', '2']
+    command += [
+        '-preset', 'veryfast', '-threads', str(threads),
+        '-force_key_frames', f'expr:gte(t,n_forced*{SEGMENT_SECONDS})',
+        '-f', 'hls',
+        '-hls_time', str(SEGMENT_SECONDS),
+        '-hls_playlist_type', 'vod',
+        '-hls_flags', 'independent_segments',
+        '-hls_segment_filename', os.path.join(out_dir, '%v', 'seg_%04d.ts'),
+        '-master_pl_name', 'master.m3u8',
+        '-var_stream_map', ' '.join(stream_map),
+        os.path.join(out_dir, '%v', 'index.m3u8'),
+    ]
+    return command
+
+
+def upload_tree(out_dir, prefix):
+    """Upload every file under out_dir to R2 at prefix/<relative path>, a few at a time."""
+    client = get_r2_client()
+    files = []
+    for root, _, names in os.walk(out_dir):
+        for name in names:
+            path = os.path.join(root, name)
+            files.append((path, f"{prefix}/{os.path.relpath(path, out_dir).replace(os.sep, '/')}"))
+
+    def upload(item):
+        path, key = item
+        client.upload_file(path, settings.R2_BUCKET_NAME, key, ExtraArgs={
+            'ContentType': CONTENT_TYPES.get(os.path.splitext(path)[1], 'application/octet-stream'),
+            'CacheControl': MASTER_CACHE_CONTROL if key.endswith('/master.m3u8') else SEGMENT_CACHE_CONTROL,
+        })
+
+    # Segments first, master playlist last: it only becomes reachable once complete
+    files.sort(key=lambda item: (item[1].endswith('master.m3u8'), item[1].endswith('.m3u8')))
+    *body, master = files
+    with ThreadPoolExecutor(max_workers=UPLOAD_THREADS) as pool:
+        list(pool.map(upload, body))
+    upload(master)
+    return len(files)
+
+
+def package_episode(job):
+    """
+    Worker-process entry point. job = (episode_id, video_url, source_height,
+    work_dir, ffmpeg_threads). Returns (episode_id, master playlist URL or
+    None, error message).
+    """
+    episode_id, url, source_height, work_dir, threads = job
+    prefix = f"hls/{episode_id}/{uuid.uuid4().hex[:12]}"
+    try:
+        with tempfile.TemporaryDirectory(prefix=f'hls-{episode_id}-', dir=work_dir) as out_dir:
+            url = source_url(url)
+            command = ffmpeg_command(url, out_dir, ladder_for(source_height), has_audio(url), threads)
+            try:
+                result = subprocess.run(command, capture_output=True, text=True, timeout=FFMPEG_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                raise PackagingError(f"ffmpeg timed out after {FFMPEG_TIMEOUT}s")
+            if result.returncode != 0:
+                raise PackagingError(result.stderr.strip()[:255] or f"ffmpeg exited {result.returncode}")
+            if not os.path.exists(os.path.join(out_dir, 'master.m3u8')):
+                raise PackagingError("ffmpeg wrote no master playlist")
+            try:
+                upload_tree(out_dir, prefix)
+            except Exception:
+                _discard_partial_build(prefix)
+                raise
+    except Exception as e:          # reported back to the parent, never raised across the pool
+        return episode_id, None, str(e)[:255] or e.__class__.__name__
+    return episode_id, public_url(f"{prefix}/master.m3u8"), ''
+
+
+def _discard_partial_build(prefix):
+    try:
+        delete_prefix(f"{prefix}/")
+    except Exception:
+        logger.exception("Could not delete partial HLS build %s", prefix)
+
+
+def build_prefix(hls_url):
+    """'hls/<episode id>/<build>/' for one of our master playlist URLs, else None."""
+    key = object_key(hls_url)
+    if key is None or not key.startswith('hls/') or not key.endswith('/master.m3u8'):
+        return None
+    return key[:-len('master.m3u8')]
+
+
+def delete_prefix(prefix):
+    """Delete every R2 object under `prefix`; returns (deleted, failed) counts."""
+    deleted = failed = 0
+    for batch in chunked((obj['Key'] for obj in iter_objects(prefix)), DELETE_BATCH):
+        errors = len(delete_objects(batch))
+        deleted, failed = deleted + len(batch) - errors, failed + errors
+    return deleted, failed
+
+
+def retire_prefix(prefix, delete_after):
+    from .models import RetiredHlsBuild
+
+    RetiredHlsBuild.objects.update_or_create(prefix=prefix, defaults={'delete_after': delete_after})
+
+
+def retire_build(hls_url, grace=RETIRED_BUILD_GRACE):
+    """Queue the build behind `hls_url` for deletion once `grace` has passed."""
+    prefix = build_prefix(hls_url)
+    if prefix:
+        retire_prefix(prefix, timezone.now() + grace)
+    return prefix
+
+
+def purge_retired_builds(limit=PURGE_BATCH):
+    """Delete retired prefixes that are due; a prefix with failed deletes is retried next run."""
+    from .models import RetiredHlsBuild
+
+    deleted = 0
+    due = RetiredHlsBuild.objects.filter(delete_after__lte=timezone.now()).order_by('delete_after')[:limit]
+    for build in due:
+        removed, failed = delete_prefix(build.prefix)
+        deleted += removed
+        if not failed:
+            build.delete()
+    return deleted
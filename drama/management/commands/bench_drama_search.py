@@ -0,0 +1,119 @@
+# drama/management/commands/bench_drama_search.py
+#
+#   python manage.py bench_drama_search                 # 1M synthetic dramas
+#   python manage.py bench_drama_search --rows 50000 --keep
+#
+# Loads synthetic approved dramas for a throwaway user, indexes them, then
+# times the old icontains filter against the full-text index for the same
+# first page (20 rows, same category filter). Rows are removed afterwards
+# unless --keep is given.
+
+import random
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.pagination import KeysetPagination
+from drama.models import Drama, DramaCategory
+
+BENCH_USERNAME = '__bench_drama_search__'
+PAGE_SIZE = 20
+
+WORDS = (
+    "love story revenge family secret palace village city night rain heart "
+    "brother sister mother father king queen prince warrior doctor police "
+    "college office wedding divorce betrayal destiny promise journey return "
+    "dark light golden silent broken forbidden hidden lost last first "
+    "pyaar ishq dil dosti badla parivaar raaz zindagi sapna safar"
+).split()
+
+QUERIES = ['love', 'revenge palace', 'ishq', 'forbid', 'golden warrior queen', 'zzzz']
+
+
+class Command(BaseCommand):
+    help = "Benchmark drama catalog search (icontains vs full-text) on synthetic rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000)
+        parser.add_argument('--batch', type=int, default=5000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--keep', action='store_true', help="Keep the synthetic rows")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **opts):
+        rng = random.Random(opts['seed'])
+        User = get_user_model()
+        user, _ = User.objects.get_or_create(
+            username=BENCH_USERNAME, defaults={'email': 'bench@example.invalid', 'is_active': False}
+        )
+        category, _ = DramaCategory.objects.get_or_create(name='Bench', defaults={'slug': 'bench'})
+
+        existing = Drama.objects.filter(user=user).count()
+        if existing < opts['rows']:
+            self._load(user, category, existing, opts['rows'], opts['batch'], rng)
+
+        self.stdout.write(f"Rows: {Drama.objects.filter(user=user).count():,}  backend: {Drama.search_index.vendor}")
+        self.stdout.write(f"{'query':<24}{'icontains ms (p50/p95)':>26}{'full-text ms (p50/p95)':>26}{'hits':>8}")
+
+        base = Drama.objects.filter(status='approved', is_archived=False, category=category)
+        for term in QUERIES:
+            legacy = base.filter(
+                Q(title__icontains=term) | Q(description__icontains=term)
+            ).order_by('-approved_at', '-views')
+            ranked = Drama.search_index.search(base, term)
+            paginator = KeysetPagination(ordering=('-search_rank', '-id'))
+
+            old = self._time(lambda: list(legacy.values_list('id', flat=True)[:PAGE_SIZE]), opts['repeat'])
+            new = self._time(lambda: paginator.page(ranked.only('id'), PAGE_SIZE), opts['repeat'])
+            hits = len(paginator.page(ranked.only('id'), PAGE_SIZE))
+            self.stdout.write(
+                f"{term:<24}{old[0]:>14.1f}/{old[1]:<11.1f}{new[0]:>14.1f}/{new[1]:<11.1f}{hits:>8}"
+            )
+
+        if not opts['keep']:
+            self.stdout.write("Cleaning up synthetic rows…")
+            user.delete()  # cascades to the dramas
+            if Drama.search_index.vendor == 'sqlite':
+                Drama.search_index.rebuild()
+
+    def _load(self, user, category, start, rows, batch, rng):
+        now = timezone.now()
+        self.stdout.write(f"Loading {rows - start:,} synthetic dramas…")
+        t0 = time.perf_counter()
+        for offset in range(start, rows, batch):
+            objs = []
+            for i in range(offset, min(offset + batch, rows)):
+                title = ' '.join(rng.choices(WORDS, k=rng.randint(2, 5)))
+                objs.append(Drama(
+                    user=user,
+                    title=title.title(),
+                    slug=f"bench-{i}",
+                    short_code=f"B{i:09d}",
+                    category=category,
+                    description=' '.join(rng.choices(WORDS, k=rng.randint(10, 40))),
+                    status='approved',
+                    approved_at=now,
+                    views=rng.randint(0, 100_000),
+                ))
+            with transaction.atomic():
+                created = Drama.objects.bulk_create(objs)
+                # bulk_create skips save(); index the batch in one statement
+                Drama.search_index.refresh([d.pk for d in created])
+        self.stdout.write(f"Loaded in {time.perf_counter() - t0:.1f}s")
+
+    @staticmethod
+    def _time(fn, repeat):
+        fn()  # warm cache / plan
+        samples = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - t0) * 1000)
+        samples.sort()
+        p95 = samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))]
+        return statistics.median(samples), p95
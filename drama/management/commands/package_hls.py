@@ -0,0 +1,96 @@
+# drama/management/commands/package_hls.py
+#
+#   python manage.py package_hls                          # package every active episode without HLS
+#   python manage.py package_hls --processes 2 --limit 50
+#   python manage.py package_hls --episode 812 --episode 813 --force
+#   FFMPEG_BINARY=/opt/ffmpeg/bin/ffmpeg python manage.py package_hls --work-dir /mnt/scratch
+#
+# Transcodes episodes into an HLS ladder (drama/hls.py) in a process pool —
+# --processes caps concurrent ffmpeg encodes, each using --ffmpeg-threads
+# cores (0 = ffmpeg decides) — and records the master playlist in
+# DramaEpisode.hls_url. Most-viewed episodes go first. Failed episodes keep
+# hls_error and are skipped until --retry-failed. With --force, the build
+# an episode is re-packaged over is queued for deletion (purge_hls_builds)
+# once the new hls_url is saved, after a grace period for cached playlists.
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.utils import timezone
+
+from drama.hls import ffmpeg_available, package_episode, retire_build
+from drama.models import DramaEpisode
+
+
+class Command(BaseCommand):
+    help = "Package drama episodes as adaptive-bitrate HLS in R2"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=2, help="Concurrent ffmpeg encodes")
+        parser.add_argument('--ffmpeg-threads', type=int, default=0, help="Threads per encode (0 = auto)")
+        parser.add_argument('--limit', type=int, default=20, help="Episodes per run")
+        parser.add_argument('--episode', type=int, action='append', default=[], help="Only these episode ids")
+        parser.add_argument('--force', action='store_true', help="Re-package episodes that already have HLS")
+        parser.add_argument('--retry-failed', action='store_true', help="Include episodes that failed before")
+        parser.add_argument('--work-dir', default=None, help="Scratch directory for ffmpeg output")
+
+    def handle(self, *args, **options):
+        if not ffmpeg_available():
+            raise CommandError(f"{settings.FFMPEG_BINARY!r} not found — install ffmpeg or set FFMPEG_BINARY")
+        if options['processes'] < 1:
+            raise CommandError("--processes must be at least 1")
+
+        episodes = DramaEpisode.objects.filter(is_active=True).exclude(video_url='')
+        if options['episode']:
+            episodes = episodes.filter(pk__in=options['episode'])
+        if not options['force']:
+            episodes = episodes.filter(hls_url__isnull=True)
+        if not options['retry_failed'] and not options['episode']:
+            episodes = episodes.filter(hls_error='')
+        jobs = [
+            (pk, url, height, options['work_dir'], options['ffmpeg_threads'])
+            for pk, url, height in episodes.order_by('-views', 'id').values_list(
+                'id', 'video_url', 'height'
+            )[:options['limit']]
+        ]
+        if not jobs:
+            self.stdout.write("Nothing to package")
+            return
+
+        self.stdout.write(f"Packaging {len(jobs)} episodes with {options['processes']} processes")
+        # Worker processes never use the DB; don't let them inherit open connections
+        connections.close_all()
+        done = failed = 0
+        with ProcessPoolExecutor(max_workers=options['processes']) as pool:
+            futures = [pool.submit(package_episode, job) for job in jobs]
+            for future in as_completed(futures):
+                episode_id, hls_url, error = future.result()
+                if hls_url:
+                    with transaction.atomic():
+                        old_url = DramaEpisode.objects.select_for_update().filter(
+                            pk=episode_id,
+                        ).values_list('hls_url', flat=True).first()
+                        saved = DramaEpisode.objects.filter(pk=episode_id).update(
+                            hls_url=hls_url, hls_packaged_at=timezone.now(), hls_error='',
+                        )
+                        if not saved:
+                            # Episode deleted mid-encode: nothing will ever point at this build
+                            retire_build(hls_url, grace=timedelta(0))
+                        elif old_url and old_url != hls_url:
+                            retire_build(old_url)
+                    if not saved:
+                        self.stderr.write(f"episode {episode_id}: deleted while packaging, build discarded")
+                        continue
+                    done += 1
+                    self.stdout.write(f"episode {episode_id}: {hls_url}")
+                    if old_url and old_url != hls_url:
+                        self.stdout.write(f"episode {episode_id}: old build retired")
+                else:
+                    DramaEpisode.objects.filter(pk=episode_id).update(hls_error=error)
+                    failed += 1
+                    self.stderr.write(f"episode {episode_id}: {error}")
+
+        self.stdout.write(f"packaged {done}, failed {failed}")
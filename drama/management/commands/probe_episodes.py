@@ -0,0 +1,42 @@
+# drama/management/commands/probe_episodes.py
+#
+#   python manage.py probe_episodes                    # probe the whole backlog
+#   python manage.py probe_episodes --workers 8 --chunk 200
+#   FFPROBE_BINARY=/opt/ffmpeg/bin/ffprobe python manage.py probe_episodes
+#
+# Fills DramaEpisode width / height / bitrate (and duration_seconds when the
+# creator left it empty) for episodes that were never probed. Also runs from
+# run_scheduler (drama.probe_episodes). See drama/media.py.
+
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+
+from drama.media import ffprobe_available, probe_backlog
+
+
+class Command(BaseCommand):
+    help = "Probe new drama episodes with ffprobe for duration, resolution and bitrate"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help="Concurrent ffprobe processes")
+        parser.add_argument('--chunk', type=int, default=100, help="Episodes loaded per chunk")
+        parser.add_argument('--max-chunks', type=int, default=None)
+
+    def handle(self, *args, **options):
+        if not ffprobe_available():
+            raise CommandError(f"{settings.FFPROBE_BINARY!r} not found — install ffmpeg or set FFPROBE_BINARY")
+
+        def report(stats):
+            self.stdout.write(f"probed {stats['probed']}, failed {stats['failed']}")
+
+        def report_error(episode_id, error):
+            self.stderr.write(f"episode {episode_id}: {error.splitlines()[-1] if error else ''}")
+
+        with ThreadPoolExecutor(max_workers=options['workers'], thread_name_prefix='ffprobe') as pool:
+            totals = probe_backlog(
+                pool, options['chunk'], options['max_chunks'], on_chunk=report, on_error=report_error,
+            )
+        self.stdout.write("total: ", ending='')
+        report(totals)
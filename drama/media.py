@@ -0,0 +1,156 @@
+# drama/media.py
+# ffprobe-based metadata for episode videos, used by `probe_episodes`.
+#
+# ffprobe opens video_url over HTTP itself and, for seekable sources, only
+# range-requests the container header (and the MP4 moov atom wherever it
+# sits) — a multi-GB episode costs a few hundred KB. Probes run as
+# subprocesses from a thread pool; results are written from the main thread.
+# ffprobe resolves DNS and follows redirects on its own, so a URL vetted
+# beforehand proves nothing about what it fetches: sources must live on one
+# of settings.MEDIA_SOURCE_HOSTS (our R2 bucket, ImageKit), and ffprobe may
+# only speak http(s).
+
+import json
+import shutil
+import subprocess
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from core.urlguard import UnsafeURL, check_url
+
+PROBE_TIMEOUT = 60                    # seconds per ffprobe run
+PROBE_SIZE = 5 * 1024 * 1024          # cap on bytes ffprobe reads while analysing
+PROBE_MAX_FAILURES = 3                # then the episode leaves the backlog
+PROTOCOL_WHITELIST = 'http,https,tcp,tls'
+
+
+class ProbeError(Exception):
+    pass
+
+
+def ffprobe_available():
+    return shutil.which(settings.FFPROBE_BINARY) is not None
+
+
+def source_url(url):
+    """`url` if ffprobe / ffmpeg may read it (an allowed media host); raises ProbeError."""
+    host = (urlsplit(url).hostname or '').lower()
+    if host not in settings.MEDIA_SOURCE_HOSTS:
+        raise ProbeError(f"{host or url[:100]} is not an allowed media host")
+    try:
+        check_url(url)
+    except UnsafeURL as e:
+        raise ProbeError(str(e)[:500])
+    return url
+
+
+def ffprobe(url):
+    """{'duration', 'width', 'height', 'bitrate'} (any may be None) for a video URL."""
+    command = [
+        settings.FFPROBE_BINARY, '-v', 'error',
+        '-protocol_whitelist', PROTOCOL_WHITELIST,
+        '-probesize', str(PROBE_SIZE), '-analyzeduration', '0',
+        '-rw_timeout', str(30 * 1000 * 1000),          # microseconds, per network read
+        '-select_streams', 'v:0',
+        '-show_entries', 'format=duration,bit_rate:stream=width,height,bit_rate',
+        '-print_format', 'json',
+        source_url(url),
+    ]
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, timeout=PROBE_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        raise ProbeError(f"ffprobe timed out after {PROBE_TIMEOUT}s")
+    if result.returncode != 0:
+        raise ProbeError(result.stderr.strip()[-500:] or f"ffprobe exited {result.returncode}")
+    try:
+        data = json.loads(result.stdout or '{}')
+    except ValueError:
+        raise ProbeError("ffprobe returned invalid JSON")
+
+    fmt = data.get('format', {})
+    stream = (data.get('streams') or [{}])[0]
+    return {
+        'duration': _number(fmt.get('duration')),
+        'width': _number(stream.get('width')),
+        'height': _number(stream.get('height')),
+        'bitrate': _number(fmt.get('bit_rate')) or _number(stream.get('bit_rate')),
+    }
+
+
+def _number(value):
+    try:
+        return float(value) if value not in (None, '', 'N/A') else None
+    except (TypeError, ValueError):
+        return None
+
+
+def unprobed_episodes(after_id, limit):
+    """Next chunk of the backlog: never-probed episodes, oldest id first."""
+    from .models import DramaEpisode
+
+    return list(
+        DramaEpisode.objects.filter(
+            probed_at__isnull=True, probe_failures__lt=PROBE_MAX_FAILURES, id__gt=after_id,
+        ).exclude(video_url='').order_by('id').values_list('id', 'video_url')[:limit]
+    )
+
+
+def probe_job(row):
+    """Thread-pool job: (episode_id, metadata or None, error)."""
+    episode_id, url = row
+    try:
+        return episode_id, ffprobe(url), ''
+    except ProbeError as e:
+        return episode_id, None, str(e)
+
+
+def record_probe(episode_id, metadata, error):
+    """Write one result back. The creator's own duration_seconds is kept if set."""
+    from .models import DramaEpisode
+
+    episodes = DramaEpisode.objects.filter(pk=episode_id, probed_at__isnull=True)
+    if metadata is None:
+        return episodes.update(probe_failures=F('probe_failures') + 1)
+
+    def whole(value, limit):
+        return min(int(round(value)), limit) if value else None
+
+    updated = episodes.update(
+        width=whole(metadata['width'], 32767),
+        height=whole(metadata['height'], 32767),
+        bitrate=whole(metadata['bitrate'], 2 ** 31 - 1),
+        probed_at=timezone.now(),
+    )
+    if updated and metadata['duration']:
+        DramaEpisode.objects.filter(pk=episode_id, duration_seconds__isnull=True).update(
+            duration_seconds=whole(metadata['duration'], 2 ** 31 - 1)
+        )
+    return updated
+
+
+def probe_backlog(pool, chunk_size=100, max_chunks=None, on_chunk=None, on_error=None):
+    """
+    Work through unprobed episodes `chunk_size` at a time on `pool` (its
+    max_workers bounds concurrent ffprobe processes). Returns totals.
+    """
+    totals = {'probed': 0, 'failed': 0}
+    after_id, chunks = 0, 0
+    while max_chunks is None or chunks < max_chunks:
+        rows = unprobed_episodes(after_id, chunk_size)
+        if not rows:
+            break
+        after_id, chunks = rows[-1][0], chunks + 1
+        stats = {'probed': 0, 'failed': 0}
+        for episode_id, metadata, error in pool.map(probe_job, rows):
+            record_probe(episode_id, metadata, error)
+            stats['failed' if metadata is None else 'probed'] += 1
+            if error and on_error:
+                on_error(episode_id, error)
+        for name, value in stats.items():
+            totals[name] += value
+        if on_chunk:
+            on_chunk(stats)
+    return totals
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drama', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='drama',
+            index=models.Index(fields=['user', '-created_at'], name='drama_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drama', '0002_drama_user_created_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='drama',
+            index=models.Index(fields=['-created_at'], name='drama_created_idx'),
+        ),
+    ]
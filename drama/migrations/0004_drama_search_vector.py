@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:59
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            "UPDATE drama_drama SET search_vector = "
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+        )
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS drama_search_vector_gin "
+            "ON drama_drama USING gin (search_vector)"
+        )
+    elif vendor == 'sqlite':
+        # Dev fallback: FTS5 shadow table, rowid = drama.id
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS drama_drama_fts USING fts5(title, description)"
+        )
+        schema_editor.execute(
+            "INSERT INTO drama_drama_fts (rowid, title, description) "
+            "SELECT id, title, description FROM drama_drama"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS drama_search_vector_gin")
+    elif vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS drama_drama_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drama', '0003_admin_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='drama',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,28 @@
+from django.db import migrations
+
+
+def create_trgm_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        # Partial: autocomplete only ever looks at the live public catalog
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS drama_title_trgm "
+            "ON drama_drama USING gin (title gin_trgm_ops) "
+            "WHERE status = 'approved' AND NOT is_archived"
+        )
+
+
+def drop_trgm_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS drama_title_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drama', '0004_drama_search_vector'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trgm_index, drop_trgm_index),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drama', '0005_drama_title_trgm'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dramaepisode',
+            name='bitrate',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='dramaepisode',
+            name='height',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='dramaepisode',
+            name='probe_failures',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='dramaepisode',
+            name='probed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='dramaepisode',
+            name='width',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='dramaepisode',
+            index=models.Index(condition=models.Q(('probed_at__isnull', True)), fields=['id'], name='episode_unprobed_idx'),
+        ),
+    ]
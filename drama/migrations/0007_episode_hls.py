@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drama', '0006_episode_probe'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dramaepisode',
+            name='hls_error',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='dramaepisode',
+            name='hls_packaged_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='dramaepisode',
+            name='hls_url',
+            field=models.URLField(blank=True, max_length=500, null=True),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drama', '0007_episode_hls'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RetiredHlsBuild',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prefix', models.CharField(max_length=200, unique=True)),
+                ('delete_after', models.DateTimeField(db_index=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
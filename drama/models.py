@@ -1,11 +1,15 @@
 # drama/models.py
 
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import Q
 from django.utils import timezone
 from django.conf import settings
 from django.utils.text import slugify
 
 from core.models import generate_short_code  # assuming this exists in core/models.py
+from core.search import FullTextIndex
+from .services import bump_catalog_version
 
 User = settings.AUTH_USER_MODEL
 
@@ -28,9 +32,18 @@ class DramaCategory(models.Model):
         if not self.slug:
             self.slug = slugify(self.name)
         super().save(*args, **kwargs)
+        bump_catalog_version()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        bump_catalog_version()
+        return result
 
 
 class Drama(models.Model):
+    # Changes to these invalidate cached public catalog reads (autocomplete, feeds)
+    CATALOG_FIELDS = {'title', 'status', 'is_archived', 'category', 'thumbnail_url', 'short_code'}
+
     STATUS_CHOICES = (
         ('pending',   'Pending Review'),
         ('approved',  'Approved'),
@@ -76,6 +89,9 @@ class Drama(models.Model):
     is_archived     = models.BooleanField(default=False, db_index=True)
     archived_at     = models.DateTimeField(null=True, blank=True)
 
+    # Full-text search (Postgres; GIN index created in migration 0004)
+    search_vector   = SearchVectorField(null=True, editable=False)
+
     created_at      = models.DateTimeField(auto_now_add=True)
     updated_at      = models.DateTimeField(auto_now=True)
 
@@ -84,6 +100,10 @@ class Drama(models.Model):
         indexes = [
             models.Index(fields=['status', 'is_archived']),
             models.Index(fields=['user', 'status']),
+            # Creator "my dramas" keyset pagination
+            models.Index(fields=['user', '-created_at'], name='drama_user_created_idx'),
+            # Admin drama listing
+            models.Index(fields=['-created_at'], name='drama_created_idx'),
         ]
 
     def __str__(self):
@@ -93,6 +113,16 @@ class Drama(models.Model):
         if not self.slug:
             self.slug = slugify(self.title)[:250]
         super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if Drama.search_index.needs_refresh(update_fields):
+            Drama.search_index.refresh([self.pk])
+        if update_fields is None or self.CATALOG_FIELDS & set(update_fields):
+            bump_catalog_version()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        bump_catalog_version()
+        return result
 
     def archive(self):
         """Soft-delete / archive this drama"""
@@ -120,6 +150,18 @@ class DramaEpisode(models.Model):
     thumbnail_url   = models.URLField(max_length=500, blank=True, null=True)
     duration_seconds = models.PositiveIntegerField(null=True, blank=True)
 
+    # Filled by `probe_episodes` (ffprobe on video_url)
+    width           = models.PositiveSmallIntegerField(null=True, blank=True)
+    height          = models.PositiveSmallIntegerField(null=True, blank=True)
+    bitrate         = models.PositiveIntegerField(null=True, blank=True)      # bits per second
+    probed_at       = models.DateTimeField(null=True, blank=True)
+    probe_failures  = models.PositiveSmallIntegerField(default=0)
+
+    # Adaptive-bitrate copy in R2, written by `package_hls`
+    hls_url         = models.URLField(max_length=500, blank=True, null=True)   # master playlist
+    hls_packaged_at = models.DateTimeField(null=True, blank=True)
+    hls_error       = models.CharField(max_length=255, blank=True)
+
     description     = models.TextField(blank=True)
     views           = models.PositiveBigIntegerField(default=0)
 
@@ -136,12 +178,28 @@ class DramaEpisode(models.Model):
         ordering = ['order', 'episode_no']
         indexes = [
             models.Index(fields=['drama', 'episode_no']),
+            # probe_episodes backlog
+            models.Index(fields=['id'], name='episode_unprobed_idx', condition=Q(probed_at__isnull=True)),
         ]
 
     def __str__(self):
         return f"{self.drama.title} - Ep {self.episode_no}"
 
 
+class RetiredHlsBuild(models.Model):
+    """
+    An R2 prefix under hls/ queued for deletion by the `purge_hls_builds` task:
+    a build a --force run replaced (kept a while for CDN-cached master
+    playlists), or the whole tree of a deleted episode.
+    """
+    prefix = models.CharField(max_length=200, unique=True)
+    delete_after = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.prefix} after {self.delete_after:%Y-%m-%d %H:%M}"
+
+
 # ───────────────────────────────────────────────
 # View tracking (for unique views per day)
 # ───────────────────────────────────────────────
@@ -179,4 +237,11 @@ class ActiveDramaManager(models.Manager):
         return super().get_queryset().filter(is_archived=False)
 
 
-Drama.active_objects = ActiveDramaManager()
\ No newline at end of file
+Drama.active_objects = ActiveDramaManager()
+
+# Catalog search: title outranks description
+Drama.search_index = FullTextIndex(
+    Drama,
+    {'title': 'A', 'description': 'B'},
+    fts_table='drama_drama_fts',
+)
\ No newline at end of file
@@ -0,0 +1,54 @@
+# drama/pagination.py
+
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+from core.pagination import KeysetPagination
+
+
+class EpisodeKeysetPagination(KeysetPagination):
+    """
+    Episodes in play order, keyset on (order, episode_no).
+
+    ?around=<episode_no>&window=<n> returns the n episodes before and the
+    episode itself plus n after — the player's neighbourhood — instead of a
+    page from the start. next_cursor continues forward from the window.
+    """
+    ordering = ('order', 'episode_no')
+    page_size = 30
+    max_page_size = 100
+    around_query_param = 'around'
+    window_query_param = 'window'
+    default_window = 5
+    max_window = 25
+
+    def paginate_queryset(self, queryset, request, view=None):
+        around = request.query_params.get(self.around_query_param)
+        if around is None:
+            return super().paginate_queryset(queryset, request, view)
+
+        try:
+            episode_no = int(around)
+            window = int(request.query_params.get(self.window_query_param, self.default_window))
+        except (TypeError, ValueError):
+            raise ValidationError({self.around_query_param: "around and window must be integers"})
+        window = max(1, min(window, self.max_window))
+        return self.window(queryset, episode_no, window)
+
+    def window(self, queryset, episode_no, size):
+        target = queryset.filter(episode_no=episode_no).values('order', 'episode_no').first()
+        if target is None:
+            raise ValidationError({self.around_query_param: "Episode not found"})
+
+        before = list(
+            queryset.filter(
+                Q(order__lt=target['order']) |
+                Q(order=target['order'], episode_no__lt=target['episode_no'])
+            ).order_by('-order', '-episode_no')[:size]
+        )
+        before.reverse()
+
+        # target + `size` after it, continuing via the normal forward cursor
+        start = self.encode_cursor([target['order'], target['episode_no'] - 1])
+        after = self.page(queryset, size + 1, cursor=start)
+        return before + after
@@ -1,5 +1,9 @@
 from rest_framework import serializers
 from .models import DramaCategory, Drama, DramaEpisode
+from .pagination import EpisodeKeysetPagination
+
+# Episodes embedded in a drama detail; the rest via the episode list cursor
+DETAIL_EPISODE_WINDOW = 30
 
 
 class DramaCategorySerializer(serializers.ModelSerializer):
@@ -12,13 +16,51 @@ class DramaEpisodeListSerializer(serializers.ModelSerializer):
     class Meta:
         model = DramaEpisode
         fields = [
-            'id', 'episode_no', 'title', 'video_url', 'thumbnail_url',
-            'duration_seconds', 'views', 'order', 'uploaded_at'
+            'id', 'episode_no', 'title', 'video_url', 'hls_url', 'thumbnail_url',
+            'duration_seconds', 'width', 'height', 'views', 'order', 'uploaded_at'
+        ]
+
+
+class DramaCardSerializer(serializers.ModelSerializer):
+    """Catalog / list rows — no nested episodes. Pair with card_queryset()."""
+    category = serializers.SlugRelatedField(slug_field='slug', read_only=True)
+
+    class Meta:
+        model = Drama
+        fields = [
+            'id', 'title', 'short_code', 'thumbnail_url', 'category',
+            'views', 'total_episodes'
         ]
 
 
+class DramaModerationCardSerializer(DramaCardSerializer):
+    """Card + review state, for the creator's own list and the admin queue."""
+    uploaded_by = serializers.CharField(source='user.username', read_only=True)
+
+    class Meta(DramaCardSerializer.Meta):
+        fields = DramaCardSerializer.Meta.fields + [
+            'status', 'uploaded_by', 'created_at'
+        ]
+
+
+CARD_ONLY_FIELDS = [
+    'id', 'title', 'short_code', 'thumbnail_url', 'views', 'total_episodes',
+    'status', 'created_at', 'approved_at', 'category__slug', 'user__username',
+]
+
+
+def card_queryset(qs):
+    """One query for a page of cards: join category/user, load only the card columns."""
+    return qs.select_related('category', 'user').only(*CARD_ONLY_FIELDS)
+
+
+def episode_queryset(drama, include_inactive=False):
+    """A drama's episodes in play order; inactive ones only for the owner / admin."""
+    episodes = drama.episodes.order_by('order', 'episode_no')
+    return episodes if include_inactive else episodes.filter(is_active=True)
+
+
 class DramaDetailSerializer(serializers.ModelSerializer):
-    episodes = DramaEpisodeListSerializer(many=True, read_only=True)
     category = DramaCategorySerializer(read_only=True)
     uploaded_by = serializers.CharField(source='user.username', read_only=True)
 
@@ -28,9 +70,28 @@ class DramaDetailSerializer(serializers.ModelSerializer):
             'id', 'title', 'slug', 'short_code', 'description',
             'thumbnail_url', 'poster_url', 'category',
             'status', 'uploaded_by', 'created_at', 'views',
-            'total_episodes', 'episodes'
+            'total_episodes'
         ]
 
+    def to_representation(self, instance):
+        # First window of episodes only; continue with episodes_next_cursor on the
+        # matching episode list. Owner / admin views pass include_inactive=True.
+        data = super().to_representation(instance)
+        paginator = EpisodeKeysetPagination()
+        episodes = paginator.page(
+            episode_queryset(instance, self.context.get('include_inactive', False)), DETAIL_EPISODE_WINDOW
+        )
+        data['episodes'] = DramaEpisodeListSerializer(episodes, many=True).data
+        data['episodes_next_cursor'] = paginator.next_cursor
+        return data
+
+
+class DramaEpisodeIndexSerializer(serializers.ModelSerializer):
+    """Index-only row for the player's episode strip."""
+    class Meta:
+        model = DramaEpisode
+        fields = ['id', 'episode_no', 'duration_seconds']
+
 
 class DramaCreateUpdateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -67,4 +128,51 @@ class DramaEpisodeCreateSerializer(serializers.ModelSerializer):
         # Update total_episodes cache
         drama.total_episodes = drama.episodes.count()
         drama.save(update_fields=['total_episodes'])
-        return episode
\ No newline at end of file
+        return episode
+
+# ───────────────────────────────────────────────
+# Bulk episode upload: one existence query, one INSERT, one count
+# ───────────────────────────────────────────────
+BULK_EPISODE_MAX = 200
+
+
+class DramaEpisodeBulkListSerializer(serializers.ListSerializer):
+    def validate(self, data):
+        drama = self.context['drama']
+        numbers = [item['episode_no'] for item in data]
+
+        seen, repeated = set(), set()
+        for number in numbers:
+            (repeated if number in seen else seen).add(number)
+        if repeated:
+            raise serializers.ValidationError(
+                {"episode_no": f"Duplicate episode numbers in request: {sorted(repeated)}"}
+            )
+
+        taken = sorted(DramaEpisode.objects.filter(
+            drama=drama, episode_no__in=numbers
+        ).values_list('episode_no', flat=True))
+        if taken:
+            raise serializers.ValidationError(
+                {"episode_no": f"These episode numbers already exist for this drama: {taken}"}
+            )
+        return data
+
+    def create(self, validated_data):
+        drama = self.context['drama']
+        episodes = DramaEpisode.objects.bulk_create(
+            [DramaEpisode(drama=drama, **item) for item in validated_data]
+        )
+        # Update total_episodes cache
+        drama.total_episodes = drama.episodes.count()
+        drama.save(update_fields=['total_episodes'])
+        return episodes
+
+
+class DramaEpisodeBulkCreateSerializer(DramaEpisodeCreateSerializer):
+    """Row of a bulk upload; the uniqueness check runs once for the whole list."""
+    class Meta(DramaEpisodeCreateSerializer.Meta):
+        list_serializer_class = DramaEpisodeBulkListSerializer
+
+    def validate(self, data):
+        return data
@@ -1,7 +1,36 @@
 # drama/services.py  (or append to core/services.py)
 
+import time
 from decimal import Decimal
-from core.services import calculate_earnings_per_1000_views   # reuse
+
+from django.core.cache import cache
+
+from core.services import RELATED_TOP_K, calculate_earnings_per_1000_views   # reuse
+
+# ───────────────────────────────────────────────
+# Public catalog cache (autocomplete, home feed)
+# Every cached catalog read is keyed by a version stamp; bumping the stamp
+# drops all of them at once. Drama / DramaCategory saves bump it.
+# ───────────────────────────────────────────────
+CATALOG_VERSION_KEY = 'drama:catalog:version'
+CATALOG_CACHE_TTL = 60  # seconds — upper bound on staleness for per-process caches
+
+
+def catalog_version():
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        cache.add(CATALOG_VERSION_KEY, version, timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY, version)
+    return version
+
+
+def bump_catalog_version():
+    cache.set(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def catalog_cache_key(*parts):
+    return ':'.join(['drama:catalog', str(catalog_version())] + [str(p) for p in parts])
 
 def update_drama_earnings(drama):
     """ Recalculate total earnings from all episodes """
@@ -14,8 +43,193 @@ def update_drama_earnings(drama):
     drama.save(update_fields=['earnings', 'view_earnings'])
 
 
+def episode_view_earnings_sum():
+    """
+    update_drama_earnings() as an expression for Drama.objects.filter(...).update():
+    the sum of the drama's episode view_earnings, re-summed inside the UPDATE.
+    """
+    from django.db.models import DecimalField, OuterRef, Subquery, Sum, Value
+    from django.db.models.functions import Coalesce
+    from .models import DramaEpisode
+
+    total = DramaEpisode.objects.filter(drama_id=OuterRef('pk')).order_by().values('drama_id').annotate(
+        total=Sum('view_earnings')
+    ).values('total')
+    return Coalesce(
+        Subquery(total), Value(Decimal('0')), output_field=DecimalField(max_digits=12, decimal_places=4)
+    )
+
+
 def calculate_episode_view_earning(increment: int = 1) -> Decimal:
     from core.models import SiteSettings
     settings = SiteSettings.get_settings()
     rate = settings.earning_per_1000_views or Decimal('1.0000')   # same as files for now
-    return calculate_earnings_per_1000_views(increment, rate)
\ No newline at end of file
+    return calculate_earnings_per_1000_views(increment, rate)
+
+
+# ───────────────────────────────────────────────
+# Title autocomplete
+# ───────────────────────────────────────────────
+AUTOCOMPLETE_MIN_CHARS = 2
+AUTOCOMPLETE_MAX_CHARS = 50
+
+
+def autocomplete_titles(term, limit=8):
+    """
+    Top `limit` approved dramas whose title matches `term`, most viewed first.
+    Postgres: pg_trgm word similarity (typo tolerant, GIN indexed — migration 0005).
+    SQLite:   word-prefix match, for local dev.
+    """
+    from django.db import connection
+    from django.db.models import Q
+    from .models import Drama
+
+    term = ' '.join(term.split())[:AUTOCOMPLETE_MAX_CHARS].lower()
+    if len(term) < AUTOCOMPLETE_MIN_CHARS:
+        return []
+
+    key = catalog_cache_key('autocomplete', limit, term)
+    suggestions = cache.get(key)
+    if suggestions is not None:
+        return suggestions
+
+    qs = Drama.objects.filter(status='approved', is_archived=False)
+    if connection.vendor == 'postgresql':
+        qs = qs.filter(title__trigram_word_similar=term)
+    else:
+        qs = qs.filter(Q(title__istartswith=term) | Q(title__icontains=' ' + term))
+
+    suggestions = list(
+        qs.order_by('-views', 'id').values('id', 'title', 'short_code', 'thumbnail_url', 'views')[:limit]
+    )
+    cache.set(key, suggestions, CATALOG_CACHE_TTL)
+    return suggestions
+
+
+# ───────────────────────────────────────────────
+# Trending (compute_trending command)
+# Drama score = decayed drama-page views + decayed episode views;
+# category score = sum of its dramas' scores.
+# ───────────────────────────────────────────────
+def compute_drama_trending(now=None):
+    """Returns {'drama': rows stored, 'category': rows stored}."""
+    from datetime import timedelta
+    from django.db.models import Count
+    from django.utils import timezone
+    from core.services import (
+        TRENDING_WINDOW_DAYS, decayed_scores, merge_scores, store_trending_scores,
+    )
+    from .models import Drama, DramaView, EpisodeView
+
+    now = now or timezone.now()
+    since = now.date() - timedelta(days=TRENDING_WINDOW_DAYS)
+
+    page_views = DramaView.objects.filter(view_date__gte=since).values_list(
+        'drama_id', 'view_date'
+    ).annotate(n=Count('id')).order_by()
+    episode_views = EpisodeView.objects.filter(view_date__gte=since).values_list(
+        'episode__drama_id', 'view_date'
+    ).annotate(n=Count('id')).order_by()
+
+    drama_scores = merge_scores(
+        decayed_scores(page_views.iterator(chunk_size=5000), now.date()),
+        decayed_scores(episode_views.iterator(chunk_size=5000), now.date()),
+    )
+
+    category_scores = {}
+    categories = Drama.objects.filter(pk__in=list(drama_scores), category_id__isnull=False)
+    for drama_id, category_id in categories.values_list('id', 'category_id').iterator(chunk_size=5000):
+        score, views = drama_scores[drama_id]
+        entry = category_scores.setdefault(category_id, [0.0, 0])
+        entry[0] += score
+        entry[1] += views
+
+    return {
+        'drama': store_trending_scores('drama', drama_scores, now),
+        'category': store_trending_scores('category', category_scores, now),
+    }
+
+
+# ───────────────────────────────────────────────
+# Home feed — top dramas per active category
+# ───────────────────────────────────────────────
+HOME_FEED_DEFAULT_LIMIT = 10
+HOME_FEED_MAX_LIMIT = 20
+
+
+def home_feed(limit=HOME_FEED_DEFAULT_LIMIT):
+    """
+    [{id, name, slug, dramas: [card, ...]}, ...] in category display order.
+    One ROW_NUMBER() OVER (PARTITION BY category ORDER BY views DESC) query
+    instead of one list request per category; cached under the catalog
+    version, so approve / reject / archive / category edits show up at once.
+    """
+    from django.db.models import F, Window
+    from django.db.models.functions import RowNumber
+    from .models import Drama, DramaCategory
+    from .serializers import DramaCardSerializer, card_queryset
+
+    key = catalog_cache_key('home', limit)
+    feed = cache.get(key)
+    if feed is not None:
+        return feed
+
+    categories = list(DramaCategory.objects.filter(is_active=True).values('id', 'name', 'slug'))
+    dramas = card_queryset(
+        Drama.objects.filter(
+            status='approved', is_archived=False, category__is_active=True
+        )
+    ).annotate(
+        category_rank=Window(
+            RowNumber(),
+            partition_by=F('category_id'),
+            order_by=[F('views').desc(), F('id').desc()],
+        )
+    ).filter(category_rank__lte=limit).order_by('category_id', 'category_rank')
+
+    rows = {}
+    for drama in dramas:
+        rows.setdefault(drama.category_id, []).append(drama)
+
+    feed = [
+        {**category, 'dramas': DramaCardSerializer(rows[category['id']], many=True).data}
+        for category in categories
+        if category['id'] in rows
+    ]
+    cache.set(key, feed, CATALOG_CACHE_TTL)
+    return feed
+
+
+# ───────────────────────────────────────────────
+# Related dramas (compute_related command)
+# Baskets = episodes watched by one IP on one day, rolled up to dramas.
+# ───────────────────────────────────────────────
+def compute_drama_related(now=None, **options):
+    from datetime import timedelta
+    from django.utils import timezone
+    from core.services import RELATED_WINDOW_DAYS, co_view_similarity, store_related_items
+    from .models import EpisodeView
+
+    now = now or timezone.now()
+    rows = EpisodeView.objects.filter(
+        view_date__gte=now.date() - timedelta(days=RELATED_WINDOW_DAYS)
+    ).values_list('ip_address', 'view_date', 'episode__drama_id').order_by('ip_address', 'view_date')
+
+    return store_related_items('drama', co_view_similarity(rows.iterator(chunk_size=5000), **options))
+
+
+def related_dramas(drama, limit=RELATED_TOP_K):
+    """Approved related dramas, best first, serialized as cards."""
+    from core.services import related_ids
+    from .models import Drama
+    from .serializers import DramaCardSerializer, card_queryset
+
+    ids = related_ids('drama', drama.pk, limit)
+    if not ids:
+        return []
+    dramas = {
+        d.pk: d for d in card_queryset(
+            Drama.objects.filter(pk__in=ids, status='approved', is_archived=False)
+        )
+    }
+    return DramaCardSerializer([dramas[pk] for pk in ids if pk in dramas], many=True).data
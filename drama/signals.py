@@ -0,0 +1,19 @@
+# drama/signals.py
+# Model signal receivers, connected in DramaConfig.ready().
+
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .hls import retire_prefix
+from .models import DramaEpisode
+
+
+@receiver(post_delete, sender=DramaEpisode)
+def retire_episode_hls(sender, instance, **kwargs):
+    """
+    Every delete path (Django admin, drama CASCADE, shell) queues the
+    episode's whole hls/<id>/ tree — every build — for purge_hls_builds.
+    """
+    if instance.hls_url:
+        retire_prefix(f"hls/{instance.pk}/", timezone.now())
@@ -0,0 +1,38 @@
+# drama/tasks.py
+# Periodic jobs for the drama app — picked up by `run_scheduler` (core/scheduler.py).
+
+from datetime import timedelta
+
+from core.scheduler import periodic_task
+
+
+@periodic_task('*/15 * * * *')
+def compute_drama_trending():
+    from .services import compute_drama_trending
+    return compute_drama_trending()
+
+
+@periodic_task('0 3 * * *', lease=timedelta(hours=2))
+def compute_drama_related():
+    from .services import compute_drama_related
+    return compute_drama_related()
+
+
+@periodic_task('*/10 * * * *', lease=timedelta(hours=1))
+def probe_episodes():
+    """ffprobe newly created episodes (a few chunks per run)."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    from .media import ffprobe_available, probe_backlog
+
+    if not ffprobe_available():
+        return None
+    with ThreadPoolExecutor(max_workers=4, thread_name_prefix='ffprobe') as pool:
+        return probe_backlog(pool, max_chunks=5)['probed']
+
+
+@periodic_task('40 * * * *')
+def purge_hls_builds():
+    """Delete replaced HLS builds past their grace period and deleted episodes' trees."""
+    from .hls import purge_retired_builds
+    return purge_retired_builds()
@@ -0,0 +1,65 @@
+import json
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core.models import User
+from drama.models import Drama, DramaCategory, DramaEpisode
+
+
+class AdminReviewTests(TestCase):
+    def setUp(self):
+        admin = User.objects.create_user(username='admin', email='a@example.com', password='x', is_staff=True)
+        self.client_api = APIClient()
+        self.client_api.force_authenticate(admin)
+        creator = User.objects.create_user(username='creator', email='c@example.com', password='x')
+        self.pending = [Drama.objects.create(user=creator, title=f'Drama {i}', status='pending') for i in range(5)]
+        Drama.objects.create(user=creator, title='Live', status='approved')
+        for no in range(1, 4):
+            DramaEpisode.objects.create(
+                drama=self.pending[0], episode_no=no, video_url=f'https://x.com/{no}.mp4', is_active=no != 2,
+            )
+
+    def test_pending_queue_is_keyset_paged_oldest_first(self):
+        ids, cursor = [], None
+        while True:
+            response = self.client_api.get('/api/drama/admin/pending/', {'page_size': 2, **({'cursor': cursor} if cursor else {})})
+            self.assertEqual(response.status_code, 200)
+            ids += [card['id'] for card in response.json()['results']]
+            cursor = response.json()['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(ids, [d.pk for d in self.pending])
+
+    def test_admin_reviews_pending_drama_episodes(self):
+        drama = self.pending[0]
+        with mock.patch('drama.serializers.DETAIL_EPISODE_WINDOW', 2):
+            detail = self.client_api.get(f'/api/drama/admin/{drama.pk}/').json()
+        self.assertEqual((detail['status'], [e['episode_no'] for e in detail['episodes']]), ('pending', [1, 2]))
+
+        response = self.client_api.get(f'/api/drama/admin/{drama.pk}/episodes/', {'cursor': detail['episodes_next_cursor']})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([e['episode_no'] for e in response.json()['results']], [3])
+
+    def test_review_endpoints_are_admin_only(self):
+        creator = APIClient()
+        creator.force_authenticate(User.objects.get(username='creator'))
+        drama = self.pending[0]
+        self.assertEqual(creator.get(f'/api/drama/admin/{drama.pk}/').status_code, 403)
+        self.assertEqual(creator.get(f'/api/drama/admin/{drama.pk}/episodes/').status_code, 403)
+
+    def test_dramas_list_keeps_detail_keys_and_exports_ndjson(self):
+        category = DramaCategory.objects.create(name='Romance', slug='romance')
+        Drama.objects.filter(pk=self.pending[0].pk).update(category=category, description='about')
+        listed = self.client_api.get('/api/drama/admin/dramas/', {'status': 'pending', 'page_size': 100}).json()
+        row = next(r for r in listed['results'] if r['id'] == self.pending[0].pk)
+        detail = self.client_api.get(f'/api/drama/admin/{self.pending[0].pk}/').json()
+        detail.pop('episodes'), detail.pop('episodes_next_cursor')
+        self.assertEqual({key: row[key] for key in detail}, detail)
+
+        export = self.client_api.get('/api/drama/admin/dramas/', {'format': 'ndjson', 'status': 'all'})
+        self.assertEqual(export['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        rows = [json.loads(line) for line in b''.join(export.streaming_content).decode().splitlines()]
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[-1]['id'], self.pending[0].pk)
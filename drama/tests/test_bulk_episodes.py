@@ -0,0 +1,72 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core.models import User
+from drama.models import Drama, DramaEpisode
+from drama.serializers import BULK_EPISODE_MAX, DramaEpisodeBulkListSerializer
+
+
+def episodes(numbers):
+    return [{'episode_no': no, 'video_url': f'https://x.com/{no}.mp4'} for no in numbers]
+
+
+class BulkEpisodeTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username='creator', email='c@example.com', password='x')
+        self.drama = Drama.objects.create(user=self.owner, title='Drama')
+        self.api = APIClient()
+        self.api.force_authenticate(self.owner)
+        self.url = f'/api/drama/my-dramas/{self.drama.pk}/episodes/bulk/'
+
+    def post(self, body):
+        return self.api.post(self.url, body, format='json')
+
+    def test_creates_episodes_and_counts_them(self):
+        DramaEpisode.objects.create(drama=self.drama, episode_no=1, video_url='https://x.com/1.mp4')
+        response = self.post({'episodes': episodes(range(2, 6))})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([e['episode_no'] for e in response.json()], [2, 3, 4, 5])
+        self.drama.refresh_from_db()
+        self.assertEqual(self.drama.total_episodes, 5)
+
+    def test_batch_is_checked_and_inserted_without_per_row_queries(self):
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(self.post({'episodes': episodes(range(1, 121))}).status_code, 201)
+        statements = [query['sql'] for query in captured]
+        # One existence check and one COUNT for total_episodes; the INSERT is
+        # batched (SQLite splits it at its bound-parameter limit)
+        self.assertEqual(len([sql for sql in statements if sql.startswith('SELECT') and 'drama_dramaepisode' in sql]), 2)
+        self.assertLess(len([sql for sql in statements if sql.startswith('INSERT')]), 5)
+        self.assertEqual(DramaEpisode.objects.count(), 120)
+
+    def test_existing_and_repeated_numbers_reject_the_batch(self):
+        DramaEpisode.objects.create(drama=self.drama, episode_no=2, video_url='https://x.com/2.mp4')
+        response = self.post({'episodes': episodes([1, 2, 3])})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('[2]', str(response.json()))
+        self.assertEqual(self.post({'episodes': episodes([4, 4])}).status_code, 400)
+        self.assertEqual(DramaEpisode.objects.count(), 1)
+
+    def test_race_on_episode_numbers_is_a_conflict(self):
+        DramaEpisode.objects.create(drama=self.drama, episode_no=2, video_url='https://x.com/2.mp4')
+        # As if the other upload landed between validation and INSERT
+        with mock.patch.object(DramaEpisodeBulkListSerializer, 'validate', lambda self, data: data):
+            response = self.post({'episodes': episodes([1, 2, 3])})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(list(DramaEpisode.objects.values_list('episode_no', flat=True)), [2])
+
+    def test_malformed_bodies(self):
+        self.assertEqual(self.post(episodes([1])).status_code, 400)
+        self.assertEqual(self.post({'episodes': []}).status_code, 400)
+        self.assertEqual(self.post({}).status_code, 400)
+        self.assertEqual(self.post({'episodes': episodes(range(1, BULK_EPISODE_MAX + 2))}).status_code, 400)
+        self.assertFalse(DramaEpisode.objects.exists())
+
+    def test_only_the_owner_can_upload(self):
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user(username='o', email='o@example.com', password='x'))
+        self.assertEqual(other.post(self.url, {'episodes': episodes([1])}, format='json').status_code, 404)
@@ -0,0 +1,40 @@
+from decimal import Decimal
+
+from asgiref.sync import async_to_sync
+from django.test import RequestFactory, TestCase
+
+from core.models import User
+from drama import async_views
+from drama.models import Drama, DramaEpisode, EpisodeView
+
+
+class EpisodeViewEarningsTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username='creator', email='c@example.com', password='x')
+        self.drama = Drama.objects.create(user=user, title='Drama', status='approved')
+        DramaEpisode.objects.create(drama=self.drama, episode_no=1, video_url='https://x.com/1.mp4',
+                                    view_earnings=Decimal('0.5000'))
+        self.episode = DramaEpisode.objects.create(drama=self.drama, episode_no=2, video_url='https://x.com/2.mp4')
+
+    def drama_totals(self):
+        self.drama.refresh_from_db()
+        return self.drama.view_earnings, self.drama.earnings
+
+    def reset(self):
+        EpisodeView.objects.all().delete()
+        DramaEpisode.objects.filter(pk=self.episode.pk).update(views=0, view_earnings=0, earnings=0)
+        Drama.objects.filter(pk=self.drama.pk).update(view_earnings=Decimal('0.7000'), earnings=Decimal('0.7000'))
+
+    def test_async_view_matches_sync_resum(self):
+        self.reset()
+        response = self.client.post(f'/api/drama/episodes/{self.episode.pk}/view/', REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(response.status_code, 200)
+        sync_totals = self.drama_totals()
+
+        self.reset()
+        request = RequestFactory().post(f'/api/drama/episodes/{self.episode.pk}/view/', REMOTE_ADDR='10.0.0.1')
+        response = async_to_sync(async_views.increment_episode_view)(request, episode_id=self.episode.pk)
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.drama_totals(), sync_totals)
+        self.assertGreater(sync_totals[0], Decimal('0.5000'))
@@ -0,0 +1,77 @@
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core.models import User
+from drama.models import Drama, DramaEpisode
+
+
+class PublicEpisodeTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username='creator', email='c@example.com', password='x')
+        self.drama = Drama.objects.create(user=user, title='Drama', status='approved')
+        for no in (3, 1, 2):
+            DramaEpisode.objects.create(
+                drama=self.drama, episode_no=no, video_url=f'https://x.com/{no}.mp4',
+                duration_seconds=60 * no, is_active=no != 2,
+            )
+
+    def test_detail_embeds_active_episodes_in_play_order(self):
+        response = self.client.get(f'/api/drama/dramas/{self.drama.short_code}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([e['episode_no'] for e in response.json()['episodes']], [1, 3])
+
+    def test_public_episode_index(self):
+        response = self.client.get(f'/api/drama/dramas/{self.drama.short_code}/episodes/index/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(e['episode_no'], e['duration_seconds']) for e in response.json()],
+            [(1, 60), (3, 180)],
+        )
+
+    def test_unapproved_drama_has_no_public_index(self):
+        Drama.objects.filter(pk=self.drama.pk).update(status='pending')
+        response = self.client.get(f'/api/drama/dramas/{self.drama.short_code}/episodes/index/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_public_episode_pages_continue_the_detail_cursor(self):
+        with mock.patch('drama.serializers.DETAIL_EPISODE_WINDOW', 1):
+            detail = self.client.get(f'/api/drama/dramas/{self.drama.short_code}/').json()
+        self.assertEqual([e['episode_no'] for e in detail['episodes']], [1])
+        response = self.client.get(
+            f'/api/drama/dramas/{self.drama.short_code}/episodes/', {'cursor': detail['episodes_next_cursor']}
+        )
+        self.assertEqual([e['episode_no'] for e in response.json()['results']], [3])
+
+
+class OwnerEpisodeTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username='creator', email='c@example.com', password='x')
+        self.drama = Drama.objects.create(user=self.owner, title='Drama', status='pending')
+        for no in range(1, 5):
+            DramaEpisode.objects.create(
+                drama=self.drama, episode_no=no, video_url=f'https://x.com/{no}.mp4', is_active=no != 2,
+            )
+
+    def api(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def test_owner_detail_and_list_include_inactive_episodes_before_approval(self):
+        client = self.api(self.owner)
+        with mock.patch('drama.serializers.DETAIL_EPISODE_WINDOW', 3):
+            detail = client.get(f'/api/drama/my-dramas/{self.drama.pk}/').json()
+        self.assertEqual([e['episode_no'] for e in detail['episodes']], [1, 2, 3])
+
+        response = client.get(
+            f'/api/drama/my-dramas/{self.drama.pk}/episodes/list/', {'cursor': detail['episodes_next_cursor']}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([e['episode_no'] for e in response.json()['results']], [4])
+
+    def test_others_still_see_only_approved_dramas(self):
+        other = User.objects.create_user(username='other', email='o@example.com', password='x')
+        response = self.api(other).get(f'/api/drama/my-dramas/{self.drama.pk}/episodes/list/')
+        self.assertEqual(response.status_code, 404)
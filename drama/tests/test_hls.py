@@ -0,0 +1,130 @@
+import os
+import stat
+import sys
+import tempfile
+import textwrap
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from core import storage
+from core.models import User
+from core.tests.r2 import BUCKET, PUBLIC_URL, R2TestCase
+from drama.hls import MASTER_CACHE_CONTROL, package_episode, purge_retired_builds
+from drama.models import Drama, DramaEpisode, RetiredHlsBuild
+
+# Writes what a real `ffmpeg -f hls -var_stream_map ...` run leaves behind, and logs its argv
+STUB_FFMPEG = textwrap.dedent('''\
+    #!{python}
+    import os, sys
+    args = sys.argv[1:]
+    with open(os.environ['STUB_LOG'], 'a') as log:
+        log.write(' '.join(args) + '\\n')
+    names = [part.split('name:')[1] for part in args[args.index('-var_stream_map') + 1].split()]
+    out_dir = os.path.dirname(os.path.dirname(args[-1]))
+    for name in names:
+        os.makedirs(os.path.join(out_dir, name))
+        for file_name in ('index.m3u8', 'seg_0000.ts'):
+            open(os.path.join(out_dir, name, file_name), 'w').write(name)
+    open(os.path.join(out_dir, 'master.m3u8'), 'w').write('#EXTM3U')
+''')
+STUB_FFPROBE = "#!/bin/sh\necho 1\n"
+
+
+@override_settings(FETCH_ALLOW_PRIVATE_HOSTS=True, MEDIA_SOURCE_HOSTS=['127.0.0.1'])
+class PackageHlsTests(R2TestCase):
+    def setUp(self):
+        super().setUp()
+        self.bin_dir = tempfile.TemporaryDirectory()
+        self.log = os.path.join(self.bin_dir.name, 'argv.log')
+        binaries = {}
+        for name, script in (('ffmpeg', STUB_FFMPEG.format(python=sys.executable)), ('ffprobe', STUB_FFPROBE)):
+            path = binaries[name] = os.path.join(self.bin_dir.name, name)
+            with open(path, 'w') as f:
+                f.write(script)
+            os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+        self.tools = override_settings(FFMPEG_BINARY=binaries['ffmpeg'], FFPROBE_BINARY=binaries['ffprobe'])
+        self.tools.enable()
+        os.environ['STUB_LOG'] = self.log
+
+        self.s3.put_object(Bucket=BUCKET, Key='uploads/ep1.mp4', Body=b'video')
+        source = f"{self.s3.meta.endpoint_url}/{BUCKET}/uploads/ep1.mp4"
+        user = User.objects.create_user(username='creator', email='c@example.com', password='x')
+        drama = Drama.objects.create(user=user, title='Drama')
+        self.episode = DramaEpisode.objects.create(drama=drama, episode_no=1, video_url=source, height=480)
+
+    def tearDown(self):
+        self.tools.disable()
+        del os.environ['STUB_LOG']
+        self.bin_dir.cleanup()
+        super().tearDown()
+
+    def package(self, *args):
+        call_command('package_hls', '--processes', '1', *args, stdout=StringIO())
+        self.episode.refresh_from_db()
+        self.assertEqual(self.episode.hls_error, '')
+        return self.episode.hls_url
+
+    def build_keys(self, hls_url):
+        build = hls_url[len(PUBLIC_URL) + 1:-len('master.m3u8')]
+        return [key for key in self.keys() if key.startswith(build)]
+
+    def purge(self, days_later):
+        later = timezone.now() + timedelta(days=days_later)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            return purge_retired_builds()
+
+    def test_force_retires_previous_build_after_grace(self):
+        first = self.package()
+        self.assertTrue(first.startswith(f'{PUBLIC_URL}/hls/{self.episode.pk}/'))
+        self.assertEqual(len(self.build_keys(first)), 5)
+        master = self.s3.head_object(Bucket=BUCKET, Key=first[len(PUBLIC_URL) + 1:])
+        self.assertEqual(master['CacheControl'], MASTER_CACHE_CONTROL)
+
+        second = self.package('--force')
+        self.assertNotEqual(first, second)
+        # Cached masters may still point at the old build for a while
+        self.assertEqual(len(self.build_keys(first)), 5)
+        self.assertEqual(self.purge(days_later=0), 0)
+
+        self.assertEqual(self.purge(days_later=2), 5)
+        self.assertEqual(self.build_keys(first), [])
+        self.assertEqual(len(self.build_keys(second)), 5)
+        self.assertIn('uploads/ep1.mp4', self.keys())
+        self.assertFalse(RetiredHlsBuild.objects.exists())
+
+        with open(self.log) as log:
+            self.assertIn('-protocol_whitelist http,https,tcp,tls', log.read())
+
+    def test_deleting_episode_releases_its_tree(self):
+        self.package()
+        self.package('--force')
+        self.episode.drama.delete()
+        self.purge(days_later=0)
+        self.assertEqual([key for key in self.keys() if key.startswith('hls/')], [])
+
+    def test_failed_upload_leaves_no_partial_build(self):
+        real_upload = storage.get_r2_client().upload_file
+
+        def failing_upload(path, bucket, key, **kwargs):
+            if key.endswith('master.m3u8'):
+                raise OSError("connection reset")
+            return real_upload(path, bucket, key, **kwargs)
+
+        job = (self.episode.pk, self.episode.video_url, 480, None, 0)
+        with mock.patch.object(storage.get_r2_client(), 'upload_file', side_effect=failing_upload):
+            episode_id, hls_url, error = package_episode(job)
+        self.assertEqual((hls_url, error), (None, 'connection reset'))
+        self.assertEqual([key for key in self.keys() if key.startswith('hls/')], [])
+
+    @override_settings(FETCH_ALLOW_PRIVATE_HOSTS=False)
+    def test_internal_source_is_refused(self):
+        call_command('package_hls', '--processes', '1', stdout=StringIO(), stderr=StringIO())
+        self.episode.refresh_from_db()
+        self.assertIsNone(self.episode.hls_url)
+        self.assertIn('non-public', self.episode.hls_error)
+        self.assertFalse(os.path.exists(self.log))
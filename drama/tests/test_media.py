@@ -0,0 +1,63 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.test import SimpleTestCase, override_settings
+
+from drama.media import ProbeError, ffprobe, source_url
+
+
+class RedirectOnGet(BaseHTTPRequestHandler):
+    """Looks like a video to HEAD and bounces GET to the metadata service."""
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        RedirectOnGet.requests.append('HEAD')
+        self.send_response(200)
+        self.send_header('Content-Type', 'video/mp4')
+        self.end_headers()
+
+    def do_GET(self):
+        RedirectOnGet.requests.append('GET')
+        self.send_response(302)
+        self.send_header('Location', 'http://169.254.169.254/latest/meta-data/')
+        self.end_headers()
+
+
+@override_settings(FETCH_ALLOW_PRIVATE_HOSTS=True, MEDIA_SOURCE_HOSTS=['cdn.example.com'],
+                   FFPROBE_BINARY='/nonexistent/ffprobe')
+class SourceUrlTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), RedirectOnGet)
+        cls.url = f'http://127.0.0.1:{cls.server.server_port}/video.mp4'
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        RedirectOnGet.requests = []
+
+    def test_source_redirecting_on_get_is_never_fetched(self):
+        with self.assertRaisesMessage(ProbeError, 'not an allowed media host'):
+            ffprobe(self.url)
+        self.assertEqual(RedirectOnGet.requests, [])
+
+    def test_allowed_hosts(self):
+        self.assertEqual(source_url('https://cdn.example.com/uploads/a.mp4'), 'https://cdn.example.com/uploads/a.mp4')
+        with self.assertRaises(ProbeError):
+            source_url('https://cdn.example.com.evil.test/uploads/a.mp4')
+        with self.assertRaises(ProbeError):
+            source_url('file:///etc/passwd')
+
+    @override_settings(FETCH_ALLOW_PRIVATE_HOSTS=False, MEDIA_SOURCE_HOSTS=['127.0.0.1'])
+    def test_allowed_host_must_still_be_public(self):
+        with self.assertRaisesMessage(ProbeError, 'non-public'):
+            source_url(self.url)
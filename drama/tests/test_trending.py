@@ -0,0 +1,51 @@
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import User
+from core.services import store_trending_scores
+from drama.models import Drama, DramaCategory
+
+
+class TrendingTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username='creator', email='c@example.com', password='x')
+        self.romance = DramaCategory.objects.create(name='Romance', slug='romance', order=1)
+        self.action = DramaCategory.objects.create(name='Action', slug='action', order=2)
+        self.dramas = [
+            Drama.objects.create(
+                user=user, title=f'Drama {i}', status='approved',
+                category=self.romance if i % 2 else self.action,
+            )
+            for i in range(9)
+        ]
+        hidden = Drama.objects.create(user=user, title='Pending', status='pending', category=self.romance)
+        # Scores 8, 7, ... with a tie between dramas 3 and 4
+        scores = {d.pk: (float(8 - i if i != 4 else 5), 1) for i, d in enumerate(self.dramas)}
+        scores[hidden.pk] = (100.0, 1)
+        store_trending_scores('drama', scores, timezone.now())
+        store_trending_scores('category', {self.romance.pk: (1.0, 1), self.action.pk: (9.0, 1)}, timezone.now())
+
+    def trending(self, **params):
+        ids, cursor = [], None
+        while True:
+            query = {'sort': 'trending', 'page_size': 2, **params, **({'cursor': cursor} if cursor else {})}
+            response = self.client.get('/api/drama/dramas/', query)
+            self.assertEqual(response.status_code, 200)
+            ids += [card['id'] for card in response.json()['results']]
+            cursor = response.json()['next_cursor']
+            if not cursor:
+                return ids
+
+    def test_trending_pages_by_score(self):
+        expected = [d.pk for d in self.dramas[:3]] + sorted([self.dramas[3].pk, self.dramas[4].pk])
+        expected += [d.pk for d in self.dramas[5:]]
+        self.assertEqual(self.trending(), expected)
+
+    def test_trending_within_category(self):
+        self.assertEqual(self.trending(category='romance'), [d.pk for d in self.dramas if d.category == self.romance])
+
+    def test_categories_sorted_by_trending(self):
+        trending = self.client.get('/api/drama/categories/', {'sort': 'trending'}).json()
+        self.assertEqual([c['slug'] for c in trending], ['action', 'romance'])
+        default = self.client.get('/api/drama/categories/').json()
+        self.assertEqual([c['slug'] for c in default], ['romance', 'action'])
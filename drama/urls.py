@@ -1,5 +1,6 @@
 # drama/urls.py
 
+from django.conf import settings
 from django.urls import path
 from .views import (
     # Categories
@@ -9,11 +10,15 @@ from .views import (
     DramaListCreateView,
     DramaDetailView,
     DramaEpisodeCreateView,
+    DramaEpisodeBulkCreateView,
     DramaEpisodeListView,
+    DramaEpisodeIndexView,
     
     # Public browsing
     PublicDramaListView,
     PublicDramaDetailView,
+    drama_autocomplete,
+    drama_home_feed,
     creator_drama_earnings_summary,
     
     # View counting / analytics
@@ -23,11 +28,17 @@ from .views import (
     
     # Admin moderation
     admin_pending_dramas,
+    admin_drama_detail,
+    AdminDramaEpisodeListView,
     admin_dramas_list,
     admin_approve_drama,
     admin_reject_drama,
 )
 
+if settings.ASYNC_COUNTERS:
+    # ASGI deployments: async fast path, same URLs and responses
+    from .async_views import increment_drama_view, increment_episode_view
+
 app_name = 'drama'  # optional - useful if you use reverse('drama:some-name')
 
 urlpatterns = [
@@ -56,17 +67,35 @@ urlpatterns = [
          DramaEpisodeCreateView.as_view(), 
          name='drama-episode-create'),
 
+    # Episodes – add many episodes in one request (season upload)
+    path('my-dramas/<int:drama_pk>/episodes/bulk/', 
+         DramaEpisodeBulkCreateView.as_view(), 
+         name='drama-episode-bulk-create'),
+
     # List episodes of my own drama (even if not approved yet)
     path('my-dramas/<int:drama_pk>/episodes/list/', 
          DramaEpisodeListView.as_view(), 
          name='my-drama-episodes'),
 
+    # Compact index (episode_no + duration only) for the player
+    path('my-dramas/<int:drama_pk>/episodes/index/', 
+         DramaEpisodeIndexView.as_view(), 
+         name='my-drama-episodes-index'),
+
     # ───────────────────────────────────────────────
     # Public – Browse approved dramas & episodes
     # ───────────────────────────────────────────────
     path('dramas/', 
          PublicDramaListView.as_view(), 
          name='public-dramas-list'),
+
+    path('autocomplete/', 
+         drama_autocomplete, 
+         name='drama-autocomplete'),
+
+    path('home/', 
+         drama_home_feed, 
+         name='drama-home-feed'),
      path('admin/<int:pk>/delete/', 
          admin_delete_drama, 
          name='admin-delete-drama'),
@@ -75,6 +104,16 @@ urlpatterns = [
          PublicDramaDetailView.as_view(), 
          name='public-drama-detail'),
 
+    # Public episode pages — where the detail's episodes_next_cursor continues
+    path('dramas/<str:short_code>/episodes/', 
+         DramaEpisodeListView.as_view(), 
+         name='public-drama-episodes'),
+
+    # Compact episode index for the public player (same payload as my-dramas/.../index/)
+    path('dramas/<str:short_code>/episodes/index/', 
+         DramaEpisodeIndexView.as_view(), 
+         name='public-drama-episodes-index'),
+
     # ───────────────────────────────────────────────
     # View tracking (called from player / frontend)
     # ───────────────────────────────────────────────
@@ -93,6 +132,15 @@ urlpatterns = [
          admin_pending_dramas, 
          name='admin-pending-dramas'),
 
+    # Review a drama (any status) and page all its episodes before approving
+    path('admin/<int:pk>/', 
+         admin_drama_detail, 
+         name='admin-drama-detail'),
+
+    path('admin/<int:drama_pk>/episodes/', 
+         AdminDramaEpisodeListView.as_view(), 
+         name='admin-drama-episodes'),
+
     path('my-dramas/earnings-summary/',
          creator_drama_earnings_summary,
          name='creator-drama-earnings-summary'),
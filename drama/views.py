@@ -2,41 +2,68 @@
 from decimal import Decimal
 from datetime import date
 
+from django.db import IntegrityError, transaction
 from django.db.models import Q, Sum, Count
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 
 from rest_framework import generics, status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from core.models import SiteSettings
-from core.utils import get_client_ip
+from core.models import SiteSettings, TrendingScore
+from core.pagination import KeysetPagination
+from core.services import trending_score_subquery
+from core.renderers import ADMIN_RENDERERS, admin_list_response
+from core.utils import get_client_ip, filter_by_date_range, filter_by_username_prefix
 from .models import Drama, DramaEpisode, DramaCategory, DramaView, EpisodeView
 from .serializers import (
+    BULK_EPISODE_MAX,
+    card_queryset,
+    episode_queryset,
+    DramaCardSerializer,
+    DramaModerationCardSerializer,
     DramaCategorySerializer,
     DramaCreateUpdateSerializer,
     DramaDetailSerializer,
+    DramaEpisodeBulkCreateSerializer,
     DramaEpisodeCreateSerializer,
+    DramaEpisodeIndexSerializer,
     DramaEpisodeListSerializer,
 )
-from .services import calculate_episode_view_earning, update_drama_earnings
+from .pagination import EpisodeKeysetPagination
+from .services import (
+    HOME_FEED_DEFAULT_LIMIT, HOME_FEED_MAX_LIMIT,
+    autocomplete_titles, calculate_episode_view_earning, home_feed, related_dramas,
+    update_drama_earnings,
+)
 
 
 # ───────────────────────────────────────────────
 # Categories (public)
 # ───────────────────────────────────────────────
 class DramaCategoryListView(generics.ListAPIView):
-    queryset = DramaCategory.objects.filter(is_active=True)
+    """?sort=trending → hottest categories first (sum of their dramas' trending scores)"""
     serializer_class = DramaCategorySerializer
     permission_classes = [AllowAny]
 
+    def get_queryset(self):
+        qs = DramaCategory.objects.filter(is_active=True)
+        if self.request.query_params.get('sort') == 'trending':
+            # A handful of categories — a per-row score lookup is cheap here
+            qs = qs.annotate(trending_score=trending_score_subquery('category')).order_by('-trending_score', 'order', 'name')
+        return qs
+
 
 # ───────────────────────────────────────────────
 # Creator's own dramas (CRUD) – non-archived by default
 # ───────────────────────────────────────────────
+# Owner and admin detail payloads embed inactive episodes too
+OWNER_CONTEXT = {'include_inactive': True}
+
+
 class DramaListCreateView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -49,9 +76,10 @@ class DramaListCreateView(APIView):
         if not show_archived:
             qs = qs.filter(is_archived=False)
 
-        dramas = qs.order_by('-created_at')
-        serializer = DramaDetailSerializer(dramas, many=True)
-        return Response(serializer.data)
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(card_queryset(qs), request, view=self)
+        serializer = DramaModerationCardSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
     def post(self, request):
         serializer = DramaCreateUpdateSerializer(
@@ -61,7 +89,7 @@ class DramaListCreateView(APIView):
         if serializer.is_valid():
             drama = serializer.save()
             return Response(
-                DramaDetailSerializer(drama).data,
+                DramaDetailSerializer(drama, context=OWNER_CONTEXT).data,
                 status=status.HTTP_201_CREATED
             )
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -76,7 +104,7 @@ class DramaDetailView(APIView):
 
     def get(self, request, pk):
         drama = self.get_object(pk)
-        return Response(DramaDetailSerializer(drama).data)
+        return Response(DramaDetailSerializer(drama, context=OWNER_CONTEXT).data)
 
     def patch(self, request, pk):
         drama = self.get_object(pk)
@@ -88,7 +116,7 @@ class DramaDetailView(APIView):
         )
         if serializer.is_valid():
             serializer.save()
-            return Response(DramaDetailSerializer(drama).data)
+            return Response(DramaDetailSerializer(drama, context=OWNER_CONTEXT).data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def delete(self, request, pk):
@@ -129,50 +157,194 @@ class DramaEpisodeCreateView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class DramaEpisodeBulkCreateView(APIView):
+    """
+    Upload a whole season at once.
+    Body: {"episodes": [{"episode_no": 1, "video_url": "...", ...}, ...]}  (max BULK_EPISODE_MAX)
+    All-or-nothing: any invalid row rejects the batch.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, drama_pk):
+        drama = get_object_or_404(Drama, pk=drama_pk, user=request.user)
+        if not isinstance(request.data, dict):
+            return Response(
+                {"error": 'Body must be an object: {"episodes": [...]}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        serializer = DramaEpisodeBulkCreateSerializer(
+            data=request.data.get('episodes'),
+            many=True,
+            allow_empty=False,
+            max_length=BULK_EPISODE_MAX,
+            context={'drama': drama}
+        )
+        if serializer.is_valid():
+            try:
+                with transaction.atomic():
+                    episodes = serializer.save()
+            except IntegrityError:
+                # Raced with another upload for the same episode numbers
+                return Response(
+                    {"episode_no": "Some of these episode numbers were just added. Please retry."},
+                    status=status.HTTP_409_CONFLICT
+                )
+            # New episodes start at zero earnings — no update_drama_earnings() re-sum needed
+            return Response(
+                DramaEpisodeListSerializer(episodes, many=True).data,
+                status=status.HTTP_201_CREATED
+            )
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
 class DramaEpisodeListView(generics.ListAPIView):
+    """
+    Paged by (order, episode_no): ?cursor= ?page_size=
+    or the neighbourhood of one episode: ?around=<episode_no>&window=<n>
+    """
     serializer_class = DramaEpisodeListSerializer
     permission_classes = [AllowAny]
-
-    def get_queryset(self):
+    pagination_class = EpisodeKeysetPagination
+
+    def get_drama(self):
+        """(drama, include_inactive) — the owner sees their drama in any status."""
+        # Mounted by drama pk (creator routes) and by short_code (public routes)
+        if 'short_code' in self.kwargs:
+            lookup = {'short_code': self.kwargs['short_code']}
+        else:
+            lookup = {'pk': self.kwargs['drama_pk']}
+            if self.request.user.is_authenticated:
+                own = Drama.objects.filter(user=self.request.user, **lookup).first()
+                if own is not None:
+                    return own, True
         drama = get_object_or_404(
             Drama,
-            pk=self.kwargs['drama_pk'],
             status='approved',
-            is_archived=False
+            is_archived=False,
+            **lookup
         )
-        return drama.episodes.filter(is_active=True).order_by('order', 'episode_no')
+        return drama, False
+
+    def get_queryset(self):
+        return episode_queryset(*self.get_drama())
+
+
+class DramaEpisodeIndexView(DramaEpisodeListView):
+    """All episode numbers + durations in one small, unpaginated payload."""
+    serializer_class = DramaEpisodeIndexSerializer
+    pagination_class = None
+
+    def get_queryset(self):
+        return super().get_queryset().only('id', 'episode_no', 'duration_seconds', 'order')
 
 
 # ───────────────────────────────────────────────
 # Public browsing – only approved & non-archived
 # ───────────────────────────────────────────────
 class PublicDramaListView(generics.ListAPIView):
-    serializer_class = DramaDetailSerializer
+    """
+    ?category=<slug>
+    ?search=<text> → ranked full-text results, keyset paged (?cursor= ?page_size=)
+    ?sort=trending → precomputed decayed popularity (compute_trending), keyset paged
+    """
+    serializer_class = DramaCardSerializer
     permission_classes = [AllowAny]
 
-    def get_queryset(self):
+    def get_search_term(self):
+        return self.request.query_params.get('search', '').strip()
+
+    def is_trending(self):
+        return not self.get_search_term() and self.request.query_params.get('sort') == 'trending'
+
+    @property
+    def paginator(self):
+        # Browsing stays a plain list; search / trending results are paged by score
+        if not hasattr(self, '_paginator'):
+            if self.get_search_term():
+                self._paginator = KeysetPagination(ordering=('-search_rank', '-id'))
+            elif self.is_trending():
+                self._paginator = KeysetPagination(ordering=('-score', 'object_id'))
+            else:
+                self._paginator = None
+        return self._paginator
+
+    def browsable(self):
         qs = Drama.objects.filter(status='approved', is_archived=False)
-
         category_slug = self.request.query_params.get('category')
         if category_slug:
             qs = qs.filter(category__slug=category_slug)
+        return qs
 
-        search_term = self.request.query_params.get('search')
+    def get_queryset(self):
+        qs = card_queryset(self.browsable())
+
+        search_term = self.get_search_term()
         if search_term:
-            qs = qs.filter(
-                Q(title__icontains=search_term) |
-                Q(description__icontains=search_term)
-            )
+            return Drama.search_index.search(qs, search_term)
 
         return qs.order_by('-approved_at', '-views')
 
+    def list(self, request, *args, **kwargs):
+        if not self.is_trending():
+            return super().list(request, *args, **kwargs)
+
+        # Page down the (kind, -score) index of the last compute_trending run,
+        # then load just that page's dramas
+        scores = TrendingScore.objects.filter(
+            kind='drama', object_id__in=self.browsable().values('pk')
+        ).values('object_id', 'score')
+        page = self.paginator.paginate_queryset(scores, request, view=self)
+        dramas = card_queryset(self.browsable()).in_bulk([row['object_id'] for row in page])
+        cards = [dramas[row['object_id']] for row in page if row['object_id'] in dramas]
+        return self.get_paginated_response(self.get_serializer(cards, many=True).data)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def drama_autocomplete(request):
+    """
+    Search-as-you-type: /api/drama/autocomplete/?q=<typed text>&limit=8
+    """
+    try:
+        limit = max(1, min(int(request.query_params.get('limit', 8)), 20))
+    except (TypeError, ValueError):
+        limit = 8
+
+    return Response({
+        "suggestions": autocomplete_titles(request.query_params.get('q', ''), limit)
+    })
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def drama_home_feed(request):
+    """
+    App home screen in one call: /api/drama/home/?limit=10
+    → top `limit` approved dramas (most viewed) for every active category.
+    """
+    try:
+        limit = int(request.query_params.get('limit', HOME_FEED_DEFAULT_LIMIT))
+    except (TypeError, ValueError):
+        limit = HOME_FEED_DEFAULT_LIMIT
+    limit = max(1, min(limit, HOME_FEED_MAX_LIMIT))
+
+    return Response({"categories": home_feed(limit)})
+
 
 class PublicDramaDetailView(generics.RetrieveAPIView):
-    queryset = Drama.objects.filter(status='approved', is_archived=False)
+    queryset = Drama.objects.filter(
+        status='approved', is_archived=False
+    ).select_related('category', 'user')
     serializer_class = DramaDetailSerializer
     lookup_field = 'short_code'
     permission_classes = [AllowAny]
 
+    def retrieve(self, request, *args, **kwargs):
+        drama = self.get_object()
+        data = self.get_serializer(drama).data
+        data['related'] = related_dramas(drama)  # precomputed by compute_related
+        return Response(data)
+
 
 # ───────────────────────────────────────────────
 # View tracking + earnings
@@ -293,22 +465,77 @@ def creator_drama_earnings_summary(request):
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
 def admin_pending_dramas(request):
-    pending = Drama.objects.filter(
+    """Review queue, oldest first. Paging: ?cursor= ?page_size="""
+    pending = card_queryset(Drama.objects.filter(
         status='pending',
         is_archived=False
-    ).select_related('user', 'category').order_by('created_at')
+    ))
+
+    paginator = KeysetPagination(ordering=('created_at', 'id'))
+    page = paginator.paginate_queryset(pending, request)
+    serializer = DramaModerationCardSerializer(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def admin_drama_detail(request, pk):
+    """Any drama in any status — for reviewing a pending one before approval."""
+    drama = get_object_or_404(Drama.objects.select_related('category', 'user'), pk=pk)
+    return Response(DramaDetailSerializer(drama, context=OWNER_CONTEXT).data)
+
+
+class AdminDramaEpisodeListView(DramaEpisodeListView):
+    """Every episode of any drama, inactive included; continues admin_drama_detail's cursor."""
+    permission_classes = [IsAdminUser]
+
+    def get_drama(self):
+        return get_object_or_404(Drama, pk=self.kwargs['drama_pk']), True
+
+
+def _admin_drama_row(d):
+    # Same keys as the DramaDetailSerializer rows this listing used to return,
+    # minus the embedded episodes (admin_drama_detail has those)
+    category = None
+    if d['category__id'] is not None:
+        category = {
+            'id': d['category__id'],
+            'name': d['category__name'],
+            'slug': d['category__slug'],
+            'description': d['category__description'],
+        }
+    return {
+        'id': d['id'],
+        'title': d['title'],
+        'slug': d['slug'],
+        'short_code': d['short_code'],
+        'description': d['description'],
+        'thumbnail_url': d['thumbnail_url'],
+        'poster_url': d['poster_url'],
+        'category': category,
+        'status': d['status'],
+        'uploaded_by': d['user__username'],
+        'created_at': d['created_at'],
+        'views': d['views'],
+        'total_episodes': d['total_episodes'],
+        'is_archived': d['is_archived'],
+        'approved_at': d['approved_at'],
+    }
 
-    serializer = DramaDetailSerializer(pending, many=True)
-    return Response(serializer.data)
 
 # drama/views.py
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
+@renderer_classes(ADMIN_RENDERERS)
 def admin_dramas_list(request):
+    """
+    Filters: ?status= ?include_archived=true ?username=<prefix> ?date_from= ?date_to=
+    Paging: ?cursor= ?page_size=   Export: ?format=ndjson
+    """
     status_filter = request.query_params.get('status')
     include_archived = request.query_params.get('include_archived', 'false').lower() == 'true'
 
-    qs = Drama.objects.select_related('user', 'category')
+    qs = Drama.objects.all()
 
     if not include_archived:
         qs = qs.filter(is_archived=False)
@@ -316,10 +543,15 @@ def admin_dramas_list(request):
     if status_filter and status_filter != 'all':
         qs = qs.filter(status=status_filter)
 
-    qs = qs.order_by('-created_at', '-approved_at')
+    qs = filter_by_username_prefix(qs, request, 'user__username')
+    qs = filter_by_date_range(qs, request, 'created_at')
 
-    serializer = DramaDetailSerializer(qs, many=True)
-    return Response(serializer.data)
+    qs = qs.values(
+        'id', 'title', 'slug', 'short_code', 'description', 'thumbnail_url', 'poster_url',
+        'category__id', 'category__name', 'category__slug', 'category__description',
+        'status', 'user__username', 'views', 'total_episodes', 'is_archived', 'created_at', 'approved_at',
+    )
+    return admin_list_response(request, qs, _admin_drama_row, 'dramas.ndjson')
 
 
 @api_view(['POST'])
@@ -345,7 +577,7 @@ def admin_approve_drama(request, pk):
     drama.rejected_reason = ""
     drama.save(update_fields=['status', 'approved_by', 'approved_at', 'rejected_reason'])
 
-    return Response(DramaDetailSerializer(drama).data)
+    return Response(DramaDetailSerializer(drama, context=OWNER_CONTEXT).data)
 
 @api_view(['POST'])
 @permission_classes([IsAdminUser])
@@ -363,7 +595,7 @@ def admin_delete_drama(request, pk):
 
     return Response({
         "message": "Drama has been successfully archived",
-        "drama": DramaDetailSerializer(drama).data
+        "drama": DramaDetailSerializer(drama, context=OWNER_CONTEXT).data
     })
     
 @api_view(['POST'])
@@ -390,5 +622,5 @@ def admin_reject_drama(request, pk):
 
     return Response({
         "message": "Drama rejected",
-        "drama": DramaDetailSerializer(drama).data
+        "drama": DramaDetailSerializer(drama, context=OWNER_CONTEXT).data
     })
\ No newline at end of file